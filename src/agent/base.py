@@ -1,7 +1,9 @@
 import time
+import asyncio
 from typing import List, Literal
 from src.models.base import BaseLLM
 from src.tools.base import AgentTool
+from langchain_core.runnables import RunnableLambda
 from langgraph.graph import StateGraph, START, END, MessagesState
 from langchain_core.messages import SystemMessage, ToolMessage, BaseMessage, HumanMessage, AIMessage
 
@@ -44,6 +46,15 @@ class Agent:
         
         return {"messages": [parsed_response]}
     
+    async def _allm_call(self, state: dict):
+        """Async LLM node - awaits the model instead of blocking the event loop"""
+        messages = [SystemMessage(content=self.system_prompt)] + state["messages"]
+        
+        response = await self._model_with_tools.ainvoke(messages)
+        parsed_response = self.llm.parse_tool_calls(response)
+        
+        return {"messages": [parsed_response]}
+    
     def _tool_node(self, state: dict):
         """Tool execution node"""
         result = []
@@ -60,6 +71,20 @@ class Agent:
             )
         return {"messages": result}
     
+    async def _atool_node(self, state: dict):
+        """Async tool execution node - awaits all tool calls of the message concurrently"""
+        last_message = state["messages"][-1]
+        
+        observations = await asyncio.gather(*[
+            self.tools_by_name[tool_call["name"]].aexecute(**tool_call["args"])
+            for tool_call in last_message.tool_calls
+        ])
+        result = [
+            ToolMessage(content=str(observation), tool_call_id=tool_call["id"])
+            for tool_call, observation in zip(last_message.tool_calls, observations)
+        ]
+        return {"messages": result}
+    
     def _should_continue(self, state: MessagesState) -> Literal["tool_node", END]: # type: ignore
         """Routing logic: continue to tools or end"""
         last_message = state["messages"][-1]
@@ -71,9 +96,9 @@ class Agent:
         """Build the LangGraph agent"""
         builder = StateGraph(MessagesState)
         
-        # Add nodes
-        builder.add_node("llm_call", self._llm_call)
-        builder.add_node("tool_node", self._tool_node)
+        # Add nodes (sync functions for invoke/stream, async ones for ainvoke/astream)
+        builder.add_node("llm_call", RunnableLambda(self._llm_call, afunc=self._allm_call))
+        builder.add_node("tool_node", RunnableLambda(self._tool_node, afunc=self._atool_node))
         
         # Add edges
         builder.add_edge(START, "llm_call")
@@ -90,6 +115,10 @@ class Agent:
         """Run the agent"""
         return self.graph.invoke({"messages": messages}, stream_mode=stream_mode)
     
+    async def ainvoke(self, messages: List[BaseMessage], stream_mode: str = "values"):
+        """Run the agent without blocking the event loop"""
+        return await self.graph.ainvoke({"messages": messages}, stream_mode=stream_mode)
+    
     def _stream_final_response(self, content: str):
         """Stream text content word by word"""
         words = content.split()
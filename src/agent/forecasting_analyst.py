@@ -3,14 +3,17 @@ from src.agent.base import Agent
 from src.tools.python_tool import PythonTool
 from src.models.openai_model import OpenAILLM
 from src.agent.prompts.forecasting_analyst_prompt import SYSTEM_PROMPT, EXECUTE_FUNCTION_DESCRIPTION
-from src.tools.forecasting_analysis_tools import get_historical_close_prices_and_volumes, calculate_technical_indicators, analyze_price_volume_trend
+from src.tools.forecasting_analysis_tools import get_historical_close_prices_and_volumes, aget_historical_close_prices_and_volumes, calculate_technical_indicators, analyze_price_volume_trend, analyze_price_action, get_latest_technical_indicators, aget_latest_technical_indicators, screen_technical_indicators, ascreen_technical_indicators
 
 
 NAME = "Forecasting & Technical Analysis Agent"
 TOOLS = [
-    PythonTool(get_historical_close_prices_and_volumes),
+    PythonTool(get_historical_close_prices_and_volumes, aget_historical_close_prices_and_volumes),
     PythonTool(calculate_technical_indicators),
     PythonTool(analyze_price_volume_trend),  
+    PythonTool(analyze_price_action),
+    PythonTool(get_latest_technical_indicators, aget_latest_technical_indicators),
+    PythonTool(screen_technical_indicators, ascreen_technical_indicators),
 ]
 
 class ForecastingTechnicalAnalystAgent(Agent):
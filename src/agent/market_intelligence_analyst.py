@@ -3,14 +3,16 @@ from src.agent.base import Agent
 from src.tools.python_tool import PythonTool
 from src.models.openai_model import OpenAILLM
 from src.agent.prompts.market_intelligence_analyst_prompt import SYSTEM_PROMPT, EXECUTE_FUNCTION_DESCRIPTION
-from src.tools.market_intelligence_tools import get_current_coin_price, get_current_coin_market_data, get_current_trending_coins
+from src.tools.market_intelligence_tools import get_current_coin_price, get_current_coin_prices, get_current_coin_market_data, get_current_trending_coins
+from src.tools.market_intelligence_tools import aget_current_coin_price, aget_current_coin_prices, aget_current_coin_market_data, aget_current_trending_coins
 
 
 NAME = "Market Intelligence Analyst Agent"
 TOOLS = [
-    PythonTool(get_current_coin_price),
-    PythonTool(get_current_coin_market_data),
-    PythonTool(get_current_trending_coins),  
+    PythonTool(get_current_coin_price, aget_current_coin_price),
+    PythonTool(get_current_coin_prices, aget_current_coin_prices),
+    PythonTool(get_current_coin_market_data, aget_current_coin_market_data),
+    PythonTool(get_current_trending_coins, aget_current_trending_coins),  
 ]
 
 class MarketAnalystAgent(Agent):
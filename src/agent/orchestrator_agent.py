@@ -1,4 +1,5 @@
 import re
+from typing import Optional
 from src.agent.base import Agent
 from src.tools.python_tool import PythonTool
 from langchain_core.messages import HumanMessage
@@ -7,6 +8,7 @@ from src.agent.market_intelligence_analyst import MarketAnalystAgent
 from src.agent.forecasting_analyst import ForecastingTechnicalAnalystAgent
 from src.agent.synthesis_reccomendation_agent import SynthesisReccomendationAgent
 from src.agent.prompts.orchestrator_agent_prompt import SYSTEM_PROMPT
+from src.tools.synthesis_reccomendation_tools import build_recommendation_report
 
 NAME = "Supervisor Orchestrator Agent"
 SUB_AGENT_CLASSES = [
@@ -19,7 +21,9 @@ SUB_AGENT_CLASSES = [
 class OrchestratorAgent(Agent):
     def __init__(self, llm, sub_agent_shared_llm, name=NAME, system_prompt=SYSTEM_PROMPT):
         self.sub_agents = [AgentClass(llm=sub_agent_shared_llm) for AgentClass in SUB_AGENT_CLASSES]
-        tools = [PythonTool(self._make_executor(agent)) for agent in self.sub_agents] # Create tools from sub-agents
+        tools = [PythonTool(self._make_executor(agent), self._make_async_executor(agent)) for agent in self.sub_agents] # Create tools from sub-agents
+        synthesis_agent = next(agent for agent in self.sub_agents if isinstance(agent, SynthesisReccomendationAgent))
+        tools.append(PythonTool(*self._make_synthesis_fast_path(synthesis_agent)))
         super().__init__(name, llm, tools, system_prompt)
     
     def _make_executor(self, agent):
@@ -46,6 +50,81 @@ class OrchestratorAgent(Agent):
         
         return execute
     
+    def _make_async_executor(self, agent):
+        """Create an async tool executor for the given sub-agent (lets sub-agents run concurrently)"""
+        async def aexecute(request: str) -> str:
+            self._log_agent_start(agent.name)
+            result = await agent.ainvoke([HumanMessage(content=request)])
+            self._log_agent_complete()
+            return result["messages"][-1].content
+        
+        aexecute.__name__ = f"aexecute_{self._sanitize_function_name(agent.name)}_tasks"
+        return aexecute
+    
+    def _make_synthesis_fast_path(self, agent):
+        """Create sync and async tools that synthesize a recommendation from structured metrics without the LLM"""
+        def prepare(include_narrative: bool, **metrics) -> tuple:
+            """Template report plus the synthesis agent messages for the narrative (None when not requested)"""
+            result = build_recommendation_report(**metrics)
+            if result is None:
+                return "Error: could not synthesize the recommendation, delegate to the synthesis agent instead", None
+            if not include_narrative:
+                return result["report"], None
+            request = (f"Write a short narrative explaining this {metrics['coin_name']} recommendation to the user. "
+                       f"Do not change the action, scores, targets or stop loss.\n\n{result['report']}")
+            return result["report"], [HumanMessage(content=request)]
+        
+        def with_narrative(report: str, result) -> str:
+            self._log_agent_complete()
+            return f"{report}\n\n{result['messages'][-1].content}"
+        
+        def synthesize_recommendation(coin_name: str, current_price: float, volatility: float, var_pct: float,
+                                      momentum: str = "neutral", trend_signal: str = "neutral", rsi_14: Optional[float] = None,
+                                      correlation_score: Optional[float] = None, market_sentiment: Optional[str] = None,
+                                      user_risk_tolerance: str = "medium", include_narrative: bool = False) -> str:
+            report, messages = prepare(include_narrative, coin_name=coin_name, current_price=current_price, volatility=volatility,
+                                       var_pct=var_pct, momentum=momentum, trend_signal=trend_signal, rsi_14=rsi_14,
+                                       correlation_score=correlation_score, market_sentiment=market_sentiment,
+                                       user_risk_tolerance=user_risk_tolerance)
+            if messages is None:
+                return report
+            self._log_agent_start(agent.name)
+            return with_narrative(report, agent.invoke(messages))
+        
+        async def asynthesize_recommendation(include_narrative: bool = False, **metrics) -> str:
+            # Same arguments as synthesize_recommendation, whose signature defines the tool schema
+            report, messages = prepare(include_narrative, **metrics)
+            if messages is None:
+                return report
+            self._log_agent_start(agent.name)
+            return with_narrative(report, await agent.ainvoke(messages))
+        
+        synthesize_recommendation.__doc__ = """
+        Deterministic investment recommendation for one coin whose metrics are already known (price from the
+        Market Intelligence Agent, trend/momentum/RSI from the Forecasting Agent, volatility/VaR from the Risk Agent).
+        Computes the risk score and BUY/SELL/HOLD/AVOID action with fixed rules and returns a ready-made markdown
+        report, without calling the synthesis agent. Much faster and cheaper than
+        execute_synthesis_recommendation_agent_tasks; use that instead when metrics are missing or the user asks
+        an open-ended question.
+        
+        Args:
+            coin_name (str): Name of the cryptocurrency.
+            current_price (float): Current price in USD.
+            volatility (float): Annualized volatility (%).
+            var_pct (float): Value-at-Risk (95%) percentage.
+            momentum (str): Price momentum ("positive", "negative", "neutral").
+            trend_signal (str): Trend signal ("bullish", "bearish", "neutral").
+            rsi_14 (float, optional): 14-day RSI.
+            correlation_score (float, optional): Portfolio correlation score (0-100).
+            market_sentiment (str, optional): Market sentiment ("bullish", "bearish", "neutral").
+            user_risk_tolerance (str): User's risk tolerance ("low", "medium", "high").
+            include_narrative (bool): Also ask the synthesis agent for a free-form narrative (default: False).
+        
+        Returns:
+            str: Markdown recommendation report (followed by the narrative if requested)
+        """
+        return synthesize_recommendation, asynthesize_recommendation
+    
     def _sanitize_function_name(self, name: str) -> str:
         """Convert agent name to valid function name (alphanumeric, underscore, hyphen only)"""
         # Replace invalid characters (including &) with underscore
@@ -227,6 +227,19 @@ execute_synthesis_recommendation_agent_tasks(
 **If data is incomplete:**
 Proceed anyway, mark missing fields as "not available". Synthesis will note limitations and still provide guidance.
 
+**Fast path - structured metrics available:**
+When you already hold the current price, volatility, VaR, momentum and trend for a single coin, call
+`synthesize_recommendation(...)` instead of the Synthesis Agent. It applies the same risk-score and
+recommendation rules deterministically and returns the finished report in one step:
+```
+synthesize_recommendation(coin_name="Ethereum", current_price=3121, volatility=54.25, var_pct=6.17,
+                          momentum="neutral", trend_signal="neutral", rsi_14=49,
+                          market_sentiment="bullish", user_risk_tolerance="low")
+```
+Only set `include_narrative=True` when the user explicitly wants a written explanation beyond the report.
+Use `execute_synthesis_recommendation_agent_tasks` when any of these metrics is missing, for multi-coin
+comparisons, or for open-ended questions (alternatives, portfolio advice, timeframe-specific strategy).
+
 ---
 
 **FEW-SHOT EXAMPLES**
@@ -3,15 +3,22 @@ from src.agent.base import Agent
 from src.tools.python_tool import PythonTool
 from src.models.openai_model import OpenAILLM
 from src.agent.prompts.risk_portfolio_agent_prompt import SYSTEM_PROMPT, EXECUTE_FUNCTION_DESCRIPTION
-from src.tools.risk_portfolio_tools import get_historical_close_prices, calculate_correlation_matrix, calculate_portfolio_volatility, calculate_returns_from_prices, calculate_var, generate_sample_returns
+from src.tools.risk_portfolio_tools import get_historical_close_prices, aget_historical_close_prices, get_aligned_close_prices, aget_aligned_close_prices, calculate_correlation_matrix, calculate_portfolio_volatility, optimize_portfolio, calculate_returns_from_prices, calculate_var, calculate_monte_carlo_var, calculate_parametric_var, evaluate_portfolio_weights, calculate_rolling_risk, calculate_drawdowns, generate_sample_returns
 
 NAME = "Risk & Portfolio Agent"
 TOOLS = [
-    PythonTool(get_historical_close_prices),
+    PythonTool(get_historical_close_prices, aget_historical_close_prices),
+    PythonTool(get_aligned_close_prices, aget_aligned_close_prices),
     PythonTool(calculate_returns_from_prices),
     PythonTool(calculate_portfolio_volatility),
+    PythonTool(optimize_portfolio),
     PythonTool(calculate_var),
-    PythonTool(calculate_correlation_matrix),  
+    PythonTool(calculate_monte_carlo_var),
+    PythonTool(calculate_parametric_var),
+    PythonTool(evaluate_portfolio_weights),
+    PythonTool(calculate_correlation_matrix),
+    PythonTool(calculate_rolling_risk),
+    PythonTool(calculate_drawdowns),  
 ]
 
 class RiskPortfolioAgent(Agent):
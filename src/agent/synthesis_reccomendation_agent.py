@@ -3,13 +3,14 @@ from src.agent.base import Agent
 from src.tools.python_tool import PythonTool
 from src.models.openai_model import OpenAILLM
 from src.agent.prompts.synthesis_reccomendation_agent_prompt import SYSTEM_PROMPT, EXECUTE_FUNCTION_DESCRIPTION
-from src.tools.synthesis_reccomendation_tools import generate_investment_recommendation, generate_risk_score
+from src.tools.synthesis_reccomendation_tools import generate_investment_recommendation, generate_risk_score, screen_watchlist
 
 
 NAME = "Synthesis & Recommendation Agent"
 TOOLS = [
     # PythonTool(generate_risk_score),
     # PythonTool(generate_investment_recommendation)
+    PythonTool(screen_watchlist),
 ]
 
 class SynthesisReccomendationAgent(Agent):
@@ -0,0 +1,9 @@
+import requests
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """Raised when the market data circuit breaker is open and no cached data can be served"""
+
+    def __init__(self, message: str, retry_in: float = 0.0):
+        super().__init__(message)
+        self.retry_in = retry_in
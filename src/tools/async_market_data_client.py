@@ -0,0 +1,203 @@
+import asyncio
+import aiohttp
+import requests
+from typing import Any, Dict, Hashable, Optional
+from src.tools.market_data_client import MarketDataClient, get_market_data_client, is_upstream_failure, serve_stale
+
+
+class AsyncSingleFlight:
+    """
+    asyncio counterpart of SingleFlight: concurrent coroutines with the same key await one shared task
+    """
+
+    def __init__(self):
+        self._tasks: Dict[Hashable, asyncio.Future] = {}
+        self.executed = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, coro_fn) -> Any:
+        """Await coro_fn() unless an identical call is already in flight on this event loop"""
+        key = (id(asyncio.get_running_loop()), key)
+        task = self._tasks.get(key)
+        if task is not None:
+            self.coalesced += 1
+            return await asyncio.shield(task)
+
+        self.executed += 1
+        task = asyncio.ensure_future(coro_fn())
+        self._tasks[key] = task
+        try:
+            return await asyncio.shield(task)
+        finally:
+            if task.done():
+                self._tasks.pop(key, None)
+            else:
+                task.add_done_callback(lambda _: self._tasks.pop(key, None))
+
+    def stats(self) -> Dict:
+        """Return how many calls were executed and how many were served by an in-flight call"""
+        return {"executed": self.executed, "coalesced": self.coalesced, "in_flight": len(self._tasks)}
+
+
+class AsyncMarketDataClient:
+    """
+    Non-blocking HTTP client for market data APIs (CoinGecko), built on aiohttp
+
+    Responsibilities:
+    - Keep one aiohttp session (connection pool) per event loop
+    - Share endpoint timeouts and TTL caches with the synchronous MarketDataClient
+    - Coalesce identical concurrent requests
+    - Go through the same process-wide rate limiter, retry policy and circuit breaker as the sync client
+    - Raise requests exceptions so async tools keep the same error handling as sync tools
+    """
+
+    def __init__(self, sync_client: Optional[MarketDataClient] = None):
+        self._sync_client = sync_client
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._session_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._session_closers = set()  # strong references to the pending per-loop closer tasks
+        self.in_flight = AsyncSingleFlight()
+
+    @property
+    def sync_client(self) -> MarketDataClient:
+        """The synchronous client whose configuration and caches are shared"""
+        return self._sync_client or get_market_data_client()
+
+    @property
+    def caches(self):
+        return self.sync_client.caches
+
+    def _timeout_for(self, endpoint: Optional[str]) -> aiohttp.ClientTimeout:
+        timeout = self.sync_client.timeout_for(endpoint)
+        if isinstance(timeout, tuple):
+            connect, read = timeout
+            return aiohttp.ClientTimeout(sock_connect=connect, sock_read=read, total=connect + read)
+        return aiohttp.ClientTimeout(total=timeout)
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Return the session bound to the running loop (a new loop, e.g. per asyncio.run, gets a new session)"""
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._session_loop is not loop:
+            connector = aiohttp.TCPConnector(limit=self.sync_client.pool_maxsize, keepalive_timeout=30)
+            self._session = aiohttp.ClientSession(connector=connector, headers={"Accept": "application/json"})
+            self._session_loop = loop
+            closer = loop.create_task(self._close_on_shutdown(self._session))
+            self._session_closers.add(closer)
+            closer.add_done_callback(self._session_closers.discard)
+        return self._session
+
+    @staticmethod
+    async def _close_on_shutdown(session: aiohttp.ClientSession):
+        """
+        Close the session when its event loop shuts down: asyncio.run() cancels this pending task and
+        runs it to completion before closing the loop, so a session never outlives its loop
+        """
+        try:
+            await asyncio.get_running_loop().create_future()
+        finally:
+            await session.close()
+
+    async def _request(self, path: str, params: Optional[Dict], endpoint: Optional[str]) -> Any:
+        """Send the request through the rate limiter, retrying throttled / failed attempts"""
+        url = f"{self.sync_client.base_url}/{path.lstrip('/')}"
+        rate_limiter = self.sync_client.rate_limiter
+        retry_policy = self.sync_client.retry_policy
+        attempt = 0
+        while True:
+            await rate_limiter.aacquire()
+            try:
+                async with self._get_session().get(url, params=params, timeout=self._timeout_for(endpoint)) as response:
+                    if retry_policy.should_retry(response.status, attempt):
+                        delay = retry_policy.backoff(attempt, response.headers.get("Retry-After"))
+                        print(f"CoinGecko returned {response.status}, retrying in {delay:.1f}s")
+                    elif response.status >= 400:
+                        error_response = requests.Response()
+                        error_response.status_code = response.status
+                        error_response.url = str(response.url)
+                        raise requests.exceptions.HTTPError(f"{response.status} Error: {response.reason} for url: {response.url}",
+                                                            response=error_response)
+                    else:
+                        return await response.json(content_type=None)
+            except asyncio.TimeoutError as e:
+                raise requests.exceptions.Timeout(f"Request to {url} timed out") from e
+            except aiohttp.ClientConnectionError as e:
+                if not retry_policy.should_retry(None, attempt):
+                    raise requests.exceptions.ConnectionError(str(e)) from e
+                delay = retry_policy.backoff(attempt)
+            except aiohttp.ClientError as e:
+                raise requests.exceptions.ConnectionError(str(e)) from e
+            except ValueError as e:
+                raise requests.exceptions.InvalidJSONError(str(e)) from e
+
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def get(self, path: str, params: Optional[Dict] = None, endpoint: Optional[str] = None, use_cache: bool = True) -> Any:
+        """
+        Performs a non-blocking GET request against the market data API and returns the parsed JSON.
+
+        Args:
+            path (str): API path relative to the base url (e.g., "/simple/price").
+            params (dict, optional): Query parameters.
+            endpoint (str, optional): Endpoint name used to look up the timeout and cache (e.g., "simple_price").
+            use_cache (bool): Whether to read/write the endpoint's response cache (default: True).
+
+        Returns:
+            Parsed JSON response.
+
+        Raises:
+            requests.exceptions.RequestException: If the request fails
+                (CircuitOpenError if the breaker is open and nothing is cached).
+        """
+        key = MarketDataClient.cache_key(path, params)
+        cache = self.caches.get(endpoint) if use_cache else None
+        if cache is not None:
+            cached = cache.get(key)
+            if cached is not None:
+                return cached
+
+        async def fetch():
+            # Checked by the single-flight leader only, so coalesced callers don't use up half-open trial permits
+            if not self.sync_client.breaker.allow_request():
+                raise self.sync_client.open_circuit_error()
+            data = await self._guarded_request(path, params, endpoint)
+            if cache is not None:
+                cache.set(key, data)
+            return data
+
+        try:
+            return await self.in_flight.do(key, fetch)
+        except requests.exceptions.RequestException as e:
+            if not is_upstream_failure(e):
+                raise
+            return serve_stale(cache, key, e)
+
+    async def _guarded_request(self, path: str, params: Optional[Dict], endpoint: Optional[str]) -> Any:
+        """Send the request and report its outcome to the shared circuit breaker"""
+        breaker = self.sync_client.breaker
+        try:
+            data = await self._request(path, params, endpoint)
+        except requests.exceptions.RequestException as e:
+            if is_upstream_failure(e):
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+            raise
+        breaker.record_success()
+        return data
+
+    async def close(self):
+        """Close the pooled connections of the current session"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+
+_async_client: Optional[AsyncMarketDataClient] = None
+
+
+def get_async_market_data_client() -> AsyncMarketDataClient:
+    """Return the process-wide async market data client, creating it on first use"""
+    global _async_client
+    if _async_client is None:
+        _async_client = AsyncMarketDataClient()
+    return _async_client
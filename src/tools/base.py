@@ -1,3 +1,4 @@
+import asyncio
 from typing import Any
 from abc import ABC, abstractmethod
 
@@ -14,6 +15,10 @@ class AgentTool(ABC):
         """Execute the tool"""
         pass
     
+    async def aexecute(self, **kwargs) -> Any:
+        """Execute the tool without blocking the event loop (runs execute in a worker thread by default)"""
+        return await asyncio.to_thread(self.execute, **kwargs)
+    
     @abstractmethod
     def to_langchain_tool(self):
         """Convert to LangChain tool format"""
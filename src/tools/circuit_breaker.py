@@ -0,0 +1,86 @@
+import time
+import threading
+from typing import Dict
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker guarding an upstream service
+
+    Responsibilities:
+    - Open after `failure_threshold` consecutive failures so callers fail fast instead of waiting for timeouts
+    - After `cooldown_seconds`, let up to `half_open_max_calls` probe requests through (half-open)
+    - Close again on a successful probe, re-open on a failed one
+    """
+
+    def __init__(self, failure_threshold: int = 5, cooldown_seconds: float = 30.0, half_open_max_calls: int = 1):
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.half_open_max_calls = half_open_max_calls
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._half_open_calls = 0
+        self._lock = threading.Lock()
+        self.times_opened = 0
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.cooldown_seconds:
+                return HALF_OPEN
+            return self._state
+
+    def retry_in(self) -> float:
+        """Seconds until the breaker lets a probe request through (0 if not open)"""
+        with self._lock:
+            if self._state != OPEN:
+                return 0.0
+            return max(0.0, self.cooldown_seconds - (time.monotonic() - self._opened_at))
+
+    def allow_request(self) -> bool:
+        """Whether a request may be sent now"""
+        with self._lock:
+            if self._state == OPEN:
+                if time.monotonic() - self._opened_at < self.cooldown_seconds:
+                    self.rejected += 1
+                    return False
+                self._state = HALF_OPEN
+                self._half_open_calls = 0
+
+            if self._state == HALF_OPEN:
+                if self._half_open_calls >= self.half_open_max_calls:
+                    self.rejected += 1
+                    return False
+                self._half_open_calls += 1
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._state = CLOSED
+            self._failures = 0
+            self._half_open_calls = 0
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != OPEN:
+                    self.times_opened += 1
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+                self._half_open_calls = 0
+
+    def stats(self) -> Dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self._failures,
+            "times_opened": self.times_opened,
+            "rejected": self.rejected,
+            "retry_in_seconds": round(self.retry_in(), 1),
+        }
@@ -0,0 +1,8 @@
+from typing import List, Union
+
+
+def to_id_list(values: Union[List[str], str]) -> List[str]:
+    """Accept a list or a comma-separated string of ids and return a clean list"""
+    if isinstance(values, str):
+        values = values.split(",")
+    return [value.strip().lower() for value in values if value and value.strip()]
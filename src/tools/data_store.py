@@ -0,0 +1,123 @@
+import os
+import hashlib
+import threading
+import numpy as np
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Union
+
+HANDLE_PREFIX = "arr:"
+DEFAULT_MAXSIZE = int(os.getenv("DATA_STORE_MAXSIZE", "512"))
+
+ArrayLike = Union[List[float], np.ndarray, str]
+
+
+class DataStore:
+    """
+    Server-side store for numeric series referenced by short handles in tool arguments
+
+    Responsibilities:
+    - Keep arrays out of LLM messages: tools return a handle (e.g. "arr:3f9a1c2b7d4e") instead of the raw list
+    - Derive handles from the content hash, so storing the same series twice reuses one entry
+    - Evict the least recently used arrays once `maxsize` arrays are held
+    - Hand out read-only arrays so tools cannot modify shared data
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_MAXSIZE):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def handle_for(array: np.ndarray) -> str:
+        digest = hashlib.blake2b(digest_size=6)
+        digest.update(str((array.dtype.str, array.shape)).encode())
+        digest.update(np.ascontiguousarray(array).tobytes())
+        return f"{HANDLE_PREFIX}{digest.hexdigest()}"
+
+    def put(self, values: Any) -> str:
+        """Store a numeric series and return its handle"""
+        array = np.array(values, dtype=float)
+        array.setflags(write=False)
+        handle = self.handle_for(array)
+        with self._lock:
+            self._data[handle] = array
+            self._data.move_to_end(handle)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return handle
+
+    def get(self, handle: str) -> np.ndarray:
+        """Return the array stored under handle"""
+        with self._lock:
+            array = self._data.get(handle)
+            if array is None:
+                raise KeyError(f"Unknown or expired data handle {handle!r}: fetch the data again")
+            self._data.move_to_end(handle)
+            return array
+
+    def __contains__(self, handle: str) -> bool:
+        with self._lock:
+            return handle in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict:
+        """Return occupancy of the store"""
+        with self._lock:
+            nbytes = sum(array.nbytes for array in self._data.values())
+        return {"size": len(self._data), "maxsize": self.maxsize, "bytes": nbytes}
+
+
+_store: Optional[DataStore] = None
+_store_lock = threading.Lock()
+
+
+def get_data_store() -> DataStore:
+    """Return the process-wide data store, creating it on first use"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = DataStore()
+    return _store
+
+
+def is_handle(value: Any) -> bool:
+    return isinstance(value, str) and value.startswith(HANDLE_PREFIX)
+
+
+def resolve_array(value: ArrayLike) -> np.ndarray:
+    """Return a float array for a list of numbers or a data handle"""
+    if is_handle(value):
+        return get_data_store().get(value)
+    return np.asarray(value, dtype=float)
+
+
+def resolve_series_dict(data: Dict[str, ArrayLike]) -> Dict[str, np.ndarray]:
+    """Resolve every value of a {name: list-or-handle} mapping to a float array"""
+    return {name: resolve_array(values) for name, values in data.items()}
+
+
+def summarize_series(values: np.ndarray) -> Dict:
+    """
+    Returns a compact summary of a series for the LLM (instead of the full list).
+
+    Returns:
+        dict: Example: {"points": 61, "first": 85210.5, "last": 92391.2, "min": 84100.0, "max": 98107.3, "change_pct": 8.43}
+    """
+    if len(values) == 0:
+        return {"points": 0}
+    first, last = values[0].item(), values[-1].item()
+    return {
+        "points": len(values),
+        "first": round(first, 2),
+        "last": round(last, 2),
+        "min": round(values.min().item(), 2),
+        "max": round(values.max().item(), 2),
+        "change_pct": round((last - first) / first * 100, 2) if first else None,
+    }
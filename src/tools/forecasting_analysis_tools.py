@@ -1,59 +1,126 @@
+import asyncio
 import requests
 import numpy as np
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Union
+from src.tools.price_history_store import get_price_history_store
+from src.tools.market_data_client import report_data_status
+from src.tools.data_store import get_data_store, resolve_array, summarize_series
+from src.tools.indicators import batch_indicators, price_analysis_series
+from src.tools.indicator_state import get_indicator_state_store
+from src.tools.memoize import memoize
+from src.tools.portfolio_math import align_series
+from src.tools.coin_ids import to_id_list
 
-def get_historical_close_prices_and_volumes(coin_id: str = "bitcoin", vs_currency: str = "usd", days: int = 30) -> Optional[Dict]:
+@report_data_status
+def get_historical_close_prices_and_volumes(coin_id: str = "bitcoin", vs_currency: str = "usd", days: int = 30, include_raw: bool = False) -> Optional[Dict]:
     """
     Fetches historical Close prices and Volume data for a cryptocurrency. 
-    Only daily interval prices can be fetched.
+    Only daily interval prices can be fetched. Data is served from the local price history store,
+    which only requests the days missing since its last sync.
+    The prices and volumes are kept server-side and returned as data handles (e.g. "arr:3f9a1c2b7d4e"):
+    pass the handles as-is to the analysis tools instead of copying numbers.
     
     Args:
         coin_id (str): CoinGecko coin ID (e.g., "bitcoin", "ethereum").
         vs_currency (str): Currency to price against (default: "usd").
         days (int): Number of days of historical data (default: 30).
+        include_raw (bool): Return the full price and volume lists instead of handles (default: False).
     
     Returns:
-        dict: Historical price and volume data.
+        dict: Handles to the historical price and volume data, with a summary of the prices.
               Example for bitcoin 30 days: {
                   "coin_id": "bitcoin",
-                  "days": 30
-                  "prices": [...],
-                  "volumes": [...],
+                  "days": 30,
+                  "prices": "arr:3f9a1c2b7d4e",
+                  "volumes": "arr:9b0e44d1a2c7",
+                  "timestamps": "arr:7c21e0b94f3d",  # ms since epoch, one per price
+                  "summary": {"points": 31, "first": 85210.5, "last": 92391.2, "min": 84100.0, "max": 93500.1, "change_pct": 8.43}
               }
         None: If the request fails.
     """
     try:
-        url = f"https://api.coingecko.com/api/v3/coins/{coin_id}/market_chart"
-        params = {
-            "vs_currency": vs_currency,
-            "days": days,
-            "interval": "daily"
-        }
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()
-        
-        data = response.json()
-        prices = [price[1] for price in data["prices"]]
-        volumes = [volume[1] for volume in data["total_volumes"]]
-
-        result = {}
-        result["coin_id"] = coin_id
-        result["days"] = days
-        result['prices'] = prices
-        result['volumes'] = volumes
-        return result
+        series = get_price_history_store().get_series(coin_id, vs_currency, days)
+        return _price_volume_result(coin_id, days, series, include_raw)
+    
+    except requests.exceptions.RequestException as e:
+        print(f"Error fetching historical OHLCV data: {e}")
+        return None
+
+@report_data_status
+async def aget_historical_close_prices_and_volumes(coin_id: str = "bitcoin", vs_currency: str = "usd", days: int = 30, include_raw: bool = False) -> Optional[Dict]:
+    """Async version of get_historical_close_prices_and_volumes()"""
+    try:
+        series = await get_price_history_store().aget_series(coin_id, vs_currency, days)
+        return _price_volume_result(coin_id, days, series, include_raw)
     
     except requests.exceptions.RequestException as e:
         print(f"Error fetching historical OHLCV data: {e}")
         return None
 
-def calculate_technical_indicators(prices: List[float]) -> Optional[Dict]:
+def _price_volume_result(coin_id: str, days: int, series: Dict, include_raw: bool) -> Dict:
+    if include_raw:
+        return {"coin_id": coin_id, "days": days, "prices": series["prices"], "volumes": series["volumes"],
+                "timestamps": series["timestamps"]}
+    store = get_data_store()
+    prices = np.array(series["prices"], dtype=float)
+    return {
+        "coin_id": coin_id,
+        "days": days,
+        "prices": store.put(prices),
+        "volumes": store.put(series["volumes"]),
+        "timestamps": store.put(series["timestamps"]),
+        "summary": summarize_series(prices),
+    }
+
+@report_data_status
+def get_latest_technical_indicators(coin_id: str = "bitcoin", vs_currency: str = "usd") -> Optional[Dict]:
+    """
+    Returns the latest technical indicators and trend metrics for a cryptocurrency in one call,
+    without fetching or passing price data. Indicators are kept as persisted streaming state that is
+    only advanced by the days completed since the last call, with the latest intraday price applied on top.
+    
+    Args:
+        coin_id (str): CoinGecko coin ID (e.g., "bitcoin", "ethereum").
+        vs_currency (str): Currency to price against (default: "usd").
+    
+    Returns:
+        dict: Latest indicators (same fields as calculate_technical_indicators and analyze_price_volume_trend).
+              Example: {
+                  "rsi_14": 58.5, "sma_20": 30500, "sma_50": 29800, "ema_12": 31200,
+                  "7d_return": 5.2, "30d_return": 15.8, "volatility_30d": 45.5,
+                  "current_price": 32000, "price_vs_sma20": "above", "trend_signal": "bullish",
+                  "momentum": "positive", "strength": "moderate", "volume_trend": "increasing",
+                  "as_of": 1700000000000  # timestamp (ms) of the latest price used
+              }
+        None: If the request fails.
+    """
+    try:
+        return get_indicator_state_store().get_indicators(coin_id, vs_currency)
+    
+    except requests.exceptions.RequestException as e:
+        print(f"Error updating technical indicators: {e}")
+        return None
+
+@report_data_status
+async def aget_latest_technical_indicators(coin_id: str = "bitcoin", vs_currency: str = "usd") -> Optional[Dict]:
+    """Async version of get_latest_technical_indicators()"""
+    try:
+        return await get_indicator_state_store().aget_indicators(coin_id, vs_currency)
+    
+    except requests.exceptions.RequestException as e:
+        print(f"Error updating technical indicators: {e}")
+        return None
+
+@memoize()
+def calculate_technical_indicators(prices: Union[List[float], str], series: bool = False) -> Optional[Dict]:
     """
     Calculates common technical indicators (RSI, SMA, EMA) from price data.
     
     Args:
-        prices (list): List of historical closing prices (chronological order, oldest first).
+        prices (list or str): Data handle returned by get_historical_close_prices_and_volumes (e.g. "arr:3f9a1c2b7d4e"),
+                      or a list of historical closing prices (chronological order, oldest first).
                       Example: [30000, 31000, 29500, 32000, ...]
+        series (bool): Also return the full indicator series as data handles (default: False).
     
     Returns:
         dict: Technical indicators.
@@ -66,84 +133,32 @@ def calculate_technical_indicators(prices: List[float]) -> Optional[Dict]:
                   "price_vs_sma20": "above",  # "above" or "below"
                   "trend_signal": "bullish"  # "bullish", "bearish", or "neutral"
               }
+              With series=True, a "series" entry holds one handle per indicator (same length as prices,
+              null before enough history): {"rsi_14": "arr:...", "sma_20": "arr:...", "sma_50": "arr:...", "ema_12": "arr:..."}
         None: If calculation fails.
     """
     try:
-        if len(prices) < 50:
+        analysis = price_analysis_series(resolve_array(prices))
+        if len(analysis["prices"]) < 50:
             print("Warning: Need at least 50 data points for accurate indicators")
         
-        prices_array = np.array(prices)
-        current_price = prices_array[-1]
-        
-        # Calculate RSI (14-period)
-        def calculate_rsi(prices, period=14):
-            deltas = np.diff(prices)
-            gains = np.where(deltas > 0, deltas, 0)
-            losses = np.where(deltas < 0, -deltas, 0)
-            
-            # First average
-            avg_gain = np.mean(gains[:period])
-            avg_loss = np.mean(losses[:period])
-            
-            # EMA for subsequent values
-            for i in range(period, len(gains)):
-                avg_gain = (avg_gain * (period - 1) + gains[i]) / period
-                avg_loss = (avg_loss * (period - 1) + losses[i]) / period
-            
-            if avg_loss == 0:
-                return 100
-            
-            rs = avg_gain / avg_loss
-            rsi = 100 - (100 / (1 + rs))
-            return rsi
-        
-        rsi_14 = calculate_rsi(prices_array, 14) if len(prices) >= 15 else None
-        
-        # Calculate SMAs
-        sma_20 = np.mean(prices_array[-20:]) if len(prices) >= 20 else None
-        sma_50 = np.mean(prices_array[-50:]) if len(prices) >= 50 else None
-        
-        # Calculate EMA (12-period)
-        def calculate_ema(prices, period=12):
-            ema = [prices[0]]
-            multiplier = 2 / (period + 1)
-            for price in prices[1:]:
-                ema.append((price * multiplier) + (ema[-1] * (1 - multiplier)))
-            return ema[-1]
-        
-        ema_12 = calculate_ema(prices_array, 12) if len(prices) >= 12 else None
-        
-        # Determine trend signal
-        trend_signal = "neutral"
-        if sma_20 and sma_50:
-            if current_price > sma_20 > sma_50:
-                trend_signal = "bullish"
-            elif current_price < sma_20 < sma_50:
-                trend_signal = "bearish"
-        
-        price_vs_sma20 = "above" if sma_20 and current_price > sma_20 else "below"
-        
-        return {
-            "rsi_14": round(rsi_14.item(), 2) if rsi_14 else None,
-            "sma_20": round(sma_20.item(), 2) if sma_20 else None,
-            "sma_50": round(sma_50.item(), 2) if sma_50 else None,
-            "ema_12": round(ema_12.item(), 2) if ema_12 else None,
-            "current_price": round(current_price.item(), 2),
-            "price_vs_sma20": price_vs_sma20 if sma_20 else None,
-            "trend_signal": trend_signal
-        }
+        result = _technical_view(analysis)
+        if series:
+            result["series"] = _series_handles(analysis, ["rsi_14", "sma_20", "sma_50", "ema_12"])
+        return result
     
     except Exception as e:
         print(f"Error calculating technical indicators: {e}")
         return None
 
-def analyze_price_volume_trend(prices: List[float], volumes: Optional[List[float]] = None) -> Optional[Dict]:
+@memoize()
+def analyze_price_volume_trend(prices: Union[List[float], str], volumes: Optional[Union[List[float], str]] = None) -> Optional[Dict]:
     """
     Analyzes price trends and momentum over different time periods. Volume can also be passed.
     
     Args:
-        prices (list): List of historical closing prices (chronological order).
-        volumes (list, optional): List of trading volumes corresponding to prices.
+        prices (list or str): Data handle of the prices (e.g. "arr:3f9a1c2b7d4e"), or a list of historical closing prices (chronological order).
+        volumes (list or str, optional): Data handle of the volumes, or a list of trading volumes corresponding to prices.
     
     Returns:
         dict: Trend analysis metrics.
@@ -158,66 +173,288 @@ def analyze_price_volume_trend(prices: List[float], volumes: Optional[List[float
         None: If calculation fails.
     """
     try:
-        prices_array = np.array(prices)
-        current_price = prices_array[-1]
-        
-        # Calculate returns for different periods
-        def calculate_return(start_idx):
-            if len(prices_array) > abs(start_idx):
-                start_price = prices_array[start_idx]
-                return ((current_price - start_price) / start_price) * 100
-            return None
-        
-        return_7d = calculate_return(-7)
-        return_30d = calculate_return(-30)
+        analysis = price_analysis_series(resolve_array(prices), resolve_array(volumes) if volumes is not None else None)
+        return _trend_view(analysis)
+    
+    except Exception as e:
+        print(f"Error analyzing price trend: {e}")
+        return None
+
+@memoize()
+def analyze_price_action(prices: Union[List[float], str], volumes: Optional[Union[List[float], str]] = None, series: bool = False) -> Optional[Dict]:
+    """
+    Full technical analysis in one call: everything from calculate_technical_indicators and
+    analyze_price_volume_trend, plus MACD (12/26/9), Bollinger bands (20, 2 std) and On-Balance Volume.
+    Prefer this over calling the two tools separately on the same data.
+    
+    Args:
+        prices (list or str): Data handle of the prices (e.g. "arr:3f9a1c2b7d4e"), or a list of historical closing prices (chronological order).
+        volumes (list or str, optional): Data handle of the volumes, or a list of trading volumes corresponding to prices.
+        series (bool): Also return the full indicator series as data handles (default: False).
+    
+    Returns:
+        dict: Combined analysis.
+              Example: {
+                  "rsi_14": 58.5, "sma_20": 30500, "sma_50": 29800, "ema_12": 31200,
+                  "current_price": 32000, "price_vs_sma20": "above", "trend_signal": "bullish",
+                  "7d_return": 5.2, "30d_return": 15.8, "volatility_30d": 45.5,
+                  "momentum": "positive", "strength": "moderate", "volume_trend": "increasing",
+                  "macd": {"macd": 410.2, "signal": 350.7, "histogram": 59.5, "crossover": "bullish"},
+                  "bollinger": {"upper": 32900, "middle": 30500, "lower": 28100, "percent_b": 0.81, "bandwidth": 0.157},
+                  "obv": {"obv": 1.2e11, "obv_trend": "rising"}  # only when volumes are given
+              }
+              With series=True, a "series" entry holds one handle per indicator series.
+        None: If calculation fails.
+    """
+    try:
+        analysis = price_analysis_series(resolve_array(prices), resolve_array(volumes) if volumes is not None else None)
+        result = {**_technical_view(analysis), **_trend_view(analysis)}
+        result.update(_extended_view(analysis))
+        if series:
+            names = ["rsi_14", "sma_20", "sma_50", "ema_12", "macd", "macd_signal", "bollinger_upper", "bollinger_lower"]
+            result["series"] = _series_handles(analysis, names + (["obv"] if "obv" in analysis else []))
+        return result
+    
+    except Exception as e:
+        print(f"Error analyzing price action: {e}")
+        return None
+
+def _series_handles(analysis: Dict[str, np.ndarray], names: List[str]) -> Dict[str, str]:
+    store = get_data_store()
+    return {name: store.put(analysis[name]) for name in names}
+
+def _technical_view(analysis: Dict[str, np.ndarray]) -> Dict:
+    """RSI / SMA / EMA summary (calculate_technical_indicators)"""
+    n = len(analysis["prices"])
+    current_price = analysis["prices"][-1]
+    rsi_14 = analysis["rsi_14"][-1] if n >= 15 else None
+    sma_20 = analysis["sma_20"][-1] if n >= 20 else None
+    sma_50 = analysis["sma_50"][-1] if n >= 50 else None
+    ema_12 = analysis["ema_12"][-1] if n >= 12 else None
+    
+    # Determine trend signal
+    trend_signal = "neutral"
+    if sma_20 and sma_50:
+        if current_price > sma_20 > sma_50:
+            trend_signal = "bullish"
+        elif current_price < sma_20 < sma_50:
+            trend_signal = "bearish"
+    
+    price_vs_sma20 = "above" if sma_20 and current_price > sma_20 else "below"
+    
+    return {
+        "rsi_14": round(rsi_14.item(), 2) if rsi_14 else None,
+        "sma_20": round(sma_20.item(), 2) if sma_20 else None,
+        "sma_50": round(sma_50.item(), 2) if sma_50 else None,
+        "ema_12": round(ema_12.item(), 2) if ema_12 else None,
+        "current_price": round(current_price.item(), 2),
+        "price_vs_sma20": price_vs_sma20 if sma_20 else None,
+        "trend_signal": trend_signal
+    }
+
+def _trend_view(analysis: Dict[str, np.ndarray]) -> Dict:
+    """Returns / volatility / momentum / volume summary (analyze_price_volume_trend)"""
+    prices_array = analysis["prices"]
+    current_price = prices_array[-1]
+    
+    # Calculate returns for different periods
+    def calculate_return(start_idx):
+        if len(prices_array) > abs(start_idx):
+            start_price = prices_array[start_idx]
+            return ((current_price - start_price) / start_price) * 100
+        return None
+    
+    return_7d = calculate_return(-7)
+    return_30d = calculate_return(-30)
+    
+    # Volatility (annualized) from the shared daily returns
+    volatility_30d = np.std(analysis["returns"][-30:]) * np.sqrt(252) * 100 if len(prices_array) >= 30 else None
+    
+    # Determine momentum
+    momentum = "neutral"
+    strength = "weak"
+    
+    if return_7d is not None:
+        if return_7d > 5:
+            momentum = "positive"
+            strength = "strong" if return_7d > 10 else "moderate"
+        elif return_7d < -5:
+            momentum = "negative"
+            strength = "strong" if return_7d < -10 else "moderate"
+    
+    # Volume trend analysis
+    volume_trend = None
+    volumes = analysis.get("volumes")
+    if volumes is not None and len(volumes) >= 14:
+        recent_vol_avg = np.mean(volumes[-7:])
+        previous_vol_avg = np.mean(volumes[-14:-7])
+        vol_change = ((recent_vol_avg - previous_vol_avg) / previous_vol_avg) * 100
         
-        # Calculate volatility (annualized)
-        if len(prices_array) >= 30:
-            returns = np.diff(prices_array) / prices_array[:-1]
-            volatility_30d = np.std(returns[-30:]) * np.sqrt(252) * 100
+        if vol_change > 20:
+            volume_trend = "increasing"
+        elif vol_change < -20:
+            volume_trend = "decreasing"
         else:
-            volatility_30d = None
-        
-        # Determine momentum
-        momentum = "neutral"
-        strength = "weak"
-        
-        if return_7d is not None:
-            if return_7d > 5:
-                momentum = "positive"
-                strength = "strong" if return_7d > 10 else "moderate"
-            elif return_7d < -5:
-                momentum = "negative"
-                strength = "strong" if return_7d < -10 else "moderate"
-        
-        # Volume trend analysis
-        volume_trend = None
-        if volumes and len(volumes) >= 14:
-            recent_vol_avg = np.mean(volumes[-7:])
-            previous_vol_avg = np.mean(volumes[-14:-7])
-            vol_change = ((recent_vol_avg - previous_vol_avg) / previous_vol_avg) * 100
-            
-            if vol_change > 20:
-                volume_trend = "increasing"
-            elif vol_change < -20:
-                volume_trend = "decreasing"
-            else:
-                volume_trend = "stable"
-        
-        return {
-            "7d_return": round(return_7d.item(), 2) if return_7d else None,
-            "30d_return": round(return_30d.item(), 2) if return_30d else None,
-            "volatility_30d": round(volatility_30d.item(), 2) if volatility_30d else None,
-            "momentum": momentum,
-            "strength": strength,
-            "volume_trend": volume_trend,
-            "current_price": round(current_price.item(), 2)
+            volume_trend = "stable"
+    
+    return {
+        "7d_return": round(return_7d.item(), 2) if return_7d else None,
+        "30d_return": round(return_30d.item(), 2) if return_30d else None,
+        "volatility_30d": round(volatility_30d.item(), 2) if volatility_30d else None,
+        "momentum": momentum,
+        "strength": strength,
+        "volume_trend": volume_trend,
+        "current_price": round(current_price.item(), 2)
+    }
+
+def _extended_view(analysis: Dict[str, np.ndarray]) -> Dict:
+    """MACD / Bollinger / OBV summary (analyze_price_action)"""
+    n = len(analysis["prices"])
+    current_price = analysis["prices"][-1].item()
+    result = {"macd": None, "bollinger": None}
+    
+    if n >= 35:  # 26 periods for the slow EMA + 9 for the signal line
+        macd, signal = analysis["macd"][-1].item(), analysis["macd_signal"][-1].item()
+        previous_histogram = analysis["macd_histogram"][-2].item()
+        crossover = None
+        if previous_histogram <= 0 < macd - signal:
+            crossover = "bullish"
+        elif previous_histogram >= 0 > macd - signal:
+            crossover = "bearish"
+        result["macd"] = {"macd": round(macd, 4), "signal": round(signal, 4), "histogram": round(macd - signal, 4),
+                          "crossover": crossover}
+    
+    if n >= 20:
+        upper, lower = analysis["bollinger_upper"][-1].item(), analysis["bollinger_lower"][-1].item()
+        middle = analysis["sma_20"][-1].item()
+        result["bollinger"] = {
+            "upper": round(upper, 2),
+            "middle": round(middle, 2),
+            "lower": round(lower, 2),
+            "percent_b": round((current_price - lower) / (upper - lower), 3) if upper > lower else None,
+            "bandwidth": round(analysis["bandwidth"][-1].item(), 4),
         }
     
+    if "obv" in analysis:
+        obv = analysis["obv"]
+        obv_trend = None
+        if len(obv) >= 8:
+            obv_change = obv[-1] - obv[-8]
+            obv_trend = "rising" if obv_change > 0 else "falling" if obv_change < 0 else "flat"
+        result["obv"] = {"obv": round(obv[-1].item(), 2), "obv_trend": obv_trend}
+    return result
+
+# ==================== Multi-Coin Screening ====================
+
+SCREEN_COLUMNS = ["rank", "coin_id", "score", "trend_signal", "rsi_14", "7d_return", "30d_return",
+                  "volatility_30d", "current_price", "sma_20", "sma_50", "ema_12"]
+
+@report_data_status
+def screen_technical_indicators(coin_ids: Union[List[str], str], vs_currency: str = "usd", days: int = 60,
+                                sort_by: str = "score", top_n: Optional[int] = None) -> Optional[Dict]:
+    """
+    Computes technical indicators for many cryptocurrencies in one call and returns them as a ranked table.
+    Use this to screen a list of coins (e.g. "which of these look bullish?") instead of analyzing them one by one.
+    
+    Score (-4 to +4, higher = more bullish), one point each:
+        price above (+1) / below (-1) SMA-20, SMA-20 above (+1) / below (-1) SMA-50,
+        7d return above +5% (+1) / below -5% (-1), RSI-14 between 50 and 70 (+1) / below 40 (-1).
+    
+    Args:
+        coin_ids (list or str): CoinGecko coin IDs, as a list or comma-separated string (e.g., ["bitcoin", "ethereum", "solana"]).
+        vs_currency (str): Currency to price against (default: "usd").
+        days (int): Days of history per coin (default: 60, use 60+ for SMA-50).
+        sort_by (str): Column to rank by, descending (default: "score"; e.g. "7d_return", "rsi_14", "volatility_30d").
+        top_n (int, optional): Only return the first `top_n` rows.
+    
+    Returns:
+        dict: Ranked table.
+              Example: {
+                  "columns": ["rank", "coin_id", "score", "trend_signal", "rsi_14", "7d_return", ...],
+                  "rows": [[1, "solana", 4, "bullish", 62.5, 12.5, ...], [2, "bitcoin", 1, "neutral", 49.3, 3.1, ...]],
+                  "coins_screened": 2,
+                  "failed": []  # coins whose data could not be fetched
+              }
+        None: If the screen fails.
+    """
+    try:
+        coin_ids = list(dict.fromkeys(to_id_list(coin_ids)))
+        store = get_price_history_store()
+        series_by_coin, failed = {}, []
+        for coin_id in coin_ids:
+            try:
+                series_by_coin[coin_id] = store.get_series(coin_id, vs_currency, days)
+            except requests.exceptions.RequestException as e:
+                print(f"Error fetching historical data for {coin_id}: {e}")
+                failed.append(coin_id)
+        return _screen_table(series_by_coin, failed, sort_by, top_n)
+    
     except Exception as e:
-        print(f"Error analyzing price trend: {e}")
+        print(f"Error screening technical indicators: {e}")
         return None
 
+@report_data_status
+async def ascreen_technical_indicators(coin_ids: Union[List[str], str], vs_currency: str = "usd", days: int = 60,
+                                       sort_by: str = "score", top_n: Optional[int] = None) -> Optional[Dict]:
+    """Async version of screen_technical_indicators(): the coins are fetched concurrently"""
+    try:
+        coin_ids = list(dict.fromkeys(to_id_list(coin_ids)))
+        store = get_price_history_store()
+        results = await asyncio.gather(*[store.aget_series(coin_id, vs_currency, days) for coin_id in coin_ids],
+                                       return_exceptions=True)
+        series_by_coin, failed = {}, []
+        for coin_id, result in zip(coin_ids, results):
+            if isinstance(result, requests.exceptions.RequestException):
+                print(f"Error fetching historical data for {coin_id}: {result}")
+                failed.append(coin_id)
+            elif isinstance(result, BaseException):
+                raise result
+            else:
+                series_by_coin[coin_id] = result
+        return _screen_table(series_by_coin, failed, sort_by, top_n)
+    
+    except Exception as e:
+        print(f"Error screening technical indicators: {e}")
+        return None
+
+def _aligned_price_matrix(series_by_coin: Dict[str, Dict]) -> np.ndarray:
+    """Align daily series on their calendar day (coins x days, NaN where a coin has no price)"""
+    return align_series(series_by_coin, gaps=None)[2].T
+
+def _technical_scores(metrics: Dict[str, np.ndarray]) -> tuple:
+    """Vectorized score and trend signal for every coin (see screen_technical_indicators)"""
+    price, sma_20, sma_50 = metrics["current_price"], metrics["sma_20"], metrics["sma_50"]
+    rsi, return_7d = metrics["rsi_14"], metrics["7d_return"]
+    with np.errstate(invalid="ignore"):
+        score = (np.nan_to_num(np.sign(price - sma_20)) + np.nan_to_num(np.sign(sma_20 - sma_50))
+                 + (return_7d > 5) - (return_7d < -5)
+                 + ((rsi >= 50) & (rsi <= 70)) - (rsi < 40))
+        trend = np.where((price > sma_20) & (sma_20 > sma_50), "bullish",
+                         np.where((price < sma_20) & (sma_20 < sma_50), "bearish", "neutral"))
+    return score.astype(int), trend
+
+def _screen_table(series_by_coin: Dict[str, Dict], failed: List[str], sort_by: str, top_n: Optional[int]) -> Dict:
+    if sort_by not in SCREEN_COLUMNS[2:] or sort_by == "trend_signal":
+        raise ValueError(f"Cannot sort by {sort_by!r}")
+    coins = list(series_by_coin)
+    metrics = batch_indicators(_aligned_price_matrix(series_by_coin)) if coins else {}
+    if coins:
+        metrics["score"], metrics["trend_signal"] = _technical_scores(metrics)
+
+    # Rank descending, coins without a value last
+    key = np.asarray(metrics.get(sort_by, []), dtype=float)
+    order = np.argsort(-np.nan_to_num(key, nan=-np.inf), kind="stable")
+    if top_n is not None:
+        order = order[:int(top_n)]
+
+    def cell(name, i):
+        value = metrics[name][i]
+        if isinstance(value, str):
+            return str(value)
+        return None if np.isnan(value) else (int(value) if name == "score" else round(float(value), 2))
+
+    rows = [[rank, coins[i]] + [cell(name, i) for name in SCREEN_COLUMNS[2:]] for rank, i in enumerate(order, start=1)]
+    return {"columns": SCREEN_COLUMNS, "rows": rows, "coins_screened": len(coins), "failed": failed}
 
 # ==================== Test Function ====================
 
@@ -229,7 +466,7 @@ def test_forecasting_analysis_tools():
     
     # Test 1: Get Historical OHLCV
     print("1. Fetching Historical OHLCV for Bitcoin (30 days):")
-    data = get_historical_close_prices_and_volumes("bitcoin", "usd", 30)
+    data = get_historical_close_prices_and_volumes("bitcoin", "usd", 30, include_raw=True)
     if data:
         prices, volumes = data['prices'], data['volumes']
         print(f"Data points: {len(prices)}")
@@ -0,0 +1,561 @@
+import os
+import json
+import math
+import bisect
+import tempfile
+import asyncio
+import threading
+from collections import deque
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, Optional
+from src.tools.price_history_store import DEFAULT_STORE_DIR, get_price_history_store
+
+# Indicator states are persisted next to the price history files
+DEFAULT_STATE_DIR = os.path.join(DEFAULT_STORE_DIR, "indicator_state")
+# Days of stored history used to build a new state
+DEFAULT_WARMUP_DAYS = 365
+
+
+class IndicatorState(ABC):
+    """
+    Abstract base class for streaming indicators: built once from history, then updated in O(1) per new close
+
+    Subclasses implement update() (consume a value), peek() (value as if one more value arrived,
+    without changing the state), value, and to_dict()/from_dict() for persistence.
+    """
+
+    @classmethod
+    def from_history(cls, values: Iterable[float], **params) -> "IndicatorState":
+        state = cls(**params)
+        for value in values:
+            state.update(value)
+        return state
+
+    @abstractmethod
+    def update(self, value: float) -> Optional[float]:
+        """Consume one value and return the updated indicator"""
+        pass
+
+    @abstractmethod
+    def peek(self, value: float) -> Optional[float]:
+        """Indicator as if `value` arrived next, without changing the state"""
+        pass
+
+    @property
+    @abstractmethod
+    def value(self) -> Optional[float]:
+        """Current indicator value (None until enough values were seen)"""
+        pass
+
+    @abstractmethod
+    def to_dict(self) -> Dict:
+        """Serialize the state for persistence"""
+        pass
+
+    @classmethod
+    @abstractmethod
+    def from_dict(cls, data: Dict) -> "IndicatorState":
+        """Restore a state serialized by to_dict()"""
+        pass
+
+
+class EMAState(IndicatorState):
+    """Exponential moving average seeded with the first price (multiplier 2 / (period + 1))"""
+
+    def __init__(self, period: int = 12):
+        self.period = period
+        self.alpha = 2 / (period + 1)
+        self.ema: Optional[float] = None
+        self.count = 0
+
+    def _next(self, price: float) -> float:
+        return price if self.ema is None else price * self.alpha + self.ema * (1 - self.alpha)
+
+    def update(self, price: float) -> Optional[float]:
+        self.ema = self._next(price)
+        self.count += 1
+        return self.value
+
+    def peek(self, price: float) -> Optional[float]:
+        return self._next(price) if self.count + 1 >= self.period else None
+
+    @property
+    def value(self) -> Optional[float]:
+        return self.ema if self.count >= self.period else None
+
+    def to_dict(self) -> Dict:
+        return {"period": self.period, "ema": self.ema, "count": self.count}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "EMAState":
+        state = cls(data["period"])
+        state.ema, state.count = data["ema"], data["count"]
+        return state
+
+
+class SMAState(IndicatorState):
+    """Simple moving average over the last `window` prices, kept as a running sum"""
+
+    def __init__(self, window: int = 20):
+        self.window = window
+        self.values: deque = deque(maxlen=window)
+        self.total = 0.0
+        self.updates = 0
+
+    def update(self, price: float) -> Optional[float]:
+        if len(self.values) == self.window:
+            self.total -= self.values[0]
+        self.values.append(price)
+        self.total += price
+        self.updates += 1
+        if self.updates % self.window == 0:
+            self.total = math.fsum(self.values)  # bound floating point drift of the running sum
+        return self.value
+
+    def peek(self, price: float) -> Optional[float]:
+        if len(self.values) == self.window:
+            return (self.total - self.values[0] + price) / self.window
+        if len(self.values) == self.window - 1:
+            return (self.total + price) / self.window
+        return None
+
+    @property
+    def value(self) -> Optional[float]:
+        return self.total / self.window if len(self.values) == self.window else None
+
+    def to_dict(self) -> Dict:
+        return {"window": self.window, "values": list(self.values)}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "SMAState":
+        return cls.from_history(data["values"], window=data["window"])
+
+
+class WilderRSIState(IndicatorState):
+    """
+    RSI with Wilder smoothing: the first averages are the mean of the first `period` moves,
+    then avg = (avg * (period - 1) + move) / period
+    """
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self.prev_price: Optional[float] = None
+        self.moves = 0
+        self.avg_gain = 0.0
+        self.avg_loss = 0.0
+
+    def _next(self, price: float) -> tuple:
+        move = price - self.prev_price
+        gain, loss = max(move, 0.0), max(-move, 0.0)
+        if self.moves < self.period:
+            # Still seeding: accumulate a plain mean
+            n = self.moves + 1
+            return self.avg_gain + (gain - self.avg_gain) / n, self.avg_loss + (loss - self.avg_loss) / n
+        return ((self.avg_gain * (self.period - 1) + gain) / self.period,
+                (self.avg_loss * (self.period - 1) + loss) / self.period)
+
+    @staticmethod
+    def _rsi(avg_gain: float, avg_loss: float) -> float:
+        return 100.0 if avg_loss == 0 else 100 - 100 / (1 + avg_gain / avg_loss)
+
+    def update(self, price: float) -> Optional[float]:
+        if self.prev_price is not None:
+            self.avg_gain, self.avg_loss = self._next(price)
+            self.moves += 1
+        self.prev_price = price
+        return self.value
+
+    def peek(self, price: float) -> Optional[float]:
+        if self.prev_price is None or self.moves + 1 < self.period:
+            return None
+        return self._rsi(*self._next(price))
+
+    @property
+    def value(self) -> Optional[float]:
+        return self._rsi(self.avg_gain, self.avg_loss) if self.moves >= self.period else None
+
+    def to_dict(self) -> Dict:
+        return {"period": self.period, "prev_price": self.prev_price, "moves": self.moves,
+                "avg_gain": self.avg_gain, "avg_loss": self.avg_loss}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "WilderRSIState":
+        state = cls(data["period"])
+        state.prev_price, state.moves = data["prev_price"], data["moves"]
+        state.avg_gain, state.avg_loss = data["avg_gain"], data["avg_loss"]
+        return state
+
+
+class RollingVolatilityState(IndicatorState):
+    """Annualized volatility (%) of the last `window` daily returns, kept as running sums"""
+
+    def __init__(self, window: int = 30, periods_per_year: int = 252):
+        self.window = window
+        self.periods_per_year = periods_per_year
+        self.prev_price: Optional[float] = None
+        self.returns: deque = deque(maxlen=window)
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.updates = 0
+
+    def _volatility(self, n: int, total: float, total_sq: float) -> float:
+        mean = total / n
+        return math.sqrt(max(total_sq / n - mean * mean, 0.0)) * math.sqrt(self.periods_per_year) * 100
+
+    def update(self, price: float) -> Optional[float]:
+        if self.prev_price is not None:
+            ret = (price - self.prev_price) / self.prev_price
+            if len(self.returns) == self.window:
+                oldest = self.returns[0]
+                self.total -= oldest
+                self.total_sq -= oldest * oldest
+            self.returns.append(ret)
+            self.total += ret
+            self.total_sq += ret * ret
+            self.updates += 1
+            if self.updates % self.window == 0:
+                self.total = math.fsum(self.returns)
+                self.total_sq = math.fsum(r * r for r in self.returns)
+        self.prev_price = price
+        return self.value
+
+    def peek(self, price: float) -> Optional[float]:
+        if self.prev_price is None:
+            return None
+        ret = (price - self.prev_price) / self.prev_price
+        n, total, total_sq = len(self.returns), self.total + ret, self.total_sq + ret * ret
+        if n == self.window:
+            total -= self.returns[0]
+            total_sq -= self.returns[0] ** 2
+        else:
+            n += 1
+        return self._volatility(n, total, total_sq) if n >= self.window - 1 else None
+
+    @property
+    def value(self) -> Optional[float]:
+        # Like analyze_price_volume_trend: available from `window` prices (window - 1 returns)
+        n = len(self.returns)
+        return self._volatility(n, self.total, self.total_sq) if n >= self.window - 1 else None
+
+    def to_dict(self) -> Dict:
+        return {"window": self.window, "periods_per_year": self.periods_per_year,
+                "prev_price": self.prev_price, "returns": list(self.returns)}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "RollingVolatilityState":
+        state = cls(data["window"], data["periods_per_year"])
+        for ret in data["returns"]:
+            state.returns.append(ret)
+        state.total = math.fsum(state.returns)
+        state.total_sq = math.fsum(r * r for r in state.returns)
+        state.prev_price = data["prev_price"]
+        return state
+
+
+class PeriodReturnState(IndicatorState):
+    """
+    Return (%) of the latest price against the price `lookback - 1` periods earlier,
+    reported once more than `lookback` prices were seen (same rule as batch_indicators)
+    """
+
+    def __init__(self, lookback: int = 7):
+        self.lookback = lookback
+        self.prices: deque = deque(maxlen=lookback)
+        self.count = 0
+
+    def update(self, price: float) -> Optional[float]:
+        self.prices.append(price)
+        self.count += 1
+        return self.value
+
+    def peek(self, price: float) -> Optional[float]:
+        if self.count + 1 <= self.lookback:
+            return None
+        start = self.prices[1]  # the deque is full here: prices[0] drops out when `price` arrives
+        return (price - start) / start * 100
+
+    @property
+    def value(self) -> Optional[float]:
+        if self.count <= self.lookback:
+            return None
+        return (self.prices[-1] - self.prices[0]) / self.prices[0] * 100
+
+    def to_dict(self) -> Dict:
+        return {"lookback": self.lookback, "prices": list(self.prices), "count": self.count}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "PeriodReturnState":
+        state = cls.from_history(data["prices"], lookback=data["lookback"])
+        state.count = data.get("count", state.count)
+        return state
+
+
+class VolumeTrendState(IndicatorState):
+    """Change (%) of the average volume over the last `window` periods vs the `window` periods before"""
+
+    def __init__(self, window: int = 7):
+        self.window = window
+        self.volumes: deque = deque(maxlen=2 * window)
+        self.recent_total = 0.0
+        self.previous_total = 0.0
+
+    def update(self, volume: float) -> Optional[float]:
+        if len(self.volumes) == 2 * self.window:
+            self.previous_total -= self.volumes[0]
+        if len(self.volumes) >= self.window:
+            moved = self.volumes[-self.window]
+            self.recent_total -= moved
+            self.previous_total += moved
+        self.volumes.append(volume)
+        self.recent_total += volume
+        return self.value
+
+    def peek(self, volume: float) -> Optional[float]:
+        if len(self.volumes) < 2 * self.window - 1:
+            return None
+        moved = self.volumes[-self.window]
+        previous_total = self.previous_total + moved
+        if len(self.volumes) == 2 * self.window:
+            previous_total -= self.volumes[0]
+        return self._change(self.recent_total - moved + volume, previous_total)
+
+    def _change(self, recent_total: float, previous_total: float) -> Optional[float]:
+        if previous_total == 0:
+            return None
+        return (recent_total - previous_total) / previous_total * 100
+
+    @property
+    def value(self) -> Optional[float]:
+        if len(self.volumes) < 2 * self.window:
+            return None
+        return self._change(self.recent_total, self.previous_total)
+
+    @staticmethod
+    def classify(change: Optional[float]) -> Optional[str]:
+        if change is None:
+            return None
+        if change > 20:
+            return "increasing"
+        if change < -20:
+            return "decreasing"
+        return "stable"
+
+    def to_dict(self) -> Dict:
+        return {"window": self.window, "volumes": list(self.volumes)}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "VolumeTrendState":
+        return cls.from_history(data["volumes"], window=data["window"])
+
+
+class CoinIndicatorState:
+    """
+    Streaming state of every indicator reported by the forecasting tools for one coin
+
+    Responsibilities:
+    - Consume completed daily closes (and volumes) in order, in O(1) per day
+    - Report indicators, optionally including the latest intraday price without consuming it
+    - Serialize to / from a JSON-compatible dict
+    """
+
+    PRICE_STATES = {
+        "rsi_14": (WilderRSIState, {"period": 14}),
+        "sma_20": (SMAState, {"window": 20}),
+        "sma_50": (SMAState, {"window": 50}),
+        "ema_12": (EMAState, {"period": 12}),
+        "7d_return": (PeriodReturnState, {"lookback": 7}),
+        "30d_return": (PeriodReturnState, {"lookback": 30}),
+        "volatility_30d": (RollingVolatilityState, {"window": 30}),
+    }
+
+    def __init__(self, coin_id: str, vs_currency: str = "usd"):
+        self.coin_id = coin_id
+        self.vs_currency = vs_currency
+        self.last_timestamp: Optional[int] = None
+        self.last_price: Optional[float] = None
+        self.states = {name: state_cls(**params) for name, (state_cls, params) in self.PRICE_STATES.items()}
+        self.volume_trend = VolumeTrendState(7)
+
+    def update(self, timestamp: int, price: float, volume: Optional[float] = None):
+        """Consume one completed daily close"""
+        for state in self.states.values():
+            state.update(price)
+        if volume is not None:
+            self.volume_trend.update(volume)
+        self.last_timestamp = timestamp
+        self.last_price = price
+
+    def snapshot(self, live_price: Optional[float] = None, live_volume: Optional[float] = None) -> Dict:
+        """
+        Returns the current indicators. A live (intraday) price is treated as the latest close
+        without being consumed.
+        """
+        if live_price is None:
+            values = {name: state.value for name, state in self.states.items()}
+            volume_change = self.volume_trend.value
+            current_price = self.last_price
+        else:
+            values = {name: state.peek(live_price) for name, state in self.states.items()}
+            volume_change = self.volume_trend.peek(live_volume) if live_volume is not None else self.volume_trend.value
+            current_price = live_price
+
+        sma_20, sma_50 = values["sma_20"], values["sma_50"]
+        trend_signal = "neutral"
+        if sma_20 and sma_50:
+            if current_price > sma_20 > sma_50:
+                trend_signal = "bullish"
+            elif current_price < sma_20 < sma_50:
+                trend_signal = "bearish"
+
+        return_7d = values["7d_return"]
+        momentum, strength = "neutral", "weak"
+        if return_7d is not None:
+            if return_7d > 5:
+                momentum, strength = "positive", "strong" if return_7d > 10 else "moderate"
+            elif return_7d < -5:
+                momentum, strength = "negative", "strong" if return_7d < -10 else "moderate"
+
+        result = {name: round(float(value), 2) if value is not None else None for name, value in values.items()}
+        result.update({
+            "current_price": round(float(current_price), 2) if current_price is not None else None,
+            "price_vs_sma20": ("above" if current_price > sma_20 else "below") if sma_20 else None,
+            "trend_signal": trend_signal,
+            "momentum": momentum,
+            "strength": strength,
+            "volume_trend": VolumeTrendState.classify(volume_change),
+        })
+        return result
+
+    def to_dict(self) -> Dict:
+        return {
+            "coin_id": self.coin_id,
+            "vs_currency": self.vs_currency,
+            "last_timestamp": self.last_timestamp,
+            "last_price": self.last_price,
+            "states": {name: state.to_dict() for name, state in self.states.items()},
+            "volume_trend": self.volume_trend.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "CoinIndicatorState":
+        state = cls(data["coin_id"], data["vs_currency"])
+        state.last_timestamp, state.last_price = data["last_timestamp"], data["last_price"]
+        for name, (state_cls, _) in cls.PRICE_STATES.items():
+            state.states[name] = state_cls.from_dict(data["states"][name])
+        state.volume_trend = VolumeTrendState.from_dict(data["volume_trend"])
+        return state
+
+
+class IndicatorStateStore:
+    """
+    Persists one CoinIndicatorState per (coin_id, vs_currency) next to the price history store
+
+    Responsibilities:
+    - Build a state once from stored history, then only feed it the days completed since
+    - Rebuild the state if the stored history no longer lines up with it
+    - Answer with the latest intraday price applied on top of the completed days
+    """
+
+    def __init__(self, state_dir: str = DEFAULT_STATE_DIR, warmup_days: int = DEFAULT_WARMUP_DAYS):
+        self.state_dir = os.path.abspath(state_dir)
+        self.warmup_days = warmup_days
+        self._states: Dict[tuple, CoinIndicatorState] = {}
+        self._lock = threading.Lock()
+
+    def _path_for(self, coin_id: str, vs_currency: str) -> str:
+        safe_name = "".join(c if c.isalnum() or c in "-_" else "_" for c in f"{coin_id}_{vs_currency}")
+        return os.path.join(self.state_dir, f"{safe_name}.json")
+
+    def _load(self, coin_id: str, vs_currency: str) -> Optional[CoinIndicatorState]:
+        key = (coin_id, vs_currency)
+        if key in self._states:
+            return self._states[key]
+        path = self._path_for(coin_id, vs_currency)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r") as f:
+                state = CoinIndicatorState.from_dict(json.load(f))
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"Warning: ignoring unreadable indicator state {path}: {e}")
+            return None
+        self._states[key] = state
+        return state
+
+    def _save(self, data: Dict):
+        path = self._path_for(data["coin_id"], data["vs_currency"])
+        try:
+            os.makedirs(self.state_dir, exist_ok=True)
+            # Unique temp file per write so concurrent saves of one coin never share a partial file
+            with tempfile.NamedTemporaryFile("w", dir=self.state_dir, prefix=os.path.basename(path), suffix=".tmp", delete=False) as f:
+                json.dump(data, f)
+            os.replace(f.name, path)
+        except OSError as e:
+            print(f"Warning: could not persist indicator state to {path}: {e}")
+
+    def _advance(self, coin_id: str, vs_currency: str, record: Dict) -> tuple:
+        """Feed the completed days the state has not seen yet. Returns (state, changed)."""
+        timestamps = record["timestamps"]
+        state = self._load(coin_id, vs_currency)
+        if state is not None and state.last_timestamp is not None:
+            start = bisect.bisect_right(timestamps, state.last_timestamp)
+            # The state must end on a stored day, otherwise the history was rebuilt: start over
+            if start == 0 or timestamps[start - 1] != state.last_timestamp:
+                state = None
+        if state is None:
+            state, start = CoinIndicatorState(coin_id, vs_currency), 0
+
+        for ts, price, volume in zip(timestamps[start:], record["prices"][start:], record["volumes"][start:]):
+            state.update(ts, price, volume)
+        self._states[(coin_id, vs_currency)] = state
+        return state, start < len(timestamps)
+
+    def _snapshot(self, state: CoinIndicatorState, record: Dict) -> Dict:
+        live = record.get("live")
+        if live and (state.last_timestamp is None or live[0] > state.last_timestamp):
+            result = state.snapshot(live[1], live[2])
+            result["as_of"] = live[0]
+        else:
+            result = state.snapshot()
+            result["as_of"] = state.last_timestamp
+        return result
+
+    def get_indicators(self, coin_id: str, vs_currency: str = "usd") -> Dict:
+        """
+        Returns the latest indicators for a coin, syncing the price history and advancing the
+        persisted state by the newly completed days only.
+
+        Raises:
+            requests.exceptions.RequestException: If the price history cannot be synced.
+        """
+        record = get_price_history_store().sync(coin_id, vs_currency, self.warmup_days)
+        return self._indicators_for(coin_id, vs_currency, record)
+
+    async def aget_indicators(self, coin_id: str, vs_currency: str = "usd") -> Dict:
+        """Non-blocking version of get_indicators(): the state lock and file I/O stay off the event loop"""
+        record = await get_price_history_store().async_sync(coin_id, vs_currency, self.warmup_days)
+        return await asyncio.to_thread(self._indicators_for, coin_id, vs_currency, record)
+
+    def _indicators_for(self, coin_id: str, vs_currency: str, record: Dict) -> Dict:
+        """Advance the state with a synced record, persist it if it changed and return the snapshot"""
+        with self._lock:
+            state, changed = self._advance(coin_id, vs_currency, record)
+            result = self._snapshot(state, record)
+            data = state.to_dict() if changed else None
+        if data is not None:
+            self._save(data)
+        return result
+
+
+_state_store: Optional[IndicatorStateStore] = None
+_state_store_lock = threading.Lock()
+
+
+def get_indicator_state_store() -> IndicatorStateStore:
+    """Return the process-wide indicator state store, creating it on first use"""
+    global _state_store
+    if _state_store is None:
+        with _state_store_lock:
+            if _state_store is None:
+                _state_store = IndicatorStateStore()
+    return _state_store
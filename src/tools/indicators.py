@@ -0,0 +1,193 @@
+"""
+Vectorized indicator kernels.
+
+Every kernel takes a 1D series or a 2D matrix (one series per row, oldest value first) and returns
+the full indicator series with the same shape; positions without enough history are NaN.
+The recursive indicators (EMA, Wilder smoothing) run through pandas' compiled ewm recurrence
+instead of a Python loop.
+"""
+import warnings
+import numpy as np
+import pandas as pd
+
+
+def _as_rows(values) -> np.ndarray:
+    array = np.asarray(values, dtype=float)
+    return array.reshape(1, -1) if array.ndim == 1 else array
+
+
+def _like_input(values, rows: np.ndarray) -> np.ndarray:
+    return rows[0] if np.ndim(values) == 1 else rows
+
+
+def _ewm_rows(rows: np.ndarray, alpha: float) -> np.ndarray:
+    """y[0] = x[0], y[t] = alpha * x[t] + (1 - alpha) * y[t-1], applied to every row"""
+    return pd.DataFrame(rows.T).ewm(alpha=alpha, adjust=False).mean().to_numpy().T
+
+
+def ema_series(prices, period: int = 12) -> np.ndarray:
+    """Exponential moving average seeded with the first price (multiplier 2 / (period + 1))"""
+    rows = _as_rows(prices)
+    if rows.shape[1] == 0:
+        return _like_input(prices, rows.copy())
+    return _like_input(prices, _ewm_rows(rows, 2 / (period + 1)))
+
+
+def sma_series(prices, window: int) -> np.ndarray:
+    """Simple moving average over `window` values, computed from running sums"""
+    rows = _as_rows(prices)
+    result = np.full(rows.shape, np.nan)
+    if rows.shape[1] >= window:
+        csum = np.cumsum(np.pad(rows, ((0, 0), (1, 0))), axis=1)
+        result[:, window - 1:] = (csum[:, window:] - csum[:, :-window]) / window
+    return _like_input(prices, result)
+
+
+def wilder_rsi_series(prices, period: int = 14) -> np.ndarray:
+    """
+    Relative Strength Index with Wilder smoothing.
+
+    The first average gain/loss is the plain mean of the first `period` moves, then
+    avg = (avg * (period - 1) + move) / period, i.e. an EMA with alpha = 1 / period.
+    The first RSI value is at index `period`.
+    """
+    rows = _as_rows(prices)
+    return _like_input(prices, _wilder_rsi_rows(np.diff(rows, axis=1), period))
+
+
+def _wilder_rsi_rows(deltas: np.ndarray, period: int) -> np.ndarray:
+    """Wilder RSI from precomputed price moves (rows x (days - 1)), aligned to the prices"""
+    result = np.full((deltas.shape[0], deltas.shape[1] + 1), np.nan)
+    if deltas.shape[1] < period:
+        return result
+
+    gains = np.where(deltas > 0, deltas, 0.0)
+    losses = np.where(deltas < 0, -deltas, 0.0)
+
+    def smooth(moves):
+        seeded = np.concatenate([moves[:, :period].mean(axis=1, keepdims=True), moves[:, period:]], axis=1)
+        return _ewm_rows(seeded, 1 / period)
+
+    avg_gain, avg_loss = smooth(gains), smooth(losses)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = 100 - 100 / (1 + avg_gain / avg_loss)
+    result[:, period:] = np.where(avg_loss == 0, 100.0, rsi)
+    return result
+
+
+def price_analysis_series(prices, volumes=None, bollinger_window: int = 20, bollinger_k: float = 2.0) -> dict:
+    """
+    Every indicator of a single series from one set of shared intermediates.
+
+    The price array, its moves (deltas) and simple returns are computed once; RSI, moving averages,
+    MACD (12/26/9), Bollinger bands and OBV are all derived from them.
+
+    Returns:
+        dict: Full-length series: prices, deltas, returns, rsi_14, sma_20, sma_50, ema_12, ema_26,
+              macd, macd_signal, macd_histogram, bollinger_upper, bollinger_lower, bandwidth,
+              and volumes / obv when volumes are given (obv covers the overlapping tail if the lengths differ).
+    """
+    prices = np.asarray(prices, dtype=float)
+    rows = prices.reshape(1, -1)
+    deltas = np.diff(prices)
+    returns = deltas / prices[:-1]
+
+    sma_20 = sma_series(prices, bollinger_window)
+    sq_mean = sma_series(prices * prices, bollinger_window)
+    band_std = np.sqrt(np.maximum(sq_mean - sma_20 * sma_20, 0.0))  # population std over the window
+
+    ema_12 = _ewm_rows(rows, 2 / 13)[0]
+    ema_26 = _ewm_rows(rows, 2 / 27)[0]
+    macd = ema_12 - ema_26
+    macd_signal = _ewm_rows(macd.reshape(1, -1), 2 / 10)[0]  # 9-period EMA of the MACD line
+
+    analysis = {
+        "prices": prices,
+        "deltas": deltas,
+        "returns": returns,
+        "rsi_14": _wilder_rsi_rows(deltas.reshape(1, -1), 14)[0],
+        "sma_20": sma_20,
+        "sma_50": sma_series(prices, 50),
+        "ema_12": ema_12,
+        "ema_26": ema_26,
+        "macd": macd,
+        "macd_signal": macd_signal,
+        "macd_histogram": macd - macd_signal,
+        "bollinger_upper": sma_20 + bollinger_k * band_std,
+        "bollinger_lower": sma_20 - bollinger_k * band_std,
+    }
+    with np.errstate(divide="ignore", invalid="ignore"):
+        analysis["bandwidth"] = (analysis["bollinger_upper"] - analysis["bollinger_lower"]) / sma_20
+    if volumes is not None:
+        volumes = np.asarray(volumes, dtype=float)
+        analysis["volumes"] = volumes
+        # OBV over the most recent points both series cover (they may differ in length)
+        n = min(len(prices), len(volumes))
+        if n:
+            analysis["obv"] = np.concatenate([[0.0], np.cumsum(np.sign(deltas[len(deltas) - n + 1:]) * volumes[len(volumes) - n + 1:])])
+    return analysis
+
+
+def _left_align(rows: np.ndarray) -> tuple:
+    """Shift every row left past its leading NaNs (young coins). Returns (aligned rows, leading NaN counts)."""
+    n = rows.shape[1]
+    valid = ~np.isnan(rows)
+    lead = np.where(valid.any(axis=1), valid.argmax(axis=1), n)
+    idx = np.arange(n) + lead[:, None]
+    aligned = np.take_along_axis(rows, np.minimum(idx, n - 1), axis=1)
+    aligned[idx >= n] = np.nan
+    return aligned, lead
+
+
+def _right_align(aligned: np.ndarray, lead: np.ndarray) -> np.ndarray:
+    """Inverse of _left_align"""
+    idx = np.arange(aligned.shape[1]) - lead[:, None]
+    rows = np.take_along_axis(aligned, np.maximum(idx, 0), axis=1)
+    rows[idx < 0] = np.nan
+    return rows
+
+
+def batch_indicators(prices, periods_per_year: int = 252) -> dict:
+    """
+    Latest indicator values for many coins at once.
+
+    Args:
+        prices: 2D matrix (coins x days, oldest first) aligned on the same days. Coins with a shorter
+                history have leading NaNs; gaps inside a series are forward-filled.
+        periods_per_year: Used to annualize volatility.
+
+    Returns:
+        dict: One array per metric, one value per coin (NaN when there is not enough history):
+              rsi_14, sma_20, sma_50, ema_12, current_price, 7d_return, 30d_return, volatility_30d, points
+    """
+    rows = pd.DataFrame(_as_rows(prices).T).ffill().to_numpy().T
+    n = rows.shape[1]
+    aligned, lead = _left_align(rows)
+    points = n - lead
+
+    indicators = {
+        "rsi_14": wilder_rsi_series(aligned, 14),
+        "sma_20": sma_series(aligned, 20),
+        "sma_50": sma_series(aligned, 50),
+        "ema_12": ema_series(aligned, 12),
+    }
+    result = {name: _right_align(values, lead)[:, -1] for name, values in indicators.items()}
+    result["ema_12"] = np.where(points >= 12, result["ema_12"], np.nan)
+    current = rows[:, -1]
+    result["current_price"] = current
+
+    def period_return(lookback):
+        start = rows[:, -lookback] if n >= lookback else np.full(len(rows), np.nan)
+        return np.where(points > lookback, (current - start) / start * 100, np.nan)
+
+    result["7d_return"] = period_return(7)
+    result["30d_return"] = period_return(30)
+
+    window = rows[:, -31:]
+    returns = np.diff(window, axis=1) / window[:, :-1]
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # coins without any return in the window
+        volatility = np.nanstd(returns, axis=1) * np.sqrt(periods_per_year) * 100
+    result["volatility_30d"] = np.where(points >= 30, volatility, np.nan)
+    result["points"] = points
+    return result
@@ -0,0 +1,346 @@
+import os
+import time
+import asyncio
+import functools
+import threading
+import contextvars
+import requests
+from typing import Any, Dict, Optional
+from requests.adapters import HTTPAdapter
+from src.exceptions import CircuitOpenError
+from src.tools.ttl_cache import TTLCache
+from src.tools.single_flight import SingleFlight
+from src.tools.rate_limiter import RetryPolicy, TokenBucket
+from src.tools.circuit_breaker import CLOSED, CircuitBreaker
+
+# ==================== CoinGecko API ====================
+COINGECKO_BASE_URL = "https://api.coingecko.com/api/v3"
+
+# Connection pool sizing (can be overridden through environment variables)
+DEFAULT_POOL_CONNECTIONS = int(os.getenv("COINGECKO_POOL_CONNECTIONS", "4"))
+DEFAULT_POOL_MAXSIZE = int(os.getenv("COINGECKO_POOL_MAXSIZE", "16"))
+
+# Request budget shared by every tool in the process (CoinGecko free tier allows ~30 calls/minute)
+DEFAULT_RATE_LIMIT_PER_MINUTE = float(os.getenv("COINGECKO_RATE_LIMIT_PER_MINUTE", "30"))
+DEFAULT_RATE_LIMIT_BURST = int(os.getenv("COINGECKO_RATE_LIMIT_BURST", "5"))
+DEFAULT_MAX_RETRIES = int(os.getenv("COINGECKO_MAX_RETRIES", "3"))
+
+# Circuit breaker: consecutive failures before failing fast, and seconds before a half-open probe
+DEFAULT_BREAKER_FAILURE_THRESHOLD = int(os.getenv("COINGECKO_BREAKER_FAILURE_THRESHOLD", "5"))
+DEFAULT_BREAKER_COOLDOWN_SECONDS = float(os.getenv("COINGECKO_BREAKER_COOLDOWN_SECONDS", "30"))
+
+# Per-endpoint timeouts in seconds: (connect timeout, read timeout)
+DEFAULT_TIMEOUT = (3.05, 10)
+DEFAULT_ENDPOINT_TIMEOUTS = {
+    "simple_price": (3.05, 5),
+    "coin_market_data": (3.05, 10),
+    "trending": (3.05, 8),
+    "market_chart": (3.05, 15),
+}
+
+# Per-endpoint response caching: (ttl in seconds, max entries)
+# Prices move quickly, descriptions / market cap rank / sentiment change over hours.
+DEFAULT_ENDPOINT_CACHE = {
+    "simple_price": (30, 512),
+    "coin_market_data": (3 * 60 * 60, 128),
+    "trending": (10 * 60, 4),
+}
+
+
+class MarketDataClient:
+    """
+    Shared HTTP client for market data APIs (CoinGecko)
+
+    Responsibilities:
+    - Keep one requests.Session with keep-alive connection pooling for all tools
+    - Apply per-endpoint timeouts
+    - Serve repeated requests from per-endpoint TTL caches
+    - Coalesce identical concurrent requests into one in-flight HTTP call
+    - Throttle requests with a process-wide token bucket and retry 429/5xx with jittered backoff
+    - Fail fast through a circuit breaker when the API is degraded, serving stale cached data when available
+    - Raise requests exceptions so tools keep their existing error handling
+    """
+
+    def __init__(self, base_url: str = COINGECKO_BASE_URL, pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+                 pool_maxsize: int = DEFAULT_POOL_MAXSIZE, endpoint_timeouts: Optional[Dict[str, Any]] = None,
+                 default_timeout: Any = DEFAULT_TIMEOUT, endpoint_cache: Optional[Dict[str, tuple]] = None,
+                 rate_limit_per_minute: float = DEFAULT_RATE_LIMIT_PER_MINUTE, rate_limit_burst: int = DEFAULT_RATE_LIMIT_BURST,
+                 max_retries: int = DEFAULT_MAX_RETRIES, breaker_failure_threshold: int = DEFAULT_BREAKER_FAILURE_THRESHOLD,
+                 breaker_cooldown_seconds: float = DEFAULT_BREAKER_COOLDOWN_SECONDS):
+        self.base_url = base_url.rstrip("/")
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.endpoint_timeouts = {**DEFAULT_ENDPOINT_TIMEOUTS, **(endpoint_timeouts or {})}
+        self.default_timeout = default_timeout
+        self.session = self._build_session()
+        cache_config = {**DEFAULT_ENDPOINT_CACHE, **(endpoint_cache or {})}
+        self.caches = {name: TTLCache(ttl=ttl, maxsize=maxsize) for name, (ttl, maxsize) in cache_config.items()}
+        self.in_flight = SingleFlight()
+        self.rate_limiter = TokenBucket(rate_limit_per_minute, burst=rate_limit_burst)
+        self.retry_policy = RetryPolicy(max_retries=max_retries)
+        self.breaker = CircuitBreaker(failure_threshold=breaker_failure_threshold, cooldown_seconds=breaker_cooldown_seconds)
+
+    def _build_session(self) -> requests.Session:
+        """Create a session whose adapter keeps connections alive between calls"""
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.pool_connections, pool_maxsize=self.pool_maxsize)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers.update({"Accept": "application/json"})
+        return session
+
+    def timeout_for(self, endpoint: Optional[str]) -> Any:
+        """Return the timeout configured for an endpoint name"""
+        return self.endpoint_timeouts.get(endpoint, self.default_timeout)
+
+    @staticmethod
+    def cache_key(path: str, params: Optional[Dict] = None) -> tuple:
+        """Build a hashable key from a path and its query parameters"""
+        return (path, tuple(sorted((k, str(v)) for k, v in (params or {}).items())))
+
+    def get(self, path: str, params: Optional[Dict] = None, endpoint: Optional[str] = None, use_cache: bool = True) -> Any:
+        """
+        Performs a GET request against the market data API and returns the parsed JSON.
+        Responses of endpoints with a configured cache are reused until their TTL expires, and
+        concurrent identical requests share a single HTTP call and its parsed result.
+        While the circuit breaker is open (or when the API fails), an expired cached response is
+        served if one exists; otherwise the call fails fast.
+
+        Args:
+            path (str): API path relative to the base url (e.g., "/simple/price").
+            params (dict, optional): Query parameters.
+            endpoint (str, optional): Endpoint name used to look up the timeout and cache (e.g., "simple_price").
+            use_cache (bool): Whether to read/write the endpoint's response cache (default: True).
+
+        Returns:
+            Parsed JSON response.
+
+        Raises:
+            requests.exceptions.RequestException: If the request fails
+                (CircuitOpenError if the breaker is open and nothing is cached).
+        """
+        key = self.cache_key(path, params)
+        cache = self.caches.get(endpoint) if use_cache else None
+        if cache is not None:
+            cached = cache.get(key)
+            if cached is not None:
+                return cached
+
+        def fetch():
+            # Checked by the single-flight leader only, so coalesced callers don't use up half-open trial permits
+            if not self.breaker.allow_request():
+                raise self.open_circuit_error()
+            data = self._guarded_request(path, params, endpoint)
+            if cache is not None:
+                cache.set(key, data)
+            return data
+
+        try:
+            return self.in_flight.do(key, fetch)
+        except requests.exceptions.RequestException as e:
+            if not is_upstream_failure(e):
+                raise
+            return serve_stale(cache, key, e)
+
+    def open_circuit_error(self) -> CircuitOpenError:
+        retry_in = self.breaker.retry_in()
+        return CircuitOpenError(f"Market data API circuit breaker is open (retry in {retry_in:.0f}s)", retry_in=retry_in)
+
+    def _guarded_request(self, path: str, params: Optional[Dict], endpoint: Optional[str]) -> Any:
+        """Send the request and report its outcome to the circuit breaker"""
+        try:
+            data = self._request(path, params, endpoint)
+        except requests.exceptions.RequestException as e:
+            if is_upstream_failure(e):
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()  # e.g. 404 for an unknown coin: the API itself is healthy
+            raise
+        self.breaker.record_success()
+        return data
+
+    def _request(self, path: str, params: Optional[Dict], endpoint: Optional[str]) -> Any:
+        """Send the request through the rate limiter, retrying throttled / failed attempts"""
+        url = f"{self.base_url}/{path.lstrip('/')}"
+        attempt = 0
+        while True:
+            self.rate_limiter.acquire()
+            try:
+                response = self.session.get(url, params=params, timeout=self.timeout_for(endpoint))
+            except requests.exceptions.ConnectionError:
+                if not self.retry_policy.should_retry(None, attempt):
+                    raise
+                time.sleep(self.retry_policy.backoff(attempt))
+                attempt += 1
+                continue
+
+            if self.retry_policy.should_retry(response.status_code, attempt):
+                delay = self.retry_policy.backoff(attempt, response.headers.get("Retry-After"))
+                print(f"CoinGecko returned {response.status_code}, retrying in {delay:.1f}s")
+                time.sleep(delay)
+                attempt += 1
+                continue
+
+            response.raise_for_status()
+            return response.json()
+
+    def cache_stats(self) -> Dict[str, Dict]:
+        """Return hit/miss counters for every endpoint cache"""
+        return {name: cache.stats() for name, cache in self.caches.items()}
+
+    def stats(self) -> Dict[str, Dict]:
+        """Return cache, request coalescing, rate limiter (queue wait) and retry statistics"""
+        return {
+            "cache": self.cache_stats(),
+            "in_flight": self.in_flight.stats(),
+            "rate_limiter": self.rate_limiter.stats(),
+            "retries": self.retry_policy.stats(),
+            "circuit_breaker": self.breaker.stats(),
+        }
+
+    def clear_caches(self):
+        """Drop all cached responses"""
+        for cache in self.caches.values():
+            cache.clear()
+
+    def close(self):
+        """Close all pooled connections"""
+        self.session.close()
+
+
+def is_upstream_failure(error: requests.exceptions.RequestException) -> bool:
+    """Whether an error means the API is degraded (timeouts, connection errors, 429, 5xx) rather than a bad request"""
+    if isinstance(error, requests.exceptions.HTTPError) and error.response is not None:
+        status = error.response.status_code
+        return status == 429 or status >= 500
+    return True
+
+
+# Number of stale (expired cache / stored) reads served during the current tool call
+_stale_reads: contextvars.ContextVar = contextvars.ContextVar("market_data_stale_reads", default=0)
+
+
+def mark_stale_read():
+    """Record that the current tool call is being answered with stale data"""
+    _stale_reads.set(_stale_reads.get() + 1)
+
+
+def is_stale_read() -> bool:
+    """Whether stale data has been served during the current tool call"""
+    return _stale_reads.get() > 0
+
+
+def serve_stale(cache: Optional[TTLCache], key: Any, error: requests.exceptions.RequestException) -> Any:
+    """Return the expired cached value for key, or raise error if there is none"""
+    stale = cache.get_stale(key) if cache is not None else None
+    if stale is None:
+        raise error
+    print(f"Warning: serving stale market data ({error})")
+    mark_stale_read()
+    return stale
+
+
+_client: Optional[MarketDataClient] = None
+_client_lock = threading.Lock()
+
+
+def get_market_data_client() -> MarketDataClient:
+    """Return the process-wide market data client, creating it on first use"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = MarketDataClient()
+    return _client
+
+
+def configure_market_data_client(**kwargs) -> MarketDataClient:
+    """
+    Replaces the process-wide market data client with a newly configured one.
+
+    Args:
+        **kwargs: Keyword arguments forwarded to MarketDataClient
+                  (e.g., pool_maxsize=32, endpoint_timeouts={"market_chart": (3.05, 30)},
+                  endpoint_cache={"simple_price": (15, 1024)}, rate_limit_per_minute=500).
+
+    Returns:
+        MarketDataClient: The new shared client.
+    """
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+        _client = MarketDataClient(**kwargs)
+    return _client
+
+
+def get_market_data_cache_stats() -> Dict[str, Dict]:
+    """
+    Returns cache hit/miss counters for the shared market data client.
+
+    Returns:
+        dict: Stats per endpoint.
+              Example: {"simple_price": {"hits": 42, "misses": 8, "hit_rate": 0.84, "size": 8, "maxsize": 512, "ttl_seconds": 30}}
+    """
+    return get_market_data_client().cache_stats()
+
+
+def get_market_data_stats() -> Dict[str, Dict]:
+    """
+    Returns cache, coalescing, rate limiter and retry statistics of the shared market data client.
+
+    Returns:
+        dict: Example: {"cache": {...}, "in_flight": {...},
+                        "rate_limiter": {"acquired": 120, "delayed": 14, "avg_wait_seconds": 0.31, ...},
+                        "retries": {"retries": 2, "total_backoff_seconds": 3.4, ...}}
+    """
+    return get_market_data_client().stats()
+
+
+def get_data_status() -> Dict:
+    """
+    Returns the health of the market data feed for the current tool call.
+
+    Returns:
+        dict: Example: {"circuit_breaker": "open", "stale": True, "retry_in_seconds": 12.0}
+    """
+    breaker = get_market_data_client().breaker
+    return {"circuit_breaker": breaker.state, "stale": is_stale_read(), "retry_in_seconds": round(breaker.retry_in(), 1)}
+
+
+def _attach_data_status(result: Any) -> Any:
+    """Add a "data_status" entry to a tool result when the data is stale or the breaker is not closed"""
+    status = get_data_status()
+    if not status["stale"] and status["circuit_breaker"] == CLOSED:
+        return result
+    if result is None:
+        return {"error": "Market data is temporarily unavailable (upstream API degraded)", "data_status": status}
+    if isinstance(result, dict):
+        return {**result, "data_status": status}
+    return {"results": result, "data_status": status}
+
+
+def report_data_status(func):
+    """
+    Decorator for market data tools: when the upstream API is degraded, the tool result reports the
+    circuit breaker state and whether stale data was served, so agents can flag degraded data.
+    Works for both sync and async tool functions.
+    """
+    if asyncio.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            token = _stale_reads.set(0)
+            try:
+                return _attach_data_status(await func(*args, **kwargs))
+            finally:
+                _stale_reads.reset(token)
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        token = _stale_reads.set(0)
+        try:
+            return _attach_data_status(func(*args, **kwargs))
+        finally:
+            _stale_reads.reset(token)
+    return wrapper
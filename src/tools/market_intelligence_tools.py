@@ -1,9 +1,14 @@
 import requests
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Union
+from src.tools.coin_ids import to_id_list
+from src.tools.price_batcher import get_price_batcher
+from src.tools.market_data_client import get_market_data_client, report_data_status
+from src.tools.async_market_data_client import get_async_market_data_client
 
 # ==================== CoinGecko API ====================
-COINGECKO_BASE_URL = "https://api.coingecko.com/api/v3"
+COIN_MARKET_DATA_PARAMS = {"localization": "false", "tickers": "false", "community_data": "false", "developer_data": "false"}
 
+@report_data_status
 def get_current_coin_price(coin_id: str = "bitcoin", vs_currency: str = "usd") -> Optional[Dict]:
     """
     Fetches the current price of a cryptocurrency in a specified currency.
@@ -18,15 +23,36 @@ def get_current_coin_price(coin_id: str = "bitcoin", vs_currency: str = "usd") -
         None: If the request fails.
     """
     try:
-        url = f"{COINGECKO_BASE_URL}/simple/price"
-        params = {"ids": coin_id, "vs_currencies": vs_currency}
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()
-        return response.json()
+        # Lookups made at the same time (e.g., parallel tool calls) share one /simple/price request
+        return get_price_batcher().get_price(coin_id, vs_currency)
     except requests.exceptions.RequestException as e:
         print(f"Error fetching price from CoinGecko: {e}")
         return None
 
+@report_data_status
+def get_current_coin_prices(coin_ids: Union[List[str], str], vs_currencies: Union[List[str], str] = "usd") -> Optional[Dict]:
+    """
+    Fetches the current prices of several cryptocurrencies in one request. 
+    Use this instead of calling get_current_coin_price once per coin (e.g., for a watchlist or portfolio).
+
+    Args:
+        coin_ids (list or str): CoinGecko IDs of the cryptocurrencies (e.g., ["bitcoin", "ethereum", "solana"]).
+        vs_currencies (list or str): Currencies to compare against (e.g., ["usd", "eur"] or "usd").
+
+    Returns:
+        dict: A JSON response containing the current prices.
+              Example: {"bitcoin": {"usd": 30000}, "ethereum": {"usd": 2000}}
+        None: If the request fails.
+    """
+    try:
+        coin_ids = to_id_list(coin_ids)
+        vs_currencies = to_id_list(vs_currencies)
+        return get_price_batcher().get_prices(coin_ids, vs_currencies)
+    except requests.exceptions.RequestException as e:
+        print(f"Error fetching prices from CoinGecko: {e}")
+        return None
+
+@report_data_status
 def get_current_coin_market_data(coin_id: str = "bitcoin") -> Optional[Dict]:
     """
     Retrieves current detailed market data for a specific cryptocurrency.
@@ -41,31 +67,32 @@ def get_current_coin_market_data(coin_id: str = "bitcoin") -> Optional[Dict]:
         None: If the request fails.
     """
     try:
-        url = f"{COINGECKO_BASE_URL}/coins/{coin_id}"
-        params = {"localization": "false", "tickers": "false", "community_data": "false", "developer_data": "false"}
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()
-
-        result = {}
-        useful_keys = ['description', 'sentiment_votes_up_percentage', 'sentiment_votes_down_percentage', 'watchlist_portfolio_users', 'market_cap_rank']
-        for key in useful_keys:
-            if key == "description":
-                description_text = response.json()[key].get('en', '')
-                words = description_text.split()[:150]  # First 150 words
-                value = ' '.join(words)
-                if len(description_text.split()) > 150:
-                    value += "..."
-            else:
-                value = response.json()[key]
-
-            result[key] = value
-
-        return result
+        data = get_market_data_client().get(f"/coins/{coin_id}", params=COIN_MARKET_DATA_PARAMS, endpoint="coin_market_data")
+        return _extract_market_data(data)
     
     except requests.exceptions.RequestException as e:
         print(f"Error fetching market data from CoinGecko: {e}")
         return None
 
+def _extract_market_data(data: Dict) -> Dict:
+    """Keep only the useful fields of a /coins/{id} response"""
+    result = {}
+    useful_keys = ['description', 'sentiment_votes_up_percentage', 'sentiment_votes_down_percentage', 'watchlist_portfolio_users', 'market_cap_rank']
+    for key in useful_keys:
+        if key == "description":
+            description_text = data[key].get('en', '')
+            words = description_text.split()[:150]  # First 150 words
+            value = ' '.join(words)
+            if len(description_text.split()) > 150:
+                value += "..."
+        else:
+            value = data[key]
+
+        result[key] = value
+
+    return result
+
+@report_data_status
 def get_current_trending_coins() -> Optional[List[Dict]]:
     """
     Fetches the current list of trending coins on CoinGecko.
@@ -75,20 +102,63 @@ def get_current_trending_coins() -> Optional[List[Dict]]:
         None: If the request fails.
     """
     try:
-        url = f"{COINGECKO_BASE_URL}/search/trending"
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        response = [res['item'] for res in response.json()['coins']]
-        
-        result = []
-        useful_keys = ['name', 'id', 'market_cap_rank', 'price_btc']
-        for res in response:
-            r = {}
-            for key in useful_keys:
-                r[key] = res[key]
-            result.append(r)
-        return result    
+        data = get_market_data_client().get("/search/trending", endpoint="trending")
+        return _extract_trending_coins(data)
+
+    except requests.exceptions.RequestException as e:
+        print(f"Error fetching trending coins from CoinGecko: {e}")
+        return None
+
+def _extract_trending_coins(data: Dict) -> List[Dict]:
+    """Keep only the useful fields of a /search/trending response"""
+    response = [res['item'] for res in data['coins']]
+    
+    result = []
+    useful_keys = ['name', 'id', 'market_cap_rank', 'price_btc']
+    for res in response:
+        r = {}
+        for key in useful_keys:
+            r[key] = res[key]
+        result.append(r)
+    return result
+
+# ==================== Async variants ====================
+# Same arguments and results as the functions above, but non-blocking (shared aiohttp session).
+
+@report_data_status
+async def aget_current_coin_price(coin_id: str = "bitcoin", vs_currency: str = "usd") -> Optional[Dict]:
+    """Async version of get_current_coin_price()"""
+    try:
+        return await get_price_batcher().aget_price(coin_id, vs_currency)
+    except requests.exceptions.RequestException as e:
+        print(f"Error fetching price from CoinGecko: {e}")
+        return None
+
+@report_data_status
+async def aget_current_coin_prices(coin_ids: Union[List[str], str], vs_currencies: Union[List[str], str] = "usd") -> Optional[Dict]:
+    """Async version of get_current_coin_prices()"""
+    try:
+        return await get_price_batcher().aget_prices(to_id_list(coin_ids), to_id_list(vs_currencies))
+    except requests.exceptions.RequestException as e:
+        print(f"Error fetching prices from CoinGecko: {e}")
+        return None
 
+@report_data_status
+async def aget_current_coin_market_data(coin_id: str = "bitcoin") -> Optional[Dict]:
+    """Async version of get_current_coin_market_data()"""
+    try:
+        data = await get_async_market_data_client().get(f"/coins/{coin_id}", params=COIN_MARKET_DATA_PARAMS, endpoint="coin_market_data")
+        return _extract_market_data(data)
+    except requests.exceptions.RequestException as e:
+        print(f"Error fetching market data from CoinGecko: {e}")
+        return None
+
+@report_data_status
+async def aget_current_trending_coins() -> Optional[List[Dict]]:
+    """Async version of get_current_trending_coins()"""
+    try:
+        data = await get_async_market_data_client().get("/search/trending", endpoint="trending")
+        return _extract_trending_coins(data)
     except requests.exceptions.RequestException as e:
         print(f"Error fetching trending coins from CoinGecko: {e}")
         return None
@@ -0,0 +1,119 @@
+import copy
+import hashlib
+import inspect
+import functools
+import threading
+import numpy as np
+from numbers import Number
+from collections import OrderedDict
+from typing import Any, Dict
+from src.tools.data_store import get_data_store, is_handle
+
+DEFAULT_MAXSIZE = 256
+
+
+def _fingerprint(value: Any, digest) -> None:
+    """Feed a canonical encoding of value into digest (numeric lists are hashed as one float buffer)"""
+    if isinstance(value, np.ndarray):
+        digest.update(b"a" + str((value.dtype.str, value.shape)).encode())
+        digest.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, (list, tuple)):
+        if value and all(isinstance(item, Number) and not isinstance(item, bool) for item in value):
+            _fingerprint(np.asarray(value, dtype=float), digest)
+            return
+        digest.update(f"l{len(value)}(".encode())
+        for item in value:
+            _fingerprint(item, digest)
+        digest.update(b")")
+    elif isinstance(value, dict):
+        digest.update(f"d{len(value)}(".encode())
+        for key in sorted(value, key=repr):
+            _fingerprint(key, digest)
+            _fingerprint(value[key], digest)
+        digest.update(b")")
+    else:
+        digest.update(f"{type(value).__name__}:{value!r};".encode())
+
+
+def _handles_alive(value: Any) -> bool:
+    """Whether every data handle inside a cached result still resolves"""
+    if is_handle(value):
+        try:
+            get_data_store().get(value)  # also refreshes the handle's LRU position
+            return True
+        except KeyError:
+            return False
+    if isinstance(value, dict):
+        return all(_handles_alive(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return all(_handles_alive(item) for item in value)
+    return True
+
+
+def memoize(maxsize: int = DEFAULT_MAXSIZE):
+    """
+    Decorator memoizing a pure tool function on a content hash of its arguments
+
+    Responsibilities:
+    - Key calls by a blake2b hash of the bound arguments (defaults applied): numeric lists and arrays
+      are hashed as one float buffer, data handles are already content hashes
+    - Keep at most `maxsize` results, evicting the least recently used
+    - Never cache failures (None) and return copies so callers cannot mutate cached results
+    - Recompute when a cached result refers to data handles that have been evicted
+
+    The wrapped function exposes cache_stats() and cache_clear().
+    """
+
+    def decorator(func):
+        signature = inspect.signature(func)
+        cache: "OrderedDict[bytes, Any]" = OrderedDict()
+        lock = threading.Lock()
+        counters = {"hits": 0, "misses": 0}
+
+        def key_for(args, kwargs) -> bytes:
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            digest = hashlib.blake2b(digest_size=16)
+            _fingerprint(func.__qualname__, digest)
+            _fingerprint(dict(bound.arguments), digest)
+            return digest.digest()
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            try:
+                key = key_for(args, kwargs)
+            except TypeError:
+                return func(*args, **kwargs)  # let the function report bad arguments
+
+            with lock:
+                cached = cache.get(key)
+                if cached is not None and _handles_alive(cached):
+                    cache.move_to_end(key)
+                    counters["hits"] += 1
+                    return copy.deepcopy(cached)
+                counters["misses"] += 1
+
+            result = func(*args, **kwargs)
+            if result is not None:
+                with lock:
+                    cache[key] = copy.deepcopy(result)
+                    cache.move_to_end(key)
+                    while len(cache) > maxsize:
+                        cache.popitem(last=False)
+            return result
+
+        def cache_stats() -> Dict:
+            total = counters["hits"] + counters["misses"]
+            return {**counters, "hit_rate": round(counters["hits"] / total, 4) if total else None,
+                    "size": len(cache), "maxsize": maxsize}
+
+        def cache_clear():
+            with lock:
+                cache.clear()
+                counters["hits"] = counters["misses"] = 0
+
+        wrapper.cache_stats = cache_stats
+        wrapper.cache_clear = cache_clear
+        return wrapper
+
+    return decorator
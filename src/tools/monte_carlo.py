@@ -0,0 +1,119 @@
+"""
+Chunked Monte Carlo simulation of multi-asset portfolio returns.
+
+Daily asset returns are drawn from a multivariate normal (mean vector and covariance estimated from history)
+through the Cholesky factor of the covariance, compounded per asset (buy-and-hold) and valued at every
+requested horizon. Paths are generated in chunks so peak memory stays bounded however many paths are asked
+for; every chunk has its own seed spawned from one SeedSequence, so a seed gives the same result whether the
+chunks run in this process or across the process pool.
+"""
+import os
+import threading
+import multiprocessing
+import numpy as np
+from itertools import repeat
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Sequence, Tuple
+
+# Floats drawn per chunk (paths x days x assets), i.e. ~16 MB of normals
+CHUNK_ELEMENTS = int(os.getenv("MONTE_CARLO_CHUNK_ELEMENTS", "2000000"))
+# From this many paths on, chunks are simulated across a process pool
+PARALLEL_MIN_PATHS = int(os.getenv("MONTE_CARLO_PARALLEL_MIN_PATHS", "1000000"))
+MAX_WORKERS = int(os.getenv("MONTE_CARLO_MAX_WORKERS", str(min(8, os.cpu_count() or 1))))
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _get_process_pool() -> ProcessPoolExecutor:
+    """Return the process pool shared by all simulations, creating it on first use"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                # Spawned, not forked: the parent runs threaded tool workers whose held locks a fork would copy
+                _pool = ProcessPoolExecutor(max_workers=MAX_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    return _pool
+
+
+def cholesky_factor(cov: np.ndarray) -> np.ndarray:
+    """
+    Lower-triangular L with L @ L.T == cov.
+    Falls back to an eigen-decomposition (negative eigenvalues clipped) when cov is only positive
+    semi-definite, e.g. for perfectly correlated assets or fewer observations than assets.
+    """
+    try:
+        return np.linalg.cholesky(cov)
+    except np.linalg.LinAlgError:
+        eigenvalues, eigenvectors = np.linalg.eigh(cov)
+        return eigenvectors * np.sqrt(np.clip(eigenvalues, 0, None))
+
+
+def _simulate_chunk(mean: np.ndarray, factor: np.ndarray, weights: np.ndarray, horizons: np.ndarray,
+                    n_paths: int, seed: np.random.SeedSequence) -> np.ndarray:
+    """Portfolio returns of n_paths paths at every horizon (n_paths x horizons)"""
+    rng = np.random.default_rng(seed)
+    days, assets = int(horizons[-1]), len(mean)
+    growth = rng.standard_normal((n_paths, days, assets)) @ factor.T
+    growth += 1 + mean
+    np.clip(growth, 0, None, out=growth)  # an asset cannot lose more than everything
+    np.cumprod(growth, axis=1, out=growth)
+    return growth[:, horizons - 1, :] @ weights - 1
+
+
+def simulate_portfolio_returns(mean: np.ndarray, cov: np.ndarray, weights: np.ndarray, horizons: Sequence[int] = (1,),
+                               n_paths: int = 100000, seed: Optional[int] = None,
+                               parallel: Optional[bool] = None) -> np.ndarray:
+    """
+    Simulated buy-and-hold portfolio returns.
+
+    Args:
+        mean: Mean daily return per asset.
+        cov: Daily covariance matrix of the asset returns.
+        weights: Portfolio weight per asset.
+        horizons: Holding periods in days.
+        n_paths: Number of simulated paths.
+        seed: Seed for reproducible results (None draws fresh entropy).
+        parallel: Run the chunks on the process pool (default: only from PARALLEL_MIN_PATHS paths on).
+
+    Returns:
+        np.ndarray: (n_paths x len(horizons)) portfolio returns, columns in the order of sorted horizons.
+    """
+    mean = np.asarray(mean, dtype=float)
+    weights = np.asarray(weights, dtype=float)
+    horizons = np.array(sorted(set(int(h) for h in horizons)))
+    if n_paths < 1 or len(horizons) == 0 or horizons[0] < 1:
+        raise ValueError("Need at least one path and horizons of at least one day")
+    factor = cholesky_factor(np.atleast_2d(cov))
+
+    chunk_paths = max(1, CHUNK_ELEMENTS // (int(horizons[-1]) * len(mean)))
+    sizes = [min(chunk_paths, n_paths - start) for start in range(0, n_paths, chunk_paths)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    if parallel is None:
+        parallel = n_paths >= PARALLEL_MIN_PATHS and MAX_WORKERS > 1 and len(sizes) > 1
+
+    results = np.empty((n_paths, len(horizons)))
+    start = 0
+    if parallel:
+        chunks = _get_process_pool().map(_simulate_chunk, repeat(mean), repeat(factor), repeat(weights),
+                                         repeat(horizons), sizes, seeds)
+    else:
+        chunks = (_simulate_chunk(mean, factor, weights, horizons, size, chunk_seed)
+                  for size, chunk_seed in zip(sizes, seeds))
+    for chunk in chunks:
+        results[start:start + len(chunk)] = chunk
+        start += len(chunk)
+    return results
+
+
+def var_cvar(returns: np.ndarray, confidence_level: float = 0.95) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Value-at-Risk and Conditional VaR (expected shortfall) of simulated returns, per column.
+    Both are returned as positive loss fractions.
+    """
+    returns = np.asarray(returns, dtype=float).reshape(len(returns), -1)
+    tail = max(1, int(np.ceil(len(returns) * (1 - confidence_level))))
+    worst = np.partition(returns, tail - 1, axis=0)[:tail]  # the `tail` worst outcomes, unordered
+    var = -worst.max(axis=0)
+    cvar = -worst.mean(axis=0)
+    return var, cvar
@@ -0,0 +1,464 @@
+"""
+Vectorized multi-asset kernels for the risk & portfolio tools.
+
+Series are held as one (days x assets) float matrix with a list of asset names, instead of
+per-asset Python lists or a DataFrame rebuilt on every call.
+"""
+import math
+import heapq
+import threading
+import itertools
+import warnings
+import numpy as np
+from statistics import NormalDist
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from src.tools.data_store import ArrayLike, is_handle, resolve_array
+from src.tools.price_history_store import DAY_MS
+
+TRADING_DAYS = 252
+RETURN_METHODS = ("simple", "log")
+GAP_METHODS = ("ffill", "drop")
+# Largest weight grid simplex_grid() will generate
+MAX_GRID_PORTFOLIOS = 200000
+
+# Stacked matrices and their moments kept for reuse, keyed by the data handles they were built from
+MATRIX_CACHE_SIZE = 64
+_matrix_cache: "OrderedDict[tuple, object]" = OrderedDict()
+_matrix_cache_lock = threading.Lock()
+
+
+def stack_series(series: Dict[str, np.ndarray], pad: bool = False) -> Tuple[List[str], np.ndarray]:
+    """
+    Stack named 1D series into a (days x assets) matrix.
+    Series of different lengths are aligned on their most recent values and cut to the shortest,
+    or with pad=True NaN-padded at the start to the longest.
+    """
+    names = list(series)
+    lengths = [len(values) for values in series.values()]
+    length = (max if pad else min)(lengths, default=0)
+    matrix = np.full((length, len(names)), np.nan)
+    for column, name in enumerate(names):
+        values = series[name][max(0, len(series[name]) - length):]
+        matrix[length - len(values):, column] = values
+    return names, matrix
+
+
+def _cached(key: tuple, build):
+    """Return the cached value for key, building (and caching) it on a miss"""
+    with _matrix_cache_lock:
+        if key in _matrix_cache:
+            _matrix_cache.move_to_end(key)
+            return _matrix_cache[key]
+    value = build()
+    with _matrix_cache_lock:
+        _matrix_cache[key] = value
+        while len(_matrix_cache) > MATRIX_CACHE_SIZE:
+            _matrix_cache.popitem(last=False)
+    return value
+
+
+def series_matrix(data: Dict[str, ArrayLike]) -> Tuple[List[str], np.ndarray]:
+    """
+    stack_series() for a {name: list-or-handle} mapping.
+    When every series is a data handle the read-only matrix is cached, so the volatility, VaR and
+    correlation tools working on the same returns share one matrix instead of restacking it per call.
+    """
+    def build():
+        names, matrix = stack_series({name: resolve_array(values) for name, values in data.items()})
+        matrix.setflags(write=False)
+        return names, matrix
+
+    if not data or not all(is_handle(values) for values in data.values()):
+        return build()
+    return _cached(("matrix",) + tuple(data.items()), build)
+
+
+def series_moments(data: Dict[str, ArrayLike]) -> Dict:
+    """
+    Moments of a {name: list-or-handle} returns mapping, cached like series_matrix().
+
+    Returns:
+        dict: names, mean (daily mean per asset), cov (daily sample covariance) and
+              centered (the returns matrix minus its mean), all read-only.
+    """
+    def build():
+        names, returns = series_matrix(data)
+        mean = returns.mean(axis=0)
+        moments = {"names": names, "mean": mean, "cov": covariance_matrix(returns, periods_per_year=1),
+                   "centered": returns - mean}
+        for name in ("mean", "cov", "centered"):
+            moments[name].setflags(write=False)
+        return moments
+
+    if not data or not all(is_handle(values) for values in data.values()):
+        return build()
+    return _cached(("moments",) + tuple(data.items()), build)
+
+
+def align_series(series_by_name: Dict[str, Dict], gaps: Optional[str] = "ffill") -> Tuple[List[str], np.ndarray, np.ndarray]:
+    """
+    Align timestamped daily series on their calendar day.
+
+    Args:
+        series_by_name: {name: {"timestamps": [...ms], "prices": [...]}} as served by the price history store.
+                        When a series has several points on one day (e.g. the live intraday price) the last one is kept.
+        gaps: "ffill" carries the last price over days an asset is missing and starts at the first day every asset
+              has a price, "drop" keeps only the days every asset has a price, None leaves NaN in the gaps.
+
+    Returns:
+        tuple: (names, days as day numbers since epoch, (days x assets) price matrix)
+    """
+    if gaps is not None and gaps not in GAP_METHODS:
+        raise ValueError(f"Unknown gap handling {gaps!r}, expected one of {GAP_METHODS} or None")
+    names = list(series_by_name)
+    by_day = [dict(zip((ts // DAY_MS for ts in series["timestamps"]), series["prices"]))
+              for series in series_by_name.values()]
+    days = np.array(sorted(set().union(*by_day)), dtype=np.int64)
+    position = {day: i for i, day in enumerate(days.tolist())}
+    matrix = np.full((len(days), len(names)), np.nan)
+    for column, prices in enumerate(by_day):
+        matrix[[position[day] for day in prices], column] = list(prices.values())
+
+    if gaps == "ffill":
+        filled = np.where(np.isnan(matrix), 0, np.arange(len(days))[:, None])
+        np.maximum.accumulate(filled, axis=0, out=filled)
+        matrix = np.take_along_axis(matrix, filled, axis=0)
+    if gaps is not None:
+        complete = ~np.isnan(matrix).any(axis=1)
+        days, matrix = days[complete], matrix[complete]
+    return names, days, matrix
+
+
+def compute_returns(prices: np.ndarray, method: str = "simple") -> np.ndarray:
+    """
+    Period returns of a (days x assets) price matrix (or a single 1D series) in one vectorized pass.
+
+    Args:
+        prices: Prices, oldest first. NaN prices produce NaN returns.
+        method: "simple" for (p[t] - p[t-1]) / p[t-1], "log" for ln(p[t] / p[t-1]).
+
+    Returns:
+        np.ndarray: Returns with one row fewer than prices.
+    """
+    if method not in RETURN_METHODS:
+        raise ValueError(f"Unknown return method {method!r}, expected one of {RETURN_METHODS}")
+    prices = np.asarray(prices, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if method == "log":
+            return np.diff(np.log(prices), axis=0)
+        return np.diff(prices, axis=0) / prices[:-1]
+
+
+def covariance_matrix(returns: np.ndarray, periods_per_year: int = TRADING_DAYS) -> np.ndarray:
+    """Annualized sample covariance (ddof=1) of a (days x assets) returns matrix"""
+    return np.atleast_2d(np.cov(returns, rowvar=False)) * periods_per_year
+
+
+def correlation_matrix(returns: np.ndarray) -> np.ndarray:
+    """Pearson correlation of a (days x assets) returns matrix"""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.atleast_2d(np.corrcoef(returns, rowvar=False))
+
+
+def portfolio_shape_moments(centered: np.ndarray, weights: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Skewness and excess kurtosis (population moments) of the portfolio returns.
+
+    Args:
+        centered: Mean-centered (days x assets) returns.
+        weights: Weights per asset, or an (assets x portfolios) matrix to evaluate many weightings in one product.
+    """
+    portfolio = centered @ weights
+    squared = portfolio * portfolio
+    m2 = squared.mean(axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        skew = (squared * portfolio).mean(axis=0) / m2 ** 1.5
+        kurtosis = (squared * squared).mean(axis=0) / (m2 * m2) - 3
+    return skew, kurtosis
+
+
+def gaussian_var_es(mean, sigma, confidence_level: float = 0.95) -> Tuple:
+    """
+    Parametric (normal) Value-at-Risk and Expected Shortfall as positive loss fractions.
+    mean and sigma are the portfolio return mean and standard deviation over the horizon (scalars or arrays).
+    """
+    alpha = 1 - confidence_level
+    z = NormalDist().inv_cdf(alpha)
+    var = -(mean + z * sigma)
+    es = -(mean - sigma * NormalDist().pdf(z) / alpha)
+    return var, es
+
+
+def cornish_fisher_var_es(mean, sigma, skew, excess_kurtosis, confidence_level: float = 0.95) -> Tuple:
+    """
+    Cornish-Fisher (modified) Value-at-Risk and Expected Shortfall as positive loss fractions.
+
+    The normal quantile z is adjusted for skewness S and excess kurtosis K:
+        z_cf = z + (z^2 - 1) S / 6 + (z^3 - 3z) K / 24 - (2z^3 - 5z) S^2 / 36
+    and the shortfall is the mean of that expansion over the tail Z < z, using the truncated normal
+    moments I_k = E[Z^k; Z < z] (I_0 = alpha, I_1 = -pdf(z), I_k = -z^(k-1) pdf(z) + (k - 1) I_(k-2)).
+    """
+    alpha = 1 - confidence_level
+    z = NormalDist().inv_cdf(alpha)
+    z_cf = z + (z ** 2 - 1) * skew / 6 + (z ** 3 - 3 * z) * excess_kurtosis / 24 - (2 * z ** 3 - 5 * z) * skew ** 2 / 36
+    pdf = NormalDist().pdf(z)
+    i0, i1 = alpha, -pdf
+    i2 = -z * pdf + i0
+    i3 = -z ** 2 * pdf + 2 * i1
+    tail_z = (i1 + (i2 - i0) * skew / 6 + (i3 - 3 * i1) * excess_kurtosis / 24 - (2 * i3 - 5 * i1) * skew ** 2 / 36) / alpha
+    return -(mean + z_cf * sigma), -(mean + tail_z * sigma)
+
+
+def simplex_grid(n_assets: int, step: float = 0.1) -> np.ndarray:
+    """
+    Every long-only allocation of n_assets with weights in multiples of `step` summing to 1.
+
+    Returns:
+        np.ndarray: (n_assets x portfolios) weight matrix.
+    """
+    units = int(round(1 / step))
+    if units < 1 or not np.isclose(units * step, 1.0):
+        raise ValueError(f"Grid step {step} must divide 1")
+    count = math.comb(units + n_assets - 1, n_assets - 1)
+    if count > MAX_GRID_PORTFOLIOS:
+        raise ValueError(f"A {step} grid over {n_assets} assets has {count} portfolios (max {MAX_GRID_PORTFOLIOS}): use a coarser step")
+    # Stars and bars: the positions of n_assets - 1 bars among units + n_assets - 1 slots
+    bars = np.array(list(itertools.combinations(range(units + n_assets - 1), n_assets - 1)), dtype=np.int64)
+    bars = bars.reshape(count, n_assets - 1)
+    edges = np.hstack([np.full((count, 1), -1), bars, np.full((count, 1), units + n_assets - 1)])
+    return (np.diff(edges, axis=1) - 1).T / units
+
+
+def evaluate_weights(moments: Dict, weights: np.ndarray, confidence_level: float = 0.95,
+                     periods_per_year: int = TRADING_DAYS) -> Dict[str, np.ndarray]:
+    """
+    Risk and return of many portfolios in a few matrix products.
+
+    Args:
+        moments: series_moments() of the asset returns.
+        weights: (assets x portfolios) weight matrix.
+
+    Returns:
+        dict: One array per metric, one value per portfolio: expected_return and volatility (annualized),
+              var and es (1-day Cornish-Fisher, positive loss fractions), sharpe (return / volatility).
+    """
+    mean = moments["mean"] @ weights
+    variance = np.einsum("ik,ij,jk->k", weights, moments["cov"], weights)
+    sigma = np.sqrt(np.maximum(variance, 0))
+    skew, kurtosis = portfolio_shape_moments(moments["centered"], weights)
+    var, es = cornish_fisher_var_es(mean, sigma, np.nan_to_num(skew), np.nan_to_num(kurtosis), confidence_level)
+    expected_return = mean * periods_per_year
+    volatility = sigma * np.sqrt(periods_per_year)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sharpe = np.where(volatility > 0, expected_return / volatility, np.nan)
+    return {"expected_return": expected_return, "volatility": volatility, "var": var, "es": es, "sharpe": sharpe}
+
+
+def efficient_mask(risk: np.ndarray, reward: np.ndarray) -> np.ndarray:
+    """Pareto-efficient portfolios: no other portfolio has lower (or equal) risk and higher reward"""
+    order = np.lexsort((-reward, risk))
+    best_before = np.concatenate([[-np.inf], np.maximum.accumulate(reward[order])[:-1]])
+    mask = np.zeros(len(risk), dtype=bool)
+    mask[order] = reward[order] > best_before
+    return mask
+
+
+def _find(parent: List[int], i: int) -> int:
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+def correlation_summary(returns: np.ndarray, top_k: int = 10, cluster_threshold: float = 0.8,
+                        block_size: int = 256, dtype=np.float64) -> Dict:
+    """
+    Pairwise correlation statistics of a (days x assets) returns matrix without building the full matrix.
+
+    Columns are standardized once, then correlations are computed block by block (block_size x block_size)
+    as Z_i' Z_j / (days - 1). Each block feeds running statistics and is discarded: the sum of the
+    off-diagonal correlations, heaps of the top_k most and least correlated pairs, and a union-find of the
+    pairs correlated above cluster_threshold.
+
+    Returns:
+        dict: average (mean pairwise correlation), pairs (number of pairs), most_correlated and
+              least_correlated ([(i, j, corr)] sorted), clusters ([{"members": [...], "average": corr}] with at
+              least two assets, largest first) and constant (indices of assets without variance, left out).
+    """
+    returns = np.asarray(returns, dtype=np.float64)
+    days = len(returns)
+    std = returns.std(axis=0, ddof=1) if days > 1 else np.zeros(returns.shape[1])
+    constant = np.flatnonzero(~(std > 0))
+    active = np.flatnonzero(std > 0)
+    z = ((returns[:, active] - returns[:, active].mean(axis=0)) / std[active]).astype(dtype)
+    scale = 1 / (days - 1) if days > 1 else 0.0
+    n = len(active)
+
+    total, pairs = 0.0, n * (n - 1) // 2
+    most: List[tuple] = []  # min-heap of (corr, i, j)
+    least: List[tuple] = []  # min-heap of (-corr, i, j)
+    parent = list(range(n))
+
+    def offer(heap, keys, rows, cols):
+        if len(keys) > top_k:
+            best = np.argpartition(keys, -top_k)[-top_k:]
+            keys, rows, cols = keys[best], rows[best], cols[best]
+        for key, i, j in zip(keys.tolist(), rows.tolist(), cols.tolist()):
+            if len(heap) < top_k:
+                heapq.heappush(heap, (key, i, j))
+            elif key > heap[0][0]:
+                heapq.heapreplace(heap, (key, i, j))
+
+    for start_i in range(0, n, block_size):
+        z_i = z[:, start_i:start_i + block_size]
+        for start_j in range(start_i, n, block_size):
+            block = (z_i.T @ z[:, start_j:start_j + block_size]).astype(np.float64) * scale
+            if start_i == start_j:
+                rows, cols = np.triu_indices(len(block), k=1)
+                values = block[rows, cols]
+            else:
+                values = block.ravel()
+                rows, cols = np.divmod(np.arange(values.size), block.shape[1])
+            total += values.sum()
+            rows, cols = rows + start_i, cols + start_j
+            if top_k > 0 and len(values):
+                offer(most, values, rows, cols)
+                offer(least, -values, rows, cols)
+            for i, j in zip(rows[values >= cluster_threshold].tolist(), cols[values >= cluster_threshold].tolist()):
+                root_i, root_j = _find(parent, i), _find(parent, j)
+                if root_i != root_j:
+                    parent[root_j] = root_i
+
+    groups: Dict[int, List[int]] = {}
+    for i in range(n):
+        groups.setdefault(_find(parent, i), []).append(i)
+    clusters = []
+    for members in groups.values():
+        if len(members) > 1:
+            # Mean off-diagonal correlation from the column sum: sum(C) = |Z 1|^2 / (days - 1)
+            column_sum = z[:, members].astype(np.float64).sum(axis=1)
+            average = (column_sum @ column_sum * scale - len(members)) / (len(members) * (len(members) - 1))
+            clusters.append({"members": active[members].tolist(), "average": average})
+    clusters.sort(key=lambda cluster: -len(cluster["members"]))
+
+    def pairs_from(heap, sign):
+        return [(active[i].item(), active[j].item(), sign * key) for key, i, j in sorted(heap, reverse=True)]
+
+    return {
+        "average": total / pairs if pairs else np.nan,
+        "pairs": pairs,
+        "most_correlated": pairs_from(most, 1),
+        "least_correlated": pairs_from(least, -1),
+        "clusters": clusters,
+        "constant": constant.tolist(),
+    }
+
+
+def _rolling_sum(values: np.ndarray, window: int) -> np.ndarray:
+    """Sum over the last `window` rows at every row (NaN before the first full window), from one cumulative sum"""
+    result = np.full(values.shape, np.nan)
+    if len(values) >= window:
+        csum = np.cumsum(values, axis=0)
+        result[window - 1] = csum[window - 1]
+        result[window:] = csum[window:] - csum[:-window]
+    return result
+
+
+def rolling_statistics(returns: np.ndarray, benchmark: int, window: int = 30,
+                       periods_per_year: int = TRADING_DAYS) -> Dict[str, np.ndarray]:
+    """
+    Rolling volatility of every asset and its correlation and beta against one benchmark column.
+
+    Every statistic comes from rolling sums of x, x^2 and x * benchmark (one cumulative sum each), so the cost
+    is O(days) per asset whatever the window. Returns are centered on their full-sample mean first to keep
+    the sum-of-squares differences accurate.
+
+    Returns:
+        dict: (days x assets) arrays volatility (annualized sample std), correlation and beta,
+              NaN for the first window - 1 days.
+    """
+    if window < 2:
+        raise ValueError("Rolling window must be at least 2 days")
+    x = returns - returns.mean(axis=0)
+    b = x[:, [benchmark]]
+    sum_x, sum_b = _rolling_sum(x, window), _rolling_sum(b, window)
+    var_x = (_rolling_sum(x * x, window) - sum_x * sum_x / window) / (window - 1)
+    var_b = (_rolling_sum(b * b, window) - sum_b * sum_b / window) / (window - 1)
+    cov_xb = (_rolling_sum(x * b, window) - sum_x * sum_b / window) / (window - 1)
+    var_x, var_b = np.maximum(var_x, 0), np.maximum(var_b, 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        correlation = np.clip(cov_xb / np.sqrt(var_x * var_b), -1, 1)
+        beta = cov_xb / var_b
+    return {"volatility": np.sqrt(var_x * periods_per_year), "correlation": correlation, "beta": beta}
+
+
+def downsample_indices(length: int, points: int) -> np.ndarray:
+    """At most `points` evenly spaced indices ending at the latest row"""
+    if length <= points:
+        return np.arange(length)
+    return np.unique(np.linspace(length - 1, 0, points).round().astype(int))
+
+
+def drawdown_statistics(prices: np.ndarray, risk_free: float = 0.0, periods_per_year: int = TRADING_DAYS) -> Dict[str, np.ndarray]:
+    """
+    Drawdown, recovery and risk-adjusted return statistics of every column of a (days x assets) price matrix
+    in one vectorized pass. Leading NaNs (assets with a shorter history) are ignored.
+
+    Returns:
+        dict: One array per statistic, one value per asset (indices are rows of the matrix, -1 when not applicable):
+              max_drawdown and current_drawdown (negative fractions), peak, trough and recovery (row of the
+              peak before the worst drawdown, its trough and the first row back at the peak), current_duration
+              (rows since the last high), longest_duration (longest stretch below a previous high),
+              annual_return (CAGR), volatility, sharpe, sortino and calmar (annualized).
+    """
+    prices = np.asarray(prices, dtype=float)
+    days, assets = prices.shape
+    rows = np.arange(days)[:, None]
+    valid = ~np.isnan(prices)
+    first = np.where(valid.any(axis=0), valid.argmax(axis=0), days - 1)
+
+    running_max = np.fmax.accumulate(prices, axis=0)
+    with np.errstate(invalid="ignore"):
+        drawdown = prices / running_max - 1
+        at_high = prices >= running_max
+    last_high = np.maximum.accumulate(np.where(at_high, rows, -1), axis=0)
+    below_high = np.where(valid, rows - last_high, 0)
+
+    trough = np.argmin(np.nan_to_num(drawdown, nan=0.0), axis=0)
+    columns = np.arange(assets)
+    peak = last_high[trough, columns]
+    with np.errstate(invalid="ignore"):
+        recovered = (rows > trough) & (prices >= running_max[trough, columns])
+    recovery = np.where(recovered.any(axis=0), recovered.argmax(axis=0), -1)
+
+    returns = np.diff(prices, axis=0) / prices[:-1]
+    excess = returns - risk_free / periods_per_year
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # assets with fewer than two prices
+        mean = np.nanmean(returns, axis=0)
+        volatility = np.nanstd(returns, axis=0, ddof=1) * np.sqrt(periods_per_year)
+        downside = np.sqrt(np.nanmean(np.minimum(excess, 0) ** 2, axis=0)) * np.sqrt(periods_per_year)
+        periods = days - 1 - first
+        annual_return = (prices[-1] / prices[first, columns]) ** (periods_per_year / periods) - 1
+        max_drawdown = np.nanmin(drawdown, axis=0)
+        excess_annual = mean * periods_per_year - risk_free
+        sharpe = np.where(volatility > 0, excess_annual / volatility, np.nan)
+        sortino = np.where(downside > 0, excess_annual / downside, np.nan)
+        calmar = np.where(max_drawdown < 0, annual_return / -max_drawdown, np.nan)
+
+    no_drawdown = ~(max_drawdown < 0)
+    return {
+        "max_drawdown": max_drawdown,
+        "current_drawdown": drawdown[-1],
+        "peak": np.where(no_drawdown, -1, peak),
+        "trough": np.where(no_drawdown, -1, trough),
+        "recovery": np.where(no_drawdown, -1, recovery),
+        "current_duration": below_high[-1],
+        "longest_duration": below_high.max(axis=0),
+        "annual_return": annual_return,
+        "volatility": volatility,
+        "sharpe": sharpe,
+        "sortino": sortino,
+        "calmar": calmar,
+    }
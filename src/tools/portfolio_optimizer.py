@@ -0,0 +1,207 @@
+"""
+Long-only portfolio optimizers over the (optionally capped) simplex {w : sum(w) = 1, 0 <= w_i <= cap_i}.
+
+- Minimum variance: accelerated projected gradient (FISTA) on w'Cw
+- Maximum Sharpe: projected gradient ascent with backtracking (the Sharpe ratio is pseudo-concave where the
+  excess return is positive, so the stationary point found is the global maximum)
+- Equal risk contribution: cyclical coordinate descent on the convex risk-budgeting problem
+  min 0.5 y'Cy - sum(b_i log y_i), normalized to w = y / sum(y); caps are handled with an active set of
+  coins pinned at their cap while the others keep equal contributions
+
+Every solver accepts a starting point, and the last solution per objective and asset set is kept
+so repeated calls (e.g. after a price update) start close to the optimum.
+"""
+import threading
+import numpy as np
+from collections import OrderedDict
+from typing import Dict, Optional, Sequence, Tuple
+
+OBJECTIVES = ("min_variance", "max_sharpe", "risk_parity")
+DEFAULT_TOLERANCE = 1e-9
+DEFAULT_MAX_ITERATIONS = 10000
+
+# Last solution per (objective, asset names), used to warm-start the next solve
+WARM_START_SIZE = 128
+_warm_starts: "OrderedDict[tuple, np.ndarray]" = OrderedDict()
+_warm_starts_lock = threading.Lock()
+
+
+def project_capped_simplex(v: np.ndarray, caps: np.ndarray) -> np.ndarray:
+    """
+    Euclidean projection of v onto {w : sum(w) = 1, 0 <= w <= caps}.
+    w = clip(v - tau, 0, caps) where sum(w) is piecewise linear in tau, so tau is found exactly
+    by evaluating every breakpoint at once and interpolating.
+    """
+    if caps.sum() < 1 - 1e-12:
+        raise ValueError("Weight caps sum to less than 1: no feasible allocation")
+    breakpoints = np.unique(np.concatenate([v - caps, v]))
+    totals = np.clip(v[None, :] - breakpoints[:, None], 0, caps).sum(axis=1)  # non-increasing
+    k = np.searchsorted(-totals, -1.0, side="right") - 1
+    if k >= len(breakpoints) - 1 or totals[k] == totals[k + 1]:
+        tau = breakpoints[k]
+    else:
+        tau = breakpoints[k] + (totals[k] - 1) * (breakpoints[k + 1] - breakpoints[k]) / (totals[k] - totals[k + 1])
+    return np.clip(v - tau, 0, caps)
+
+
+def _start(initial: Optional[np.ndarray], caps: np.ndarray) -> np.ndarray:
+    n = len(caps)
+    return project_capped_simplex(np.full(n, 1 / n) if initial is None else np.asarray(initial, dtype=float), caps)
+
+
+def min_variance(cov: np.ndarray, caps: np.ndarray, initial: Optional[np.ndarray] = None,
+                 tol: float = DEFAULT_TOLERANCE, max_iterations: int = DEFAULT_MAX_ITERATIONS) -> Tuple[np.ndarray, int]:
+    """Minimum-variance weights and the number of iterations used"""
+    step = 1 / (2 * np.linalg.eigvalsh(cov)[-1])  # 1 / Lipschitz constant of the gradient 2Cw
+    w = _start(initial, caps)
+    y, t = w, 1.0
+    for iteration in range(1, max_iterations + 1):
+        w_next = project_capped_simplex(y - step * 2 * (cov @ y), caps)
+        if np.abs(w_next - w).max() < tol:
+            return w_next, iteration
+        if (w_next - w) @ (y - w_next) > 0:  # momentum points uphill: restart
+            t = 1.0
+        t_next = (1 + np.sqrt(1 + 4 * t * t)) / 2
+        y = w_next + (t - 1) / t_next * (w_next - w)
+        w, t = w_next, t_next
+    return w, max_iterations
+
+
+def max_sharpe(mean: np.ndarray, cov: np.ndarray, caps: np.ndarray, risk_free: float = 0.0,
+               initial: Optional[np.ndarray] = None, tol: float = DEFAULT_TOLERANCE,
+               max_iterations: int = DEFAULT_MAX_ITERATIONS) -> Tuple[np.ndarray, int]:
+    """Maximum-Sharpe weights (mean, cov and risk_free in the same units) and the number of iterations used"""
+    excess = mean - risk_free
+
+    def sharpe_and_gradient(w):
+        cov_w = cov @ w
+        sigma = np.sqrt(w @ cov_w)
+        ratio = (excess @ w) / sigma
+        return ratio, excess / sigma - ratio * cov_w / (sigma * sigma)
+
+    w = _start(initial, caps)
+    ratio, gradient = sharpe_and_gradient(w)
+    step = 1.0 / max(np.abs(gradient).max(), 1e-12)
+    for iteration in range(1, max_iterations + 1):
+        while True:
+            candidate = project_capped_simplex(w + step * gradient, caps)
+            candidate_ratio, candidate_gradient = sharpe_and_gradient(candidate)
+            # Armijo condition along the projection arc
+            if candidate_ratio >= ratio + 1e-4 * gradient @ (candidate - w) or step < 1e-12:
+                break
+            step /= 2
+        converged = np.abs(candidate - w).max() < tol
+        w, ratio, gradient = candidate, candidate_ratio, candidate_gradient
+        if converged:
+            return w, iteration
+        step *= 2
+    return w, max_iterations
+
+
+def _risk_budget_sweeps(cov: np.ndarray, budgets: np.ndarray, capped: np.ndarray, caps: np.ndarray,
+                        start: np.ndarray, tol: float, max_iterations: int) -> Tuple[np.ndarray, int]:
+    """
+    Weights with the capped coins pinned at their cap and risk contributions proportional to the budgets
+    among the others. Solved on the unnormalized y (w = y / S) where the pinned coins are kept at cap * S
+    with S = sum(free y) / (1 - sum(pinned caps)), so the free coordinates stay a convex risk-budgeting problem.
+    """
+    free = np.flatnonzero(~capped)
+    pinned_total = caps[capped].sum()
+    diagonal = np.diag(cov)
+    y = np.maximum(start, 1e-12).copy()
+    scale = y[free].sum() / (1 - pinned_total)
+    y[capped] = caps[capped] * scale
+    y /= np.sqrt(y @ cov @ y)
+    for sweep in range(1, max_iterations + 1):
+        previous = y / y.sum()
+        scale = y[free].sum() / (1 - pinned_total)
+        y[capped] = caps[capped] * scale
+        cov_y = cov @ y
+        for i in free:
+            # Solve C_ii y_i^2 + c_i y_i - b_i = 0 for y_i, with c_i the cross terms
+            cross = cov_y[i] - diagonal[i] * y[i]
+            updated = (-cross + np.sqrt(cross * cross + 4 * diagonal[i] * budgets[i])) / (2 * diagonal[i])
+            cov_y += cov[:, i] * (updated - y[i])
+            y[i] = updated
+        y[capped] = caps[capped] * y[free].sum() / (1 - pinned_total)
+        if np.abs(y / y.sum() - previous).max() < tol:
+            break
+    return y / y.sum(), sweep
+
+
+def risk_parity(cov: np.ndarray, caps: np.ndarray, budgets: Optional[np.ndarray] = None,
+                initial: Optional[np.ndarray] = None, tol: float = DEFAULT_TOLERANCE,
+                max_iterations: int = DEFAULT_MAX_ITERATIONS) -> Tuple[np.ndarray, int]:
+    """
+    Equal-risk-contribution (or risk-budget) weights and the number of sweeps used.
+    With caps, an active set of coins is pinned at their cap and the remaining coins share risk in
+    proportion to their budgets; a pinned coin is released once its contribution exceeds theirs.
+    """
+    n = len(cov)
+    budgets = np.full(n, 1 / n) if budgets is None else np.asarray(budgets, dtype=float) / np.sum(budgets)
+    start = _start(initial, np.ones(n))
+    capped = np.zeros(n, dtype=bool)
+    total_sweeps = 0
+    for _ in range(2 * n + 1):
+        if capped.all():
+            return caps / caps.sum(), total_sweeps
+        w, sweeps = _risk_budget_sweeps(cov, budgets, capped, caps, start, tol, max_iterations)
+        total_sweeps += sweeps
+        over = ~capped & (w > caps + tol)
+        # A pinned coin is only binding while it would take more risk than its budget share allows
+        contributions = risk_contributions(w, cov) / budgets
+        free_level = contributions[~capped].max() if (~capped).any() else np.inf
+        release = capped & (contributions > free_level * (1 + 1e-6))
+        if not over.any() and not release.any():
+            return w, total_sweeps
+        capped = (capped | over) & ~release
+        start = w
+    return project_capped_simplex(w, caps), total_sweeps
+
+
+def risk_contributions(weights: np.ndarray, cov: np.ndarray) -> np.ndarray:
+    """Share of the portfolio variance contributed by each asset (sums to 1)"""
+    contributions = weights * (cov @ weights)
+    return contributions / contributions.sum()
+
+
+def resolve_caps(names: Sequence[str], max_weight) -> np.ndarray:
+    """Per-asset caps from None (uncapped), one cap for every asset or a {name: cap} dict"""
+    if max_weight is None:
+        return np.ones(len(names))
+    if isinstance(max_weight, dict):
+        return np.array([float(max_weight.get(name, 1.0)) for name in names])
+    return np.full(len(names), float(max_weight))
+
+
+def optimize(objective: str, names: Sequence[str], mean: np.ndarray, cov: np.ndarray, caps: np.ndarray,
+             risk_free: float = 0.0, initial: Optional[np.ndarray] = None) -> Dict:
+    """
+    Solve one objective, warm-starting from `initial` or from the last solution for the same assets.
+
+    Returns:
+        dict: weights (array), iterations and warm_started.
+    """
+    if objective not in OBJECTIVES:
+        raise ValueError(f"Unknown objective {objective!r}, expected one of {OBJECTIVES}")
+    key = (objective, tuple(names))
+    if initial is None:
+        with _warm_starts_lock:
+            initial = _warm_starts.get(key)
+    warm_started = initial is not None
+
+    if objective == "min_variance":
+        weights, iterations = min_variance(cov, caps, initial)
+    elif objective == "max_sharpe":
+        if initial is None:
+            initial, _ = min_variance(cov, caps)  # start from a feasible low-risk point
+        weights, iterations = max_sharpe(mean, cov, caps, risk_free, initial)
+    else:
+        weights, iterations = risk_parity(cov, caps, initial=initial)
+
+    with _warm_starts_lock:
+        _warm_starts[key] = weights
+        _warm_starts.move_to_end(key)
+        while len(_warm_starts) > WARM_START_SIZE:
+            _warm_starts.popitem(last=False)
+    return {"weights": weights, "iterations": iterations, "warm_started": warm_started}
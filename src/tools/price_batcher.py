@@ -0,0 +1,255 @@
+import time
+import asyncio
+import threading
+import weakref
+import requests
+from typing import Dict, Iterable, List, Optional
+from src.tools.market_data_client import get_market_data_client, is_stale_read, is_upstream_failure, mark_stale_read
+from src.tools.async_market_data_client import get_async_market_data_client
+
+# How long (seconds) a single-coin request waits for others to join its batch while other lookups are in progress
+DEFAULT_BATCH_WINDOW = 0.025
+# Maximum number of ids sent in one /simple/price request (keeps the url short)
+MAX_IDS_PER_REQUEST = 250
+
+
+class _PendingBatch:
+    """Single-coin requests collected during one batching window"""
+
+    def __init__(self):
+        self.coin_ids = set()
+        self.vs_currencies = set()
+        self.done = threading.Event()
+        self.result: Dict = {}
+        self.error: BaseException = None
+        self.stale = False
+
+
+class PriceBatcher:
+    """
+    Batches current price lookups into as few /simple/price requests as possible
+
+    Responsibilities:
+    - Fetch many coins and currencies in one request (ids and vs_currencies are comma-separated)
+    - Merge single-coin lookups made within a short window into one upstream request
+    - Cache prices per (coin_id, vs_currency) in the client's "simple_price" cache
+    - Fall back to expired cached prices (flagged as stale) while the API is degraded
+    """
+
+    def __init__(self, batch_window: float = DEFAULT_BATCH_WINDOW, max_ids_per_request: int = MAX_IDS_PER_REQUEST):
+        self.batch_window = batch_window
+        self.max_ids_per_request = max_ids_per_request
+        self._pending: Optional[_PendingBatch] = None
+        self._active = 0  # single-coin lookups currently waiting on or fetching a batch
+        self._lock = threading.Lock()
+        self._async_pending: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()  # loop: (batch, flush task)
+        self._async_active: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()  # loop: lookups awaiting a batch
+
+    @staticmethod
+    def _cache_key(coin_id: str, vs_currency: str) -> tuple:
+        return ("price", coin_id, vs_currency)
+
+    def get_prices(self, coin_ids: Iterable[str], vs_currencies: Iterable[str]) -> Dict[str, Dict[str, float]]:
+        """
+        Fetches current prices for several coins in one round-trip (cached pairs are not re-requested).
+
+        Args:
+            coin_ids (iterable): CoinGecko coin IDs (e.g., ["bitcoin", "ethereum"]).
+            vs_currencies (iterable): Currencies to price against (e.g., ["usd", "eur"]).
+
+        Returns:
+            dict: Same shape as /simple/price, e.g. {"bitcoin": {"usd": 30000}, "ethereum": {"usd": 2000}}.
+                  Unknown coin ids are left out.
+
+        Raises:
+            requests.exceptions.RequestException: If the request fails.
+        """
+        coin_ids, vs_currencies, result, missing = self._lookup_cached(coin_ids, vs_currencies)
+        client = get_market_data_client()
+        try:
+            for params in self._request_params(missing, vs_currencies):
+                data = client.get("/simple/price", params=params, endpoint="simple_price", use_cache=False)
+                self._store(result, data)
+        except requests.exceptions.RequestException as e:
+            self._fill_stale(result, missing, vs_currencies, e)
+        return {coin_id: result[coin_id] for coin_id in coin_ids if coin_id in result}
+
+    async def aget_prices(self, coin_ids: Iterable[str], vs_currencies: Iterable[str]) -> Dict[str, Dict[str, float]]:
+        """Non-blocking version of get_prices()"""
+        coin_ids, vs_currencies, result, missing = self._lookup_cached(coin_ids, vs_currencies)
+        client = get_async_market_data_client()
+        try:
+            responses = await asyncio.gather(*[
+                client.get("/simple/price", params=params, endpoint="simple_price", use_cache=False)
+                for params in self._request_params(missing, vs_currencies)
+            ])
+            for data in responses:
+                self._store(result, data)
+        except requests.exceptions.RequestException as e:
+            self._fill_stale(result, missing, vs_currencies, e)
+        return {coin_id: result[coin_id] for coin_id in coin_ids if coin_id in result}
+
+    def _lookup_cached(self, coin_ids: Iterable[str], vs_currencies: Iterable[str]) -> tuple:
+        """Split the request into cached quotes and coin ids that still need fetching"""
+        coin_ids = list(dict.fromkeys(coin_ids))
+        vs_currencies = list(dict.fromkeys(vs_currencies))
+        cache = get_market_data_client().caches.get("simple_price")
+
+        result: Dict[str, Dict[str, float]] = {}
+        missing = []
+        for coin_id in coin_ids:
+            for vs_currency in vs_currencies:
+                price = cache.get(self._cache_key(coin_id, vs_currency)) if cache is not None else None
+                if price is None:
+                    missing.append(coin_id)
+                    break
+                result.setdefault(coin_id, {})[vs_currency] = price
+        return coin_ids, vs_currencies, result, missing
+
+    def _request_params(self, coin_ids: List[str], vs_currencies: List[str]) -> List[Dict]:
+        return [
+            {"ids": ",".join(coin_ids[start:start + self.max_ids_per_request]), "vs_currencies": ",".join(vs_currencies)}
+            for start in range(0, len(coin_ids), self.max_ids_per_request)
+        ]
+
+    def _fill_stale(self, result: Dict, coin_ids: List[str], vs_currencies: List[str], error: requests.exceptions.RequestException):
+        """Answer with expired cached prices when the API is degraded, or re-raise if any price is unknown"""
+        cache = get_market_data_client().caches.get("simple_price")
+        if cache is None or not is_upstream_failure(error):
+            raise error
+        for coin_id in coin_ids:
+            for vs_currency in vs_currencies:
+                price = cache.get_stale(self._cache_key(coin_id, vs_currency))
+                if price is None:
+                    raise error
+                result.setdefault(coin_id, {})[vs_currency] = price
+        print(f"Warning: serving stale prices ({error})")
+        mark_stale_read()
+
+    def _store(self, result: Dict, data: Dict):
+        cache = get_market_data_client().caches.get("simple_price")
+        for coin_id, quotes in data.items():
+            result[coin_id] = quotes
+            if cache is not None:
+                for vs_currency, price in quotes.items():
+                    cache.set(self._cache_key(coin_id, vs_currency), price)
+
+    def get_price(self, coin_id: str, vs_currency: str) -> Dict[str, Dict[str, float]]:
+        """
+        Fetches one coin's price, sharing an upstream request with other lookups made in the same window.
+        A lookup made while no other one is in progress is fetched immediately, without waiting for the window.
+
+        Args:
+            coin_id (str): CoinGecko coin ID (e.g., "bitcoin").
+            vs_currency (str): Currency to price against (e.g., "usd").
+
+        Returns:
+            dict: e.g. {"bitcoin": {"usd": 30000}}, or {} if the coin is unknown.
+
+        Raises:
+            requests.exceptions.RequestException: If the request fails.
+        """
+        cache = get_market_data_client().caches.get("simple_price")
+        price = cache.get(self._cache_key(coin_id, vs_currency)) if cache is not None else None
+        if price is not None:
+            return {coin_id: {vs_currency: price}}
+
+        with self._lock:
+            batch = self._pending
+            leader = batch is None
+            if leader:
+                batch = self._pending = _PendingBatch()
+            batch.coin_ids.add(coin_id)
+            batch.vs_currencies.add(vs_currency)
+            # Only wait for company when other lookups are in progress: a lone sequential call fetches at once
+            wait = self._active > 0
+            self._active += 1
+
+        try:
+            if leader:
+                if wait:
+                    time.sleep(self.batch_window)
+                with self._lock:
+                    self._pending = None
+                try:
+                    batch.result = self.get_prices(sorted(batch.coin_ids), sorted(batch.vs_currencies))
+                    batch.stale = is_stale_read()
+                except BaseException as e:
+                    batch.error = e
+                finally:
+                    batch.done.set()
+            else:
+                batch.done.wait()
+                if batch.stale:
+                    mark_stale_read()
+        finally:
+            with self._lock:
+                self._active -= 1
+
+        if batch.error is not None:
+            raise batch.error
+        quotes = batch.result.get(coin_id, {})
+        if vs_currency not in quotes:
+            return {}
+        return {coin_id: {vs_currency: quotes[vs_currency]}}
+
+    async def aget_price(self, coin_id: str, vs_currency: str) -> Dict[str, Dict[str, float]]:
+        """
+        Non-blocking version of get_price(): coroutines on the same event loop share one batch.
+        The batch is flushed by its own task, so a cancelled caller never cancels the others' lookups.
+        """
+        cache = get_market_data_client().caches.get("simple_price")
+        price = cache.get(self._cache_key(coin_id, vs_currency)) if cache is not None else None
+        if price is not None:
+            return {coin_id: {vs_currency: price}}
+
+        loop = asyncio.get_running_loop()
+        pending = self._async_pending.get(loop)
+        if pending is None:
+            batch = _PendingBatch()
+            # Like get_price(): only wait for company when other lookups on this loop are in progress.
+            # Lookups started in the same loop iteration (e.g. asyncio.gather) still join, since the flush task starts later
+            wait = self._async_active.get(loop, 0) > 0
+            flush = loop.create_task(self._flush_async_batch(loop, batch, wait))
+            flush.add_done_callback(lambda task: task.cancelled() or task.exception())  # failure is re-raised to the callers
+            pending = self._async_pending[loop] = (batch, flush)
+        batch, flush = pending
+        batch.coin_ids.add(coin_id)
+        batch.vs_currencies.add(vs_currency)
+
+        self._async_active[loop] = self._async_active.get(loop, 0) + 1
+        try:
+            quotes = (await asyncio.shield(flush)).get(coin_id, {})
+        finally:
+            self._async_active[loop] -= 1
+        if batch.stale and not is_stale_read():
+            mark_stale_read()
+        if vs_currency not in quotes:
+            return {}
+        return {coin_id: {vs_currency: quotes[vs_currency]}}
+
+    async def _flush_async_batch(self, loop: asyncio.AbstractEventLoop, batch: _PendingBatch, wait: bool) -> Dict:
+        """Close the batch (after the window, if waiting) and fetch every coin it collected"""
+        try:
+            if wait:
+                await asyncio.sleep(self.batch_window)
+        finally:
+            self._async_pending.pop(loop, None)
+        result = await self.aget_prices(sorted(batch.coin_ids), sorted(batch.vs_currencies))
+        batch.stale = is_stale_read()
+        return result
+
+
+_batcher: Optional[PriceBatcher] = None
+_batcher_lock = threading.Lock()
+
+
+def get_price_batcher() -> PriceBatcher:
+    """Return the process-wide price batcher, creating it on first use"""
+    global _batcher
+    if _batcher is None:
+        with _batcher_lock:
+            if _batcher is None:
+                _batcher = PriceBatcher()
+    return _batcher
+
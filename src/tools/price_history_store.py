@@ -0,0 +1,264 @@
+import os
+import json
+import math
+import time
+import tempfile
+import bisect
+import asyncio
+import threading
+import weakref
+import requests
+from typing import Dict, List, Optional
+from src.tools.market_data_client import get_market_data_client, is_upstream_failure, mark_stale_read
+from src.tools.async_market_data_client import get_async_market_data_client
+
+DAY_MS = 24 * 60 * 60 * 1000
+
+# Where the daily close/volume series are persisted (one JSON file per coin and currency)
+DEFAULT_STORE_DIR = os.getenv(
+    "PRICE_HISTORY_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "data", "price_history"),
+)
+# Minimum age (seconds) of the latest intraday price before it is refreshed from the API
+DEFAULT_LIVE_REFRESH_SECONDS = 60
+
+
+class PriceHistoryStore:
+    """
+    Incremental on-disk store of daily close prices and volumes from /coins/{id}/market_chart
+
+    Responsibilities:
+    - Persist completed daily points (timestamp, close, volume) per (coin_id, vs_currency)
+    - On request, fetch only the days missing since the last sync (plus the latest intraday point)
+    - Serve any `days` window by slicing the stored series locally
+    - Keep serving the stored series (flagged as stale) while the API is degraded
+    """
+
+    def __init__(self, store_dir: str = DEFAULT_STORE_DIR, live_refresh_seconds: float = DEFAULT_LIVE_REFRESH_SECONDS):
+        self.store_dir = os.path.abspath(store_dir)
+        self.live_refresh_seconds = live_refresh_seconds
+        self._records: Dict[tuple, Dict] = {}
+        self._locks: Dict[tuple, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+        self._async_locks: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+    def _lock_for(self, key: tuple) -> threading.Lock:
+        with self._locks_guard:
+            if key not in self._locks:
+                self._locks[key] = threading.Lock()
+            return self._locks[key]
+
+    def _path_for(self, coin_id: str, vs_currency: str) -> str:
+        safe_name = "".join(c if c.isalnum() or c in "-_" else "_" for c in f"{coin_id}_{vs_currency}")
+        return os.path.join(self.store_dir, f"{safe_name}.json")
+
+    def _load(self, coin_id: str, vs_currency: str) -> Dict:
+        key = (coin_id, vs_currency)
+        if key in self._records:
+            return self._records[key]
+
+        record = {"coin_id": coin_id, "vs_currency": vs_currency, "timestamps": [], "prices": [], "volumes": [],
+                  "live": None, "covered_from": None, "last_sync": None}
+        path = self._path_for(coin_id, vs_currency)
+        if os.path.exists(path):
+            try:
+                with open(path, "r") as f:
+                    record.update(json.load(f))
+            except (OSError, ValueError) as e:
+                print(f"Warning: ignoring unreadable price history file {path}: {e}")
+        self._records[key] = record
+        return record
+
+    def _save(self, record: Dict):
+        path = self._path_for(record["coin_id"], record["vs_currency"])
+        try:
+            os.makedirs(self.store_dir, exist_ok=True)
+            # Unique temp file per write so concurrent saves of one coin never share a partial file
+            with tempfile.NamedTemporaryFile("w", dir=self.store_dir, prefix=os.path.basename(path), suffix=".tmp", delete=False) as f:
+                json.dump(record, f)
+            os.replace(f.name, path)
+        except OSError as e:
+            print(f"Warning: could not persist price history to {path}: {e}")
+
+    def _fetch(self, coin_id: str, vs_currency: str, days: int) -> Dict:
+        params = {"vs_currency": vs_currency, "days": days, "interval": "daily"}
+        return get_market_data_client().get(f"/coins/{coin_id}/market_chart", params=params, endpoint="market_chart")
+
+    @staticmethod
+    def _merge(record: Dict, data: Dict):
+        """Merge a market_chart payload into the record: every point but the last is a completed day"""
+        prices = data.get("prices", [])
+        total_volumes = data.get("total_volumes", [])
+        if not prices:
+            return
+        if len(total_volumes) == len(prices):
+            volumes = [volume for _, volume in total_volumes]
+        else:
+            volume_by_ts = {int(ts): volume for ts, volume in total_volumes}
+            volumes = [volume_by_ts.get(int(ts), 0.0) for ts, _ in prices]
+
+        days = {ts // DAY_MS: (ts, p, v) for ts, p, v in zip(record["timestamps"], record["prices"], record["volumes"])}
+        for (ts, price), volume in zip(prices[:-1], volumes[:-1]):
+            ts = int(ts)
+            days[ts // DAY_MS] = (ts, price, volume)
+
+        merged = [days[day] for day in sorted(days)]
+        record["timestamps"] = [point[0] for point in merged]
+        record["prices"] = [point[1] for point in merged]
+        record["volumes"] = [point[2] for point in merged]
+
+        live_ts, live_price = prices[-1]
+        record["live"] = [int(live_ts), live_price, volumes[-1]]
+
+    def _plan_sync(self, record: Dict, days: int, now_ms: int) -> Optional[tuple]:
+        """Return (fetch_days, covered_from) for the request needed to bring the record up to date, or None"""
+        oldest_needed = now_ms - days * DAY_MS
+        timestamps = record["timestamps"]
+        covered_from = record.get("covered_from")
+        if not timestamps or covered_from is None or covered_from > oldest_needed + DAY_MS:
+            # Not enough history stored yet: backfill the full window once
+            return days, oldest_needed if covered_from is None else min(covered_from, oldest_needed)
+
+        # Freshness of the live point is measured from our last fetch, not from CoinGecko's (often older) point timestamp
+        last_sync = record.get("last_sync")
+        live_age = (now_ms - last_sync) / 1000 if record.get("live") and last_sync is not None else math.inf
+        if timestamps[-1] // DAY_MS >= now_ms // DAY_MS - 1 and live_age < self.live_refresh_seconds:
+            return None
+        # Delta fetch: only the days since the last completed point
+        return max(1, math.ceil((now_ms - timestamps[-1]) / DAY_MS)), covered_from
+
+    def _prepare_sync(self, coin_id: str, vs_currency: str, days: int) -> tuple:
+        """Load the record and plan its sync under the coin's lock. Returns (record, now_ms, plan)."""
+        with self._lock_for((coin_id, vs_currency)):
+            record = self._load(coin_id, vs_currency)
+            now_ms = int(time.time() * 1000)
+            return record, now_ms, self._plan_sync(record, int(days), now_ms)
+
+    def _apply_fetch(self, record: Dict, data: Dict, covered_from: int, now_ms: int):
+        """Merge a fetch and persist the record under the coin's lock"""
+        with self._lock_for((record["coin_id"], record["vs_currency"])):
+            self._merge(record, data)
+            # Concurrent fetches may land in any order: never forget history a wider fetch already covered
+            if record.get("covered_from") is not None:
+                covered_from = min(covered_from, record["covered_from"])
+            record["covered_from"] = covered_from
+            record["last_sync"] = now_ms
+            self._save(record)
+
+    def sync(self, coin_id: str, vs_currency: str = "usd", days: int = 30) -> Dict:
+        """
+        Makes sure the stored series covers the last `days` days and is up to date.
+        Only the missing days are requested from the API.
+
+        Args:
+            coin_id (str): CoinGecko coin ID (e.g., "bitcoin").
+            vs_currency (str): Currency to price against (e.g., "usd").
+            days (int): Number of days of history that must be available.
+
+        Returns:
+            dict: The stored record for (coin_id, vs_currency).
+
+        Raises:
+            requests.exceptions.RequestException: If a required fetch fails.
+        """
+        # The coin's lock is only held to plan and to merge, never across the (possibly retried) fetch
+        record, now_ms, plan = self._prepare_sync(coin_id, vs_currency, days)
+        if plan is None:
+            return record
+
+        fetch_days, covered_from = plan
+        try:
+            data = self._fetch(coin_id, vs_currency, fetch_days)
+        except requests.exceptions.RequestException as e:
+            return self._serve_stored(record, e)
+        self._apply_fetch(record, data, covered_from, now_ms)
+        return record
+
+    async def async_sync(self, coin_id: str, vs_currency: str = "usd", days: int = 30) -> Dict:
+        """
+        Non-blocking version of sync(): the delta fetch goes through the async market data client,
+        and the file I/O and the coin's thread lock are only touched from worker threads.
+        """
+        async with self._async_lock_for((coin_id, vs_currency)):
+            record, now_ms, plan = await asyncio.to_thread(self._prepare_sync, coin_id, vs_currency, days)
+            if plan is None:
+                return record
+
+            fetch_days, covered_from = plan
+            params = {"vs_currency": vs_currency, "days": fetch_days, "interval": "daily"}
+            try:
+                data = await get_async_market_data_client().get(f"/coins/{coin_id}/market_chart", params=params, endpoint="market_chart")
+            except requests.exceptions.RequestException as e:
+                return self._serve_stored(record, e)
+            await asyncio.to_thread(self._apply_fetch, record, data, covered_from, now_ms)
+            return record
+
+    @staticmethod
+    def _serve_stored(record: Dict, error: requests.exceptions.RequestException) -> Dict:
+        """Fall back to the stored series when the API is degraded, or re-raise if nothing is stored"""
+        if not record["timestamps"] or not is_upstream_failure(error):
+            raise error
+        print(f"Warning: serving stored price history for {record['coin_id']} ({error})")
+        mark_stale_read()
+        return record
+
+    def _async_lock_for(self, key: tuple) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        locks = self._async_locks.setdefault(loop, {})
+        if key not in locks:
+            locks[key] = asyncio.Lock()
+        return locks[key]
+
+    def _slice(self, coin_id: str, vs_currency: str, record: Dict, days: int) -> Dict[str, List]:
+        with self._lock_for((coin_id, vs_currency)):
+            now_ms = int(time.time() * 1000)
+            start = bisect.bisect_left(record["timestamps"], now_ms - int(days) * DAY_MS)
+            timestamps = record["timestamps"][start:]
+            prices = record["prices"][start:]
+            volumes = record["volumes"][start:]
+
+            live = record.get("live")
+            if live and (not timestamps or live[0] > timestamps[-1]):
+                timestamps = timestamps + [live[0]]
+                prices = prices + [live[1]]
+                volumes = volumes + [live[2]]
+
+        return {"timestamps": timestamps, "prices": prices, "volumes": volumes}
+
+    def get_series(self, coin_id: str, vs_currency: str = "usd", days: int = 30) -> Dict[str, List]:
+        """
+        Returns the daily close/volume series for the last `days` days, syncing first if needed.
+
+        Args:
+            coin_id (str): CoinGecko coin ID (e.g., "bitcoin").
+            vs_currency (str): Currency to price against (e.g., "usd").
+            days (int): Number of days of history.
+
+        Returns:
+            dict: {"timestamps": [...], "prices": [...], "volumes": [...]} in chronological order,
+                  ending with the latest intraday price (timestamps in ms since epoch).
+
+        Raises:
+            requests.exceptions.RequestException: If a required fetch fails.
+        """
+        record = self.sync(coin_id, vs_currency, days)
+        return self._slice(coin_id, vs_currency, record, days)
+
+    async def aget_series(self, coin_id: str, vs_currency: str = "usd", days: int = 30) -> Dict[str, List]:
+        """Non-blocking version of get_series()"""
+        record = await self.async_sync(coin_id, vs_currency, days)
+        return await asyncio.to_thread(self._slice, coin_id, vs_currency, record, days)
+
+
+_store: Optional[PriceHistoryStore] = None
+_store_lock = threading.Lock()
+
+
+def get_price_history_store() -> PriceHistoryStore:
+    """Return the process-wide price history store, creating it on first use"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = PriceHistoryStore()
+    return _store
@@ -1,19 +1,27 @@
-from typing import Any
+from typing import Any, Optional
 from src.tools.base import AgentTool
-from langchain_core.tools import tool
+from langchain_core.tools import tool, StructuredTool
 
 
 class PythonTool(AgentTool):
-    """Wrapper for raw Python functions"""
-    
-    def __init__(self, func: callable):
+    """Wrapper for raw Python functions, with an optional native async implementation"""
+
+    def __init__(self, func: callable, coroutine: Optional[callable] = None):
         name = func.__name__
         description = func.__doc__ or f"Execute {name}"
         super().__init__(name, description)
         self.func = func
-    
+        self.coroutine = coroutine
+
     def execute(self, **kwargs) -> Any:
         return self.func(**kwargs)
-    
+
+    async def aexecute(self, **kwargs) -> Any:
+        if self.coroutine is not None:
+            return await self.coroutine(**kwargs)
+        return await super().aexecute(**kwargs)
+
     def to_langchain_tool(self):
-        return tool(self.func)
\ No newline at end of file
+        if self.coroutine is not None:
+            return StructuredTool.from_function(func=self.func, coroutine=self.coroutine, name=self.name)
+        return tool(self.func)
@@ -0,0 +1,120 @@
+import time
+import random
+import asyncio
+import threading
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+
+class TokenBucket:
+    """
+    Process-wide token bucket rate limiter, usable from threads and coroutines
+
+    Responsibilities:
+    - Allow `requests_per_minute` on average with bursts of up to `burst` requests
+    - Queue callers fairly by reserving tokens in arrival order (waiting is done outside the lock)
+    - Record how long callers waited in the queue
+    """
+
+    def __init__(self, requests_per_minute: float, burst: int = 5):
+        self.rate = requests_per_minute / 60.0  # tokens per second
+        self.capacity = max(1, burst)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self.acquired = 0
+        self.delayed = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def _reserve(self) -> float:
+        """Take one token (possibly going into debt) and return how long the caller must wait for it"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+            self.acquired += 1
+            if wait > 0:
+                self.delayed += 1
+                self.total_wait += wait
+                self.max_wait = max(self.max_wait, wait)
+            return wait
+
+    def acquire(self) -> float:
+        """Block until a request may be sent. Returns the seconds spent waiting in the queue."""
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def aacquire(self) -> float:
+        """Non-blocking version of acquire()"""
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def stats(self) -> Dict:
+        """Return queue-wait statistics"""
+        return {
+            "requests_per_minute": round(self.rate * 60, 2),
+            "burst": self.capacity,
+            "acquired": self.acquired,
+            "delayed": self.delayed,
+            "total_wait_seconds": round(self.total_wait, 3),
+            "avg_wait_seconds": round(self.total_wait / self.acquired, 3) if self.acquired else 0.0,
+            "max_wait_seconds": round(self.max_wait, 3),
+        }
+
+
+class RetryPolicy:
+    """
+    Retry with jittered exponential backoff that honors the server's Retry-After header
+    """
+
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+    def __init__(self, max_retries: int = 3, base_delay: float = 1.0, max_delay: float = 30.0):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retries = 0
+        self.total_backoff = 0.0
+
+    def should_retry(self, status: Optional[int], attempt: int) -> bool:
+        """Whether a response with this status (None = connection error) should be retried"""
+        return attempt < self.max_retries and (status is None or status in self.RETRY_STATUSES)
+
+    def backoff(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """Return the delay before retry number `attempt + 1` and record it"""
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))  # full jitter
+        server_delay = parse_retry_after(retry_after)
+        if server_delay is not None:
+            delay = min(self.max_delay, server_delay) + random.uniform(0, self.base_delay)
+        self.retries += 1
+        self.total_backoff += delay
+        return delay
+
+    def stats(self) -> Dict:
+        return {"max_retries": self.max_retries, "retries": self.retries, "total_backoff_seconds": round(self.total_backoff, 3)}
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header given either in seconds or as an HTTP date"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
@@ -1,86 +1,209 @@
+import asyncio
 import requests
 import numpy as np
-import pandas as pd
-from typing import List, Dict, Optional
+from datetime import datetime, timezone
+from typing import List, Dict, Optional, Sequence, Union
+from src.tools.price_history_store import DAY_MS, get_price_history_store
+from src.tools.market_data_client import report_data_status
+from src.tools.data_store import get_data_store, is_handle, resolve_array, resolve_series_dict, summarize_series
+from src.tools.memoize import memoize
+from src.tools.portfolio_math import TRADING_DAYS, align_series, compute_returns, cornish_fisher_var_es, correlation_matrix, correlation_summary, downsample_indices, drawdown_statistics, efficient_mask, evaluate_weights, gaussian_var_es, portfolio_shape_moments, rolling_statistics, series_matrix, series_moments, simplex_grid, stack_series
+from src.tools.monte_carlo import simulate_portfolio_returns, var_cvar
+from src.tools.portfolio_optimizer import optimize, resolve_caps, risk_contributions
+from src.tools.coin_ids import to_id_list
 
+# Largest portfolio whose full correlation matrix is returned, and most coins listed per cluster
+MAX_MATRIX_COINS = 10
+MAX_CLUSTER_COINS = 10
 
-def get_historical_close_prices(coin_id: str = "bitcoin", vs_currency: str = "usd", days: int = 30) -> Optional[Dict]:
+DRAWDOWN_COLUMNS = ["coin", "max_drawdown_pct", "current_drawdown_pct", "peak_days_ago", "trough_days_ago", "recovery_days",
+                    "days_below_high", "longest_drawdown_days", "annual_return_pct", "volatility_pct", "sharpe", "sortino", "calmar"]
+
+
+@report_data_status
+def get_historical_close_prices(coin_id: str = "bitcoin", vs_currency: str = "usd", days: int = 30, include_raw: bool = False) -> Optional[Dict]:
     """
     Fetches historical Close prices data for a cryptocurrency. 
-    Only daily interval prices can be fetched.
+    Only daily interval prices can be fetched. Data is served from the local price history store,
+    which only requests the days missing since its last sync.
+    The prices are kept server-side and returned as a data handle (e.g. "arr:3f9a1c2b7d4e"):
+    pass the handle as-is to calculate_returns_from_prices instead of copying numbers.
     
     Args:
         coin_id (str): CoinGecko coin ID (e.g., "bitcoin", "ethereum").
         vs_currency (str): Currency to price against (default: "usd").
         days (int): Number of days of historical data (default: 30).
+        include_raw (bool): Return the full price list instead of a handle (default: False).
     
     Returns:
-        dict: Historical price data.
+        dict: Handle to the historical price data, with a summary of the prices.
               Example for bitcoin 30 days: {
                   "coin_id": "bitcoin",
-                  "days": 30
-                  "prices": [...],
+                  "days": 30,
+                  "prices": "arr:3f9a1c2b7d4e",
+                  "timestamps": "arr:7c21e0b94f3d",  # ms since epoch, one per price
+                  "summary": {"points": 31, "first": 85210.5, "last": 92391.2, "min": 84100.0, "max": 93500.1, "change_pct": 8.43}
               }
         None: If the request fails.
     """
     try:
-        url = f"https://api.coingecko.com/api/v3/coins/{coin_id}/market_chart"
-        params = {
-            "vs_currency": vs_currency,
-            "days": days,
-            "interval": "daily"
-        }
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()
-        
-        data = response.json()
-        prices = [price[1] for price in data["prices"]]
+        series = get_price_history_store().get_series(coin_id, vs_currency, days)
+        return _price_result(coin_id, days, series, include_raw)
+    
+    except requests.exceptions.RequestException as e:
+        print(f"Error fetching historical OHLCV data: {e}")
+        return None
 
-        result = {}
-        result["coin_id"] = coin_id
-        result["days"] = days
-        result['prices'] = prices
-        return result
+@report_data_status
+async def aget_historical_close_prices(coin_id: str = "bitcoin", vs_currency: str = "usd", days: int = 30, include_raw: bool = False) -> Optional[Dict]:
+    """Async version of get_historical_close_prices()"""
+    try:
+        series = await get_price_history_store().aget_series(coin_id, vs_currency, days)
+        return _price_result(coin_id, days, series, include_raw)
     
     except requests.exceptions.RequestException as e:
         print(f"Error fetching historical OHLCV data: {e}")
         return None
+
+def _price_result(coin_id: str, days: int, series: Dict, include_raw: bool) -> Dict:
+    if include_raw:
+        return {"coin_id": coin_id, "days": days, "prices": series["prices"], "timestamps": series["timestamps"]}
+    store = get_data_store()
+    prices = np.array(series["prices"], dtype=float)
+    return {
+        "coin_id": coin_id,
+        "days": days,
+        "prices": store.put(prices),
+        "timestamps": store.put(series["timestamps"]),
+        "summary": summarize_series(prices),
+    }
+
+@report_data_status
+def get_aligned_close_prices(coin_ids: Union[List[str], str], vs_currency: str = "usd", days: int = 30, gaps: str = "ffill") -> Optional[Dict]:
+    """
+    Fetches daily close prices for several coins aligned on the same calendar days.
+    Use this for multi-coin portfolio analysis: every coin's price handle covers exactly the same days,
+    so returns, volatility, VaR and correlations compare like with like.
+    
+    Args:
+        coin_ids (list or str): CoinGecko coin IDs, as a list or comma-separated string.
+                               Example: ["bitcoin", "ethereum", "solana"] or "bitcoin,ethereum,solana"
+        vs_currency (str): Currency to price against (default: "usd").
+        days (int): Number of days of historical data (default: 30).
+        gaps (str): How to handle days a coin has no price: "ffill" carries the last price forward (default),
+                    "drop" keeps only the days every coin has a price.
+    
+    Returns:
+        dict: Aligned price handles, ready for calculate_returns_from_prices.
+              Example: {
+                  "prices": {"bitcoin": "arr:3f9a1c2b7d4e", "ethereum": "arr:9b0e44d1a2c7"},
+                  "points": 31,
+                  "start_date": "2025-01-01",
+                  "end_date": "2025-01-31",
+                  "filled": {"bitcoin": 0, "ethereum": 1},  # days filled from the previous price
+                  "failed": []
+              }
+        None: If the request fails.
+    """
+    try:
+        coin_ids = list(dict.fromkeys(to_id_list(coin_ids)))
+        store = get_price_history_store()
+        series_by_coin, failed = {}, []
+        for coin_id in coin_ids:
+            try:
+                series_by_coin[coin_id] = store.get_series(coin_id, vs_currency, days)
+            except requests.exceptions.RequestException as e:
+                print(f"Error fetching historical data for {coin_id}: {e}")
+                failed.append(coin_id)
+        return _aligned_result(series_by_coin, failed, gaps)
+    
+    except Exception as e:
+        print(f"Error aligning close prices: {e}")
+        return None
+
+@report_data_status
+async def aget_aligned_close_prices(coin_ids: Union[List[str], str], vs_currency: str = "usd", days: int = 30, gaps: str = "ffill") -> Optional[Dict]:
+    """Async version of get_aligned_close_prices(): the coins are fetched concurrently"""
+    try:
+        coin_ids = list(dict.fromkeys(to_id_list(coin_ids)))
+        store = get_price_history_store()
+        results = await asyncio.gather(*[store.aget_series(coin_id, vs_currency, days) for coin_id in coin_ids],
+                                       return_exceptions=True)
+        series_by_coin, failed = {}, []
+        for coin_id, result in zip(coin_ids, results):
+            if isinstance(result, requests.exceptions.RequestException):
+                print(f"Error fetching historical data for {coin_id}: {result}")
+                failed.append(coin_id)
+            elif isinstance(result, BaseException):
+                raise result
+            else:
+                series_by_coin[coin_id] = result
+        return _aligned_result(series_by_coin, failed, gaps)
     
-def calculate_returns_from_prices(prices_data: Dict[str, List[float]]) -> Dict[str, List[float]]:
+    except Exception as e:
+        print(f"Error aligning close prices: {e}")
+        return None
+
+def _aligned_result(series_by_coin: Dict[str, Dict], failed: List[str], gaps: str) -> Dict:
+    coins, day_numbers, matrix = align_series(series_by_coin, gaps)
+    _, all_days, observed = align_series(series_by_coin, None)
+    filled = np.isnan(observed[np.isin(all_days, day_numbers)]).sum(axis=0)
+    store = get_data_store()
+
+    def date(day):
+        return datetime.fromtimestamp(int(day) * DAY_MS / 1000, tz=timezone.utc).strftime("%Y-%m-%d")
+
+    return {
+        "prices": {coin: store.put(matrix[:, column]) for column, coin in enumerate(coins)},
+        "points": len(day_numbers),
+        "start_date": date(day_numbers[0]) if len(day_numbers) else None,
+        "end_date": date(day_numbers[-1]) if len(day_numbers) else None,
+        "filled": {coin: int(count) for coin, count in zip(coins, filled)},
+        "failed": failed,
+    }
+    
+@memoize()
+def calculate_returns_from_prices(prices_data: Dict[str, Union[List[float], str]], method: str = "simple") -> Dict[str, Union[List[float], str]]:
     """
     Converts price data to daily returns for portfolio analysis.
     
     Args:
-        prices_data (dict): Dictionary of coin prices as lists.
-                           Example: {"bitcoin": [30000, 31000, 29500, ...], 
-                                    "ethereum": [2000, 2100, 1950, ...]}
+        prices_data (dict): Dictionary of coin prices as data handles (from get_historical_close_prices) or lists.
+                           Example: {"bitcoin": "arr:3f9a1c2b7d4e", "ethereum": "arr:9b0e44d1a2c7"}
+                           or {"bitcoin": [30000, 31000, 29500, ...], "ethereum": [2000, 2100, 1950, ...]}
+        method (str): "simple" returns (p[t] - p[t-1]) / p[t-1] (default) or "log" returns ln(p[t] / p[t-1]).
     
     Returns:
-        dict: Daily returns for each coin.
-              Example: {"bitcoin": [0.033, -0.048, ...], 
-                       "ethereum": [0.05, -0.071, ...]}
+        dict: Daily returns for each coin, as a data handle when the prices were given as a handle.
+              Example: {"bitcoin": "arr:51c0d2e9f3a8", "ethereum": "arr:0a7b3e6c1d92"}
+              or {"bitcoin": [0.033, -0.048, ...], "ethereum": [0.05, -0.071, ...]}
         None: If calculation fails.
     """
     try:
+        prices = resolve_series_dict(prices_data)
+        
+        # One (days x coins) matrix, aligned on the most recent price; shorter histories are NaN-padded
+        coins, matrix = stack_series(prices, pad=True)
+        returns = compute_returns(matrix, method)
+        
         returns_data = {}
-        for coin, prices in prices_data.items():
-            prices_array = np.array(prices)
-            # Calculate returns: (price[i] - price[i-1]) / price[i-1]
-            returns = [((prices_array[i] - prices_array[i-1]) / prices_array[i-1]).item() 
-                      for i in range(1, len(prices_array))]
-            returns_data[coin] = returns
+        for column, coin in enumerate(coins):
+            coin_returns = returns[len(matrix) - len(prices[coin]):, column]
+            returns_data[coin] = get_data_store().put(coin_returns) if is_handle(prices_data[coin]) else coin_returns.tolist()
         return returns_data
     except Exception as e:
         print(f"Error calculating returns: {e}")
         return None
     
-def calculate_portfolio_volatility(returns_data: Dict[str, List[float]], weights: Dict[str, float]) -> Optional[Dict]:
+@memoize()
+def calculate_portfolio_volatility(returns_data: Dict[str, Union[List[float], str]], weights: Dict[str, float]) -> Optional[Dict]:
     """
     Calculates the volatility (standard deviation) of a portfolio.
     
     Args:
-        returns_data (dict): Dictionary of coin returns as lists.
-                            Example: {"bitcoin": [0.02, -0.01, 0.03, ...], "ethereum": [0.01, 0.02, -0.02, ...]}
+        returns_data (dict): Dictionary of coin returns as data handles (from calculate_returns_from_prices) or lists.
+                            Example: {"bitcoin": "arr:51c0d2e9f3a8", "ethereum": "arr:0a7b3e6c1d92"}
+                            or {"bitcoin": [0.02, -0.01, 0.03, ...], "ethereum": [0.01, 0.02, -0.02, ...]}
         weights (dict): Portfolio allocation weights (must sum to 1.0).
                        Example: {"bitcoin": 0.6, "ethereum": 0.4}
     
@@ -99,26 +222,27 @@ def calculate_portfolio_volatility(returns_data: Dict[str, List[float]], weights
             print("Error: Portfolio weights must sum to 1.0")
             return None
         
-        # Convert to DataFrame for easier calculation
-        df = pd.DataFrame(returns_data)
+        # Daily covariance of the (days x coins) returns matrix, shared with the other portfolio tools
+        moments = series_moments(returns_data)
+        coins = moments["names"]
         
-        # Calculate covariance matrix (annualized)
-        cov_matrix = df.cov() * 252  # 252 trading days per year
+        # Calculate covariance matrix (annualized, 252 trading days per year)
+        cov_matrix = moments["cov"] * TRADING_DAYS
         
-        # Get weights as array in same order as DataFrame columns
-        weight_array = np.array([weights.get(col, 0) for col in df.columns])
+        # Get weights as array in same order as the matrix columns
+        weight_array = np.array([weights.get(coin, 0) for coin in coins])
         
         # Calculate portfolio variance: w^T * Cov * w
-        portfolio_variance = np.dot(weight_array.T, np.dot(cov_matrix, weight_array))
+        portfolio_variance = weight_array @ cov_matrix @ weight_array
         portfolio_volatility = np.sqrt(portfolio_variance)
         
         # Calculate individual volatilities
-        individual_vols = (df.std() * np.sqrt(252)).to_dict()
+        individual_vols = np.sqrt(np.diag(cov_matrix))
         
         return {
             "portfolio_volatility": round(portfolio_volatility.item(), 4),
             "portfolio_volatility_pct": round(portfolio_volatility.item() * 100, 2),
-            "individual_volatilities": {k: round(v, 4) for k, v in individual_vols.items()},
+            "individual_volatilities": {coin: round(vol.item(), 4) for coin, vol in zip(coins, individual_vols)},
             "annualized": True
         }
     
@@ -126,13 +250,72 @@ def calculate_portfolio_volatility(returns_data: Dict[str, List[float]], weights
         print(f"Error calculating portfolio volatility: {e}")
         return None
 
-def calculate_var(returns_data: List[float], confidence_level: float = 0.95, portfolio_value: float = 10000) -> Optional[Dict]:
+def optimize_portfolio(returns_data: Dict[str, Union[List[float], str]], objective: str = "min_variance",
+                       max_weight: Optional[Union[float, Dict[str, float]]] = None, risk_free_rate: float = 0.0,
+                       initial_weights: Optional[Dict[str, float]] = None) -> Optional[Dict]:
+    """
+    Solves for long-only portfolio weights (no short positions, weights sum to 1.0).
+    
+    Args:
+        returns_data (dict): Dictionary of coin returns as data handles (from calculate_returns_from_prices) or lists.
+                            Example: {"bitcoin": "arr:51c0d2e9f3a8", "ethereum": "arr:0a7b3e6c1d92", "solana": "arr:c4d1f07a9e35"}
+        objective (str): "min_variance" (lowest volatility), "max_sharpe" (best return per unit of risk)
+                         or "risk_parity" (every coin contributes the same share of risk; with caps, coins held at
+                         their cap contribute less and the others share the rest equally). Default: "min_variance".
+        max_weight (float or dict): Cap per coin, the same for all (e.g. 0.5) or per coin (e.g. {"solana": 0.2}).
+                                    Default: None (uncapped).
+        risk_free_rate (float): Annual risk-free rate for the Sharpe ratio (default: 0.0).
+        initial_weights (dict): Starting allocation (default: None, the previous solution for these coins if any).
+    
+    Returns:
+        dict: Optimal weights with their risk profile.
+              Example: {
+                  "objective": "min_variance",
+                  "weights": {"bitcoin": 0.71, "ethereum": 0.29, "solana": 0.0},
+                  "expected_return_pct": 38.2,  # annualized
+                  "volatility_pct": 44.1,  # annualized
+                  "sharpe": 0.87,
+                  "risk_contributions_pct": {"bitcoin": 72.4, "ethereum": 27.6, "solana": 0.0},
+                  "iterations": 41
+              }
+        None: If optimization fails.
+    """
+    try:
+        moments = series_moments(returns_data)
+        coins = moments["names"]
+        mean, cov = moments["mean"] * TRADING_DAYS, moments["cov"] * TRADING_DAYS
+        initial = None if initial_weights is None else np.array([initial_weights.get(coin, 0) for coin in coins], dtype=float)
+        
+        solution = optimize(objective, coins, mean, cov, resolve_caps(coins, max_weight), risk_free_rate, initial)
+        weights = solution["weights"]
+        
+        expected_return = weights @ mean
+        volatility = np.sqrt(weights @ cov @ weights)
+        contributions = risk_contributions(weights, cov)
+        
+        return {
+            "objective": objective,
+            "weights": {coin: round(w.item(), 4) for coin, w in zip(coins, weights)},
+            "expected_return_pct": round(expected_return.item() * 100, 2),
+            "volatility_pct": round(volatility.item() * 100, 2),
+            "sharpe": round(((expected_return - risk_free_rate) / volatility).item(), 2),
+            "risk_contributions_pct": {coin: round(c.item() * 100, 2) for coin, c in zip(coins, contributions)},
+            "iterations": solution["iterations"]
+        }
+    
+    except Exception as e:
+        print(f"Error optimizing portfolio: {e}")
+        return None
+
+@memoize()
+def calculate_var(returns_data: Union[List[float], str], confidence_level: float = 0.95, portfolio_value: float = 10000) -> Optional[Dict]:
     """
     Calculates the Value-at-Risk (VaR) for a portfolio or asset.
     
     Args:
-        returns_data (list): Historical daily returns as a list of floats.
-                            Example: [0.02, -0.01, 0.03, -0.02, 0.01, ...]
+        returns_data (list or str): Historical daily returns as a data handle (e.g. returns["bitcoin"] from
+                            calculate_returns_from_prices) or a list of floats.
+                            Example: "arr:51c0d2e9f3a8" or [0.02, -0.01, 0.03, -0.02, 0.01, ...]
         confidence_level (float): Confidence level for VaR (default: 0.95 for 95% VaR).
         portfolio_value (float): Current portfolio value in USD (default: 10000).
     
@@ -147,7 +330,7 @@ def calculate_var(returns_data: List[float], confidence_level: float = 0.95, por
         None: If calculation fails.
     """
     try:
-        returns_array = np.array(returns_data)
+        returns_array = resolve_array(returns_data)
         
         # Calculate VaR using historical simulation method
         var_percentile = np.percentile(returns_array, (1 - confidence_level) * 100)
@@ -171,13 +354,235 @@ def calculate_var(returns_data: List[float], confidence_level: float = 0.95, por
         print(f"Error calculating VaR: {e}")
         return None
 
-def calculate_correlation_matrix(returns_data: Dict[str, List[float]]) -> Optional[Dict]:
+def calculate_monte_carlo_var(returns_data: Dict[str, Union[List[float], str]], weights: Dict[str, float],
+                              confidence_level: float = 0.95, portfolio_value: float = 10000,
+                              horizons: Union[Sequence[int], int] = (1, 10), n_paths: int = 100000,
+                              seed: Optional[int] = None) -> Optional[Dict]:
     """
-    Calculates the correlation matrix between assets in a portfolio.
+    Calculates Monte Carlo Value-at-Risk (VaR) and Conditional VaR (CVaR) of a portfolio over one or more horizons.
+    Daily returns of all coins are simulated jointly from their historical mean and covariance,
+    so correlations between the coins are preserved; each path holds the portfolio for the whole horizon.
     
     Args:
-        returns_data (dict): Dictionary of coin returns as lists.
-                            Example: {"bitcoin": [0.02, -0.01, ...], "ethereum": [0.01, 0.02, ...]}
+        returns_data (dict): Dictionary of coin returns as data handles (from calculate_returns_from_prices) or lists.
+                            Example: {"bitcoin": "arr:51c0d2e9f3a8", "ethereum": "arr:0a7b3e6c1d92"}
+        weights (dict): Portfolio allocation weights (must sum to 1.0).
+                       Example: {"bitcoin": 0.6, "ethereum": 0.4}
+        confidence_level (float): Confidence level for VaR and CVaR (default: 0.95).
+        portfolio_value (float): Current portfolio value in USD (default: 10000).
+        horizons (list or int): Holding periods in days (default: (1, 10)).
+        n_paths (int): Number of simulated paths (default: 100000; 1000000+ runs on multiple processes).
+        seed (int): Random seed for reproducible results (default: None).
+    
+    Returns:
+        dict: VaR and CVaR per horizon.
+              Example: {
+                  "horizons": {
+                      "1d": {"var_usd": 412.3, "var_pct": 4.12, "cvar_usd": 538.9, "cvar_pct": 5.39, "expected_return_pct": 0.08},
+                      "10d": {"var_usd": 1265.0, "var_pct": 12.65, "cvar_usd": 1589.4, "cvar_pct": 15.89, "expected_return_pct": 0.81}
+                  },
+                  "confidence_level": 0.95,
+                  "portfolio_value": 10000,
+                  "n_paths": 100000,
+                  "method": "monte_carlo"
+              }
+        None: If calculation fails.
+    """
+    try:
+        # Validate weights sum to 1
+        if not np.isclose(sum(weights.values()), 1.0):
+            print("Error: Portfolio weights must sum to 1.0")
+            return None
+        
+        moments = series_moments(returns_data)
+        weight_array = np.array([weights.get(coin, 0) for coin in moments["names"]])
+        horizons = sorted(set(int(h) for h in np.atleast_1d(horizons)))
+        
+        simulated = simulate_portfolio_returns(moments["mean"], moments["cov"], weight_array, horizons, int(n_paths), seed)
+        var, cvar = var_cvar(simulated, confidence_level)
+        expected = simulated.mean(axis=0)
+        
+        return {
+            "horizons": {
+                f"{horizon}d": {
+                    "var_usd": round(var[i].item() * portfolio_value, 2),
+                    "var_pct": round(var[i].item() * 100, 2),
+                    "cvar_usd": round(cvar[i].item() * portfolio_value, 2),
+                    "cvar_pct": round(cvar[i].item() * 100, 2),
+                    "expected_return_pct": round(expected[i].item() * 100, 2),
+                }
+                for i, horizon in enumerate(horizons)
+            },
+            "confidence_level": confidence_level,
+            "portfolio_value": portfolio_value,
+            "n_paths": int(n_paths),
+            "method": "monte_carlo"
+        }
+    
+    except Exception as e:
+        print(f"Error calculating Monte Carlo VaR: {e}")
+        return None
+
+@memoize()
+def calculate_parametric_var(returns_data: Dict[str, Union[List[float], str]], weights: Dict[str, float],
+                             confidence_level: float = 0.95, portfolio_value: float = 10000,
+                             horizon_days: int = 1) -> Optional[Dict]:
+    """
+    Calculates parametric Value-at-Risk (VaR) and Expected Shortfall (ES) of a portfolio in closed form.
+    "gaussian" assumes normally distributed returns; "cornish_fisher" adjusts for the skewness and fat tails
+    (excess kurtosis) of the portfolio returns, which is usually more realistic for crypto.
+    
+    Args:
+        returns_data (dict): Dictionary of coin returns as data handles (from calculate_returns_from_prices) or lists.
+                            Example: {"bitcoin": "arr:51c0d2e9f3a8", "ethereum": "arr:0a7b3e6c1d92"}
+        weights (dict): Portfolio allocation weights (must sum to 1.0).
+                       Example: {"bitcoin": 0.6, "ethereum": 0.4}
+        confidence_level (float): Confidence level for VaR and ES (default: 0.95).
+        portfolio_value (float): Current portfolio value in USD (default: 10000).
+        horizon_days (int): Holding period in days (default: 1), scaled from daily returns assuming independent days.
+    
+    Returns:
+        dict: VaR and ES under both models.
+              Example: {
+                  "gaussian": {"var_usd": 398.2, "var_pct": 3.98, "es_usd": 502.6, "es_pct": 5.03},
+                  "cornish_fisher": {"var_usd": 431.7, "var_pct": 4.32, "es_usd": 688.1, "es_pct": 6.88},
+                  "skewness": -0.41,
+                  "excess_kurtosis": 3.12,
+                  "confidence_level": 0.95,
+                  "horizon_days": 1,
+                  "portfolio_value": 10000
+              }
+        None: If calculation fails.
+    """
+    try:
+        # Validate weights sum to 1
+        if not np.isclose(sum(weights.values()), 1.0):
+            print("Error: Portfolio weights must sum to 1.0")
+            return None
+        
+        moments = series_moments(returns_data)
+        weight_array = np.array([weights.get(coin, 0) for coin in moments["names"]])
+        
+        # Portfolio mean and volatility from the weights and the covariance matrix: O(n^2) in coins
+        mean = (weight_array @ moments["mean"]) * horizon_days
+        sigma = np.sqrt(weight_array @ moments["cov"] @ weight_array * horizon_days)
+        
+        # Shape of the distribution, scaled to the horizon as for a sum of independent days
+        skew, kurtosis = portfolio_shape_moments(moments["centered"], weight_array)
+        skew, kurtosis = skew / np.sqrt(horizon_days), kurtosis / horizon_days
+        
+        def losses(var, es):
+            return {
+                "var_usd": round(var.item() * portfolio_value, 2),
+                "var_pct": round(var.item() * 100, 2),
+                "es_usd": round(es.item() * portfolio_value, 2),
+                "es_pct": round(es.item() * 100, 2),
+            }
+        
+        return {
+            "gaussian": losses(*gaussian_var_es(mean, sigma, confidence_level)),
+            "cornish_fisher": losses(*cornish_fisher_var_es(mean, sigma, skew, kurtosis, confidence_level)),
+            "skewness": round(skew.item(), 3),
+            "excess_kurtosis": round(kurtosis.item(), 3),
+            "confidence_level": confidence_level,
+            "horizon_days": horizon_days,
+            "portfolio_value": portfolio_value
+        }
+    
+    except Exception as e:
+        print(f"Error calculating parametric VaR: {e}")
+        return None
+
+@memoize()
+def evaluate_portfolio_weights(returns_data: Dict[str, Union[List[float], str]],
+                               candidate_weights: Optional[List[Dict[str, float]]] = None, grid_step: float = 0.1,
+                               confidence_level: float = 0.95, max_results: int = 10) -> Optional[Dict]:
+    """
+    Evaluates many portfolio allocations at once and returns the efficient ones (no other allocation has
+    lower volatility and higher expected return). Use this instead of calling calculate_portfolio_volatility
+    once per allocation, e.g. to answer "what's the best BTC/ETH/SOL split?".
+    
+    Args:
+        returns_data (dict): Dictionary of coin returns as data handles (from calculate_returns_from_prices) or lists.
+                            Example: {"bitcoin": "arr:51c0d2e9f3a8", "ethereum": "arr:0a7b3e6c1d92", "solana": "arr:c4d1f07a9e35"}
+        candidate_weights (list): Allocations to compare, each a weights dict summing to 1.0
+                                 (default: None, every split in steps of grid_step).
+                                 Example: [{"bitcoin": 0.6, "ethereum": 0.4}, {"bitcoin": 0.5, "ethereum": 0.3, "solana": 0.2}]
+        grid_step (float): Weight increment of the generated grid (default: 0.1, i.e. 0%, 10%, ..., 100%).
+        confidence_level (float): Confidence level for VaR (default: 0.95).
+        max_results (int): Maximum number of efficient allocations listed, spread from lowest to highest risk (default: 10).
+    
+    Returns:
+        dict: Efficient allocations sorted by volatility, plus the minimum-volatility and maximum-Sharpe allocations.
+              Example: {
+                  "columns": ["weights", "expected_return_pct", "volatility_pct", "var_pct", "sharpe"],
+                  "efficient": [
+                      [{"bitcoin": 0.8, "ethereum": 0.2, "solana": 0.0}, 41.2, 44.9, 4.4, 0.92],
+                      [{"bitcoin": 0.6, "ethereum": 0.2, "solana": 0.2}, 55.0, 50.3, 5.0, 1.09]
+                  ],
+                  "min_volatility": [{"bitcoin": 0.8, "ethereum": 0.2, "solana": 0.0}, 41.2, 44.9, 4.4, 0.92],
+                  "max_sharpe": [{"bitcoin": 0.6, "ethereum": 0.2, "solana": 0.2}, 55.0, 50.3, 5.0, 1.09],
+                  "evaluated": 66,
+                  "efficient_count": 9
+              }
+              Returns and volatility are annualized, VaR is the 1-day Cornish-Fisher VaR.
+        None: If calculation fails.
+    """
+    try:
+        moments = series_moments(returns_data)
+        coins = moments["names"]
+        if candidate_weights is None:
+            weight_matrix = simplex_grid(len(coins), grid_step)
+        else:
+            weight_matrix = np.array([[weights.get(coin, 0) for weights in candidate_weights] for coin in coins], dtype=float)
+            if not np.allclose(weight_matrix.sum(axis=0), 1.0):
+                print("Error: Portfolio weights must sum to 1.0")
+                return None
+        
+        metrics = evaluate_weights(moments, weight_matrix, confidence_level)
+        efficient_flags = efficient_mask(metrics["volatility"], metrics["expected_return"])
+        efficient = np.flatnonzero(efficient_flags)
+        efficient = efficient[np.argsort(metrics["volatility"][efficient], kind="stable")]
+        if len(efficient) > max_results:
+            efficient = efficient[np.unique(np.linspace(0, len(efficient) - 1, max_results).round().astype(int))]
+        
+        def row(i):
+            return [
+                {coin: round(weight_matrix[j, i].item(), 4) for j, coin in enumerate(coins)},
+                round(metrics["expected_return"][i].item() * 100, 2),
+                round(metrics["volatility"][i].item() * 100, 2),
+                round(metrics["var"][i].item() * 100, 2),
+                round(metrics["sharpe"][i].item(), 2),
+            ]
+        
+        return {
+            "columns": ["weights", "expected_return_pct", "volatility_pct", "var_pct", "sharpe"],
+            "efficient": [row(i) for i in efficient],
+            "min_volatility": row(int(np.argmin(metrics["volatility"]))),
+            "max_sharpe": row(int(np.nanargmax(metrics["sharpe"]))),
+            "evaluated": weight_matrix.shape[1],
+            "efficient_count": int(efficient_flags.sum())
+        }
+    
+    except Exception as e:
+        print(f"Error evaluating portfolio weights: {e}")
+        return None
+
+@memoize()
+def calculate_correlation_matrix(returns_data: Dict[str, Union[List[float], str]], top_k: int = 5,
+                                 cluster_threshold: float = 0.8, use_float32: bool = False) -> Optional[Dict]:
+    """
+    Calculates the correlations between assets in a portfolio.
+    The full matrix is only returned for up to 10 coins; larger universes get the average, the most and least
+    correlated pairs and the clusters of highly correlated coins.
+    
+    Args:
+        returns_data (dict): Dictionary of coin returns as data handles (from calculate_returns_from_prices) or lists.
+                            Example: {"bitcoin": "arr:51c0d2e9f3a8", "ethereum": "arr:0a7b3e6c1d92"}
+                            or {"bitcoin": [0.02, -0.01, ...], "ethereum": [0.01, 0.02, ...]}
+        top_k (int): Number of most and least correlated pairs to list (default: 5).
+        cluster_threshold (float): Correlation from which two coins are grouped in the same cluster (default: 0.8).
+        use_float32 (bool): Compute in single precision, faster for hundreds of coins (default: False).
     
     Returns:
         dict: Correlation matrix and analysis.
@@ -187,42 +592,179 @@ def calculate_correlation_matrix(returns_data: Dict[str, List[float]]) -> Option
                       "ethereum": {"bitcoin": 0.85, "ethereum": 1.0}
                   },
                   "average_correlation": 0.85,
-                  "diversification_score": 15  # Lower correlation = better diversification (0-100 scale)
+                  "diversification_score": 15,  # Lower correlation = better diversification (0-100 scale)
+                  "most_correlated": [["bitcoin", "ethereum", 0.85]],
+                  "least_correlated": [["bitcoin", "ethereum", 0.85]],
+                  "clusters": [{"size": 2, "coins": ["bitcoin", "ethereum"], "average_correlation": 0.85}]
               }
         None: If calculation fails.
     """
     try:
-        # Convert to DataFrame
-        df = pd.DataFrame(returns_data)
-        
-        # Calculate correlation matrix
-        corr_matrix = df.corr()
+        # One (days x coins) returns matrix, shared with the other portfolio tools
+        coins, returns = series_matrix(returns_data)
         
-        # Convert to nested dict format
-        corr_dict = {}
-        for col in corr_matrix.columns:
-            corr_dict[col] = corr_matrix[col].to_dict()
-        
-        # Calculate average correlation (excluding diagonal)
-        mask = np.triu(np.ones_like(corr_matrix, dtype=bool), k=1)
-        avg_correlation = corr_matrix.where(mask).stack().mean()
+        # Pairwise statistics computed block by block, without the full matrix
+        summary = correlation_summary(returns, top_k, cluster_threshold, dtype=np.float32 if use_float32 else np.float64)
+        avg_correlation = np.float64(summary["average"])
         
         # Diversification score (inverse of correlation, scaled 0-100)
         # Lower correlation = higher diversification score
         diversification_score = (1 - avg_correlation) * 100
         
-        return {
-            "correlation_matrix": {k: {k2: round(v2, 3) for k2, v2 in v.items()} 
-                                  for k, v in corr_dict.items()},
+        result = {}
+        if len(coins) <= MAX_MATRIX_COINS:
+            corr_matrix = correlation_matrix(returns)
+            result["correlation_matrix"] = {coin: {other: round(corr_matrix[j, i].item(), 3) for j, other in enumerate(coins)}
+                                            for i, coin in enumerate(coins)}
+        result.update({
             "average_correlation": round(avg_correlation.item(), 3),
             "diversification_score": round(diversification_score.item(), 1),
-            "interpretation": "Higher score = better diversification"
-        }
+            "interpretation": "Higher score = better diversification",
+            "most_correlated": [[coins[i], coins[j], round(c, 3)] for i, j, c in summary["most_correlated"]],
+            "least_correlated": [[coins[i], coins[j], round(c, 3)] for i, j, c in summary["least_correlated"]],
+            "clusters": [{"size": len(cluster["members"]), "coins": [coins[i] for i in cluster["members"][:MAX_CLUSTER_COINS]],
+                          "average_correlation": round(cluster["average"].item(), 3)} for cluster in summary["clusters"]],
+        })
+        if summary["constant"]:
+            result["excluded_constant"] = [coins[i] for i in summary["constant"]]
+        return result
     
     except Exception as e:
         print(f"Error calculating correlation matrix: {e}")
         return None
 
+@memoize()
+def calculate_rolling_risk(returns_data: Dict[str, Union[List[float], str]], benchmark: str = "bitcoin", window: int = 30,
+                           points: int = 12, series: bool = False) -> Optional[Dict]:
+    """
+    Calculates rolling volatility of every coin and its rolling correlation and beta against a benchmark coin,
+    e.g. "how has BTC/ETH correlation changed over the last year" or "rolling 30-day beta versus BTC".
+    
+    Args:
+        returns_data (dict): Dictionary of coin returns as data handles (from calculate_returns_from_prices) or lists,
+                            including the benchmark coin.
+                            Example: {"bitcoin": "arr:51c0d2e9f3a8", "ethereum": "arr:0a7b3e6c1d92"}
+        benchmark (str): Coin to measure correlation and beta against (default: "bitcoin").
+        window (int): Rolling window in days (default: 30).
+        points (int): Number of evenly spaced points returned per series, ending today (default: 12).
+        series (bool): Also return the full daily series as data handles (default: False).
+    
+    Returns:
+        dict: Downsampled rolling series, oldest first.
+              Example: {
+                  "benchmark": "bitcoin",
+                  "window": 30,
+                  "days_ago": [330, 300, ..., 30, 0],
+                  "volatility_pct": {"bitcoin": [41.2, ...], "ethereum": [55.8, ...]},  # annualized
+                  "correlation": {"ethereum": [0.82, ...]},
+                  "beta": {"ethereum": [1.21, ...]}
+              }
+              With series=True, a "series" entry holds one handle per coin and statistic.
+        None: If calculation fails.
+    """
+    try:
+        coins, returns = series_matrix(returns_data)
+        if benchmark not in coins:
+            print(f"Error: Benchmark {benchmark!r} is not in returns_data")
+            return None
+        if len(returns) < window:
+            print(f"Error: Need at least {window} returns for a {window}-day window, got {len(returns)}")
+            return None
+        
+        rolling = rolling_statistics(returns, coins.index(benchmark), window)
+        # Downsample the days with a full window
+        rows = window - 1 + downsample_indices(len(returns) - window + 1, points)
+        others = [i for i, coin in enumerate(coins) if coin != benchmark]
+        
+        def sampled(values, columns, scale=1.0):
+            return {coins[i]: [None if np.isnan(v) else round(v * scale, 3) for v in values[rows, i].tolist()] for i in columns}
+        
+        result = {
+            "benchmark": benchmark,
+            "window": window,
+            "days_ago": (len(returns) - 1 - rows).tolist(),
+            "volatility_pct": sampled(rolling["volatility"], range(len(coins)), 100),
+            "correlation": sampled(rolling["correlation"], others),
+            "beta": sampled(rolling["beta"], others),
+        }
+        if series:
+            store = get_data_store()
+            result["series"] = {
+                "volatility": {coin: store.put(rolling["volatility"][:, i]) for i, coin in enumerate(coins)},
+                "correlation": {coins[i]: store.put(rolling["correlation"][:, i]) for i in others},
+                "beta": {coins[i]: store.put(rolling["beta"][:, i]) for i in others},
+            }
+        return result
+    
+    except Exception as e:
+        print(f"Error calculating rolling risk: {e}")
+        return None
+
+@memoize()
+def calculate_drawdowns(prices_data: Dict[str, Union[List[float], str]], risk_free_rate: float = 0.0,
+                        top_n: Optional[int] = None) -> Optional[Dict]:
+    """
+    Calculates drawdown and recovery statistics with Sharpe, Sortino and Calmar ratios for one or many coins.
+    
+    Args:
+        prices_data (dict): Dictionary of coin prices as data handles (from get_aligned_close_prices or
+                           get_historical_close_prices) or lists. Coins with a shorter history are aligned on the latest price.
+                           Example: {"bitcoin": "arr:3f9a1c2b7d4e", "ethereum": "arr:9b0e44d1a2c7"}
+        risk_free_rate (float): Annual risk-free rate for the Sharpe and Sortino ratios (default: 0.0).
+        top_n (int): Only return the N coins with the deepest drawdowns (default: None, all coins).
+    
+    Returns:
+        dict: One row per coin, deepest maximum drawdown first.
+              Example: {
+                  "columns": ["coin", "max_drawdown_pct", "current_drawdown_pct", "peak_days_ago", "trough_days_ago",
+                              "recovery_days", "days_below_high", "longest_drawdown_days", "annual_return_pct",
+                              "volatility_pct", "sharpe", "sortino", "calmar"],
+                  "rows": [["ethereum", -38.2, -12.5, 201, 143, None, 201, 201, 12.4, 61.0, 0.35, 0.52, 0.32]]
+              }
+              recovery_days is the number of days from the trough back to the previous peak (None if not recovered yet).
+              Returns and volatility are annualized.
+        None: If calculation fails.
+    """
+    try:
+        coins, prices = stack_series(resolve_series_dict(prices_data), pad=True)
+        stats = drawdown_statistics(prices, risk_free_rate)
+        last = len(prices) - 1
+        
+        order = np.argsort(np.nan_to_num(stats["max_drawdown"], nan=0.0), kind="stable")
+        if top_n is not None:
+            order = order[:int(top_n)]
+        
+        def pct(value):
+            return None if np.isnan(value) else round(value.item() * 100, 2)
+        
+        def ratio(value):
+            return None if np.isnan(value) else round(value.item(), 2)
+        
+        def days_ago(row):
+            return None if row < 0 else int(last - row)
+        
+        rows = [[
+            coins[i],
+            pct(stats["max_drawdown"][i]),
+            pct(stats["current_drawdown"][i]),
+            days_ago(stats["peak"][i]),
+            days_ago(stats["trough"][i]),
+            int(stats["recovery"][i] - stats["trough"][i]) if stats["recovery"][i] >= 0 else None,
+            int(stats["current_duration"][i]),
+            int(stats["longest_duration"][i]),
+            pct(stats["annual_return"][i]),
+            pct(stats["volatility"][i]),
+            ratio(stats["sharpe"][i]),
+            ratio(stats["sortino"][i]),
+            ratio(stats["calmar"][i]),
+        ] for i in order]
+        
+        return {"columns": DRAWDOWN_COLUMNS, "rows": rows}
+    
+    except Exception as e:
+        print(f"Error calculating drawdowns: {e}")
+        return None
+
 def generate_sample_returns(coins: List[str], days: int = 100, seed: int = 42) -> Dict[str, List[float]]:
     """
     Generates sample return data for testing purposes.
@@ -276,6 +818,15 @@ def test_risk_portfolio_tools():
     corr_result = calculate_correlation_matrix(returns_data)
     print(corr_result)
 
+    # Test 4: Drawdowns (a steadily rising coin has no drawdown, so no peak, trough or recovery)
+    print("\n4. Drawdowns:")
+    prices_data = {"rising": [1, 2, 3, 4, 5], "dipping": [10, 12, 9, 11, 13]}
+    drawdown_result = calculate_drawdowns(prices_data)
+    print(drawdown_result)
+    rising = dict(zip(drawdown_result["columns"], next(row for row in drawdown_result["rows"] if row[0] == "rising")))
+    print(f"rising: max_drawdown_pct={rising['max_drawdown_pct']}, peak_days_ago={rising['peak_days_ago']}, "
+          f"recovery_days={rising['recovery_days']} (expected 0.0, None, None)")
+
 
 if __name__ == "__main__":
     # Example usage
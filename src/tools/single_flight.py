@@ -0,0 +1,76 @@
+import threading
+from typing import Any, Callable, Dict, Hashable
+
+
+class _Call:
+    """A single in-flight call whose outcome is shared by every waiter"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key into one execution
+
+    Responsibilities:
+    - Run `fn` once per key while a call for that key is in flight
+    - Hand the same result (or exception) to every concurrent caller
+    - Count how many calls were saved by coalescing
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self.executed = 0
+        self.coalesced = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """
+        Executes fn() unless an identical call (same key) is already running, in which case its result is shared.
+
+        Args:
+            key: Hashable identity of the call (e.g., request path and params).
+            fn (callable): Zero-argument function performing the work.
+
+        Returns:
+            The result of fn().
+
+        Raises:
+            Whatever fn() raised, for the leader and every waiter.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.coalesced += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self.executed += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    def stats(self) -> Dict:
+        """Return how many calls were executed and how many were served by an in-flight call"""
+        return {"executed": self.executed, "coalesced": self.coalesced, "in_flight": len(self._calls)}
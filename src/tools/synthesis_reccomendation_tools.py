@@ -1,4 +1,20 @@
-from typing import Dict, List, Optional, Any
+import heapq
+import numpy as np
+from typing import Dict, List, Optional, Any, Sequence
+from src.tools.memoize import memoize
+
+# Risk component (0-100) per momentum / trend signal, 50 for anything else
+MOMENTUM_RISK = {"positive": 30, "neutral": 50, "negative": 80}
+TREND_RISK = {"bullish": 30, "neutral": 50, "bearish": 80}
+# Upper bounds (exclusive) of every risk level but the last
+RISK_LEVELS = ["low", "medium", "medium-high", "high", "very-high"]
+RISK_LEVEL_BOUNDS = [30, 50, 70, 85]
+# Risk levels each user risk tolerance accepts
+RISK_TOLERANCE_LEVELS = {
+    "low": ["low", "medium"],
+    "medium": ["low", "medium", "medium-high"],
+    "high": ["low", "medium", "medium-high", "high", "very-high"]
+}
 
 
 def generate_risk_score(volatility: float, var_pct: float, momentum: str, trend_signal: str, correlation_score: Optional[float] = None) -> Optional[Dict]:
@@ -35,20 +51,10 @@ def generate_risk_score(volatility: float, var_pct: float, momentum: str, trend_
         downside_risk = min(var_pct * 5, 100)  # 20% VaR = 100 risk score
         
         # 3. Momentum Risk (negative momentum = higher risk)
-        momentum_risk_map = {
-            "positive": 30,
-            "neutral": 50,
-            "negative": 80
-        }
-        momentum_risk = momentum_risk_map.get(momentum, 50)
+        momentum_risk = MOMENTUM_RISK.get(momentum, 50)
         
         # 4. Trend Risk
-        trend_risk_map = {
-            "bullish": 30,
-            "neutral": 50,
-            "bearish": 80
-        }
-        trend_risk = trend_risk_map.get(trend_signal, 50)
+        trend_risk = TREND_RISK.get(trend_signal, 50)
         
         # 5. Diversification Risk (if provided)
         if correlation_score is not None:
@@ -128,13 +134,7 @@ def generate_investment_recommendation(coin_name: str, current_price: float, ris
     """
     try:
         # Determine if investment matches user's risk tolerance
-        risk_tolerance_map = {
-            "low": ["low", "medium"],
-            "medium": ["low", "medium", "medium-high"],
-            "high": ["low", "medium", "medium-high", "high", "very-high"]
-        }
-        
-        risk_match = risk_score["risk_level"] in risk_tolerance_map.get(user_risk_tolerance, ["medium"])
+        risk_match = risk_score["risk_level"] in RISK_TOLERANCE_LEVELS.get(user_risk_tolerance, ["medium"])
         
         # Determine action based on signals
         bullish_signals = 0
@@ -259,6 +259,241 @@ def generate_investment_recommendation(coin_name: str, current_price: float, ris
         return None
 
 
+# ==================== Watchlist Screening ====================
+
+WATCHLIST_COLUMNS = ["rank", "coin", "action", "confidence", "risk_adjusted_signal", "signal", "overall_risk_score", "risk_level"]
+
+
+def _lookup(labels: Sequence[Optional[str]], table: Dict[str, float], default: float = 50) -> np.ndarray:
+    return np.array([table.get(label, default) for label in labels], dtype=float)
+
+
+def batch_risk_scores(volatility: Sequence[float], var_pct: Sequence[float], momentum: Sequence[str],
+                      trend_signal: Sequence[str], correlation_score: Optional[Sequence[Optional[float]]] = None) -> Dict[str, np.ndarray]:
+    """
+    generate_risk_score() for a whole watchlist at once: one array entry per coin.
+    A missing (None / NaN) correlation_score counts as neutral (50).
+    
+    Returns:
+        dict: overall_risk_score, risk_level (strings), volatility_risk, downside_risk, momentum_risk,
+              trend_risk and diversification_risk arrays.
+    """
+    volatility_risk = np.minimum(np.asarray(volatility, dtype=float) * 1.5, 100)
+    downside_risk = np.minimum(np.asarray(var_pct, dtype=float) * 5, 100)
+    momentum_risk = _lookup(momentum, MOMENTUM_RISK)
+    trend_risk = _lookup(trend_signal, TREND_RISK)
+    if correlation_score is None:
+        diversification_risk = np.full(len(volatility_risk), 50.0)
+    else:
+        diversification_risk = np.array([np.nan if c is None else c for c in correlation_score], dtype=float)
+        diversification_risk = np.where(np.isnan(diversification_risk), 50.0, diversification_risk)
+    
+    overall_risk = (volatility_risk * 0.30 + downside_risk * 0.30 + momentum_risk * 0.15
+                    + trend_risk * 0.15 + diversification_risk * 0.10)
+    risk_level = np.array(RISK_LEVELS)[np.searchsorted(RISK_LEVEL_BOUNDS, overall_risk, side="right")]
+    return {
+        "overall_risk_score": overall_risk,
+        "risk_level": risk_level,
+        "volatility_risk": volatility_risk,
+        "downside_risk": downside_risk,
+        "momentum_risk": momentum_risk,
+        "trend_risk": trend_risk,
+        "diversification_risk": diversification_risk,
+    }
+
+
+def batch_actions(risk_level: Sequence[str], trend_signal: Sequence[str], momentum: Sequence[str],
+                  rsi_14: Optional[Sequence[Optional[float]]] = None, market_sentiment: Optional[str] = None,
+                  user_risk_tolerance: str = "medium") -> Dict[str, np.ndarray]:
+    """
+    The action / confidence rules of generate_investment_recommendation() for a whole watchlist at once.
+    
+    Returns:
+        dict: action ("BUY", "HOLD", "SELL", "AVOID"), confidence, signal (bullish minus bearish signals),
+              bullish_signals, bearish_signals and risk_match arrays.
+    """
+    trend_signal, momentum = np.asarray(trend_signal, dtype=object), np.asarray(momentum, dtype=object)
+    bullish = 2 * (trend_signal == "bullish") + (momentum == "positive")
+    bearish = 2 * (trend_signal == "bearish") + (momentum == "negative")
+    if rsi_14 is not None:
+        rsi = np.nan_to_num(np.array([np.nan if r is None else r for r in rsi_14], dtype=float))
+        with np.errstate(invalid="ignore"):
+            bullish = bullish + ((rsi != 0) & (rsi < 30))  # oversold
+            bearish = bearish + (rsi > 70)  # overbought
+    bullish = bullish + (market_sentiment == "bullish")
+    bearish = bearish + (market_sentiment == "bearish")
+    
+    signal = bullish - bearish
+    risk_match = np.isin(np.asarray(risk_level, dtype=object), RISK_TOLERANCE_LEVELS.get(user_risk_tolerance, ["medium"]))
+    conditions = [(signal >= 3) & risk_match, (signal >= 1) & risk_match, signal <= -3, signal <= -1, ~risk_match]
+    action = np.select(conditions, ["BUY", "BUY", "SELL", "SELL", "AVOID"], "HOLD")
+    confidence = np.select(conditions, [
+        np.where(signal >= 4, "high", "medium"),
+        np.where(signal >= 2, "medium", "low"),
+        np.where(signal <= -4, "high", "medium"),
+        np.where(signal <= -2, "medium", "low"),
+        "high",
+    ], "medium")
+    return {"action": action, "confidence": confidence, "signal": signal, "bullish_signals": bullish,
+            "bearish_signals": bearish, "risk_match": risk_match}
+
+
+@memoize()
+def screen_watchlist(watchlist: Dict[str, Dict[str, Any]], user_risk_tolerance: str = "medium",
+                     market_sentiment: Optional[str] = None, top_n: Optional[int] = 10) -> Optional[Dict]:
+    """
+    Scores, classifies and ranks a whole watchlist of coins in one call, with the same rules as
+    generate_risk_score() and generate_investment_recommendation().
+    Coins are ranked by risk-adjusted signal = (bullish - bearish signals) x (100 - overall risk score) / 100,
+    so strong signals with low risk come first.
+    
+    Args:
+        watchlist (dict): Metrics per coin. volatility (annualized %) and var_pct are required; momentum
+                          ("positive"/"neutral"/"negative"), trend_signal ("bullish"/"neutral"/"bearish"),
+                          rsi_14 and correlation_score (0-100) are optional.
+                          Example: {"bitcoin": {"volatility": 45, "var_pct": 4.1, "momentum": "positive", "trend_signal": "bullish", "rsi_14": 58},
+                                    "solana": {"volatility": 78, "var_pct": 7.9, "momentum": "negative", "trend_signal": "bearish"}}
+        user_risk_tolerance (str): User's risk tolerance ("low", "medium", "high").
+        market_sentiment (str, optional): Overall market sentiment ("bullish", "bearish", "neutral").
+        top_n (int): Number of coins returned (default: 10, None for all).
+    
+    Returns:
+        dict: Ranked table plus how many coins got each action.
+              Example: {
+                  "columns": ["rank", "coin", "action", "confidence", "risk_adjusted_signal", "signal", "overall_risk_score", "risk_level"],
+                  "rows": [[1, "bitcoin", "BUY", "medium", 1.49, 3, 50.3, "medium-high"], ...],
+                  "coins_screened": 300,
+                  "actions": {"BUY": 41, "HOLD": 97, "SELL": 120, "AVOID": 42}
+              }
+        None: If screening fails.
+    """
+    try:
+        coins = list(watchlist)
+        metrics = [watchlist[coin] for coin in coins]
+        momentum = [m.get("momentum", "neutral") for m in metrics]
+        trend_signal = [m.get("trend_signal", "neutral") for m in metrics]
+        
+        scores = batch_risk_scores([m["volatility"] for m in metrics], [m["var_pct"] for m in metrics], momentum,
+                                   trend_signal, [m.get("correlation_score") for m in metrics])
+        actions = batch_actions(scores["risk_level"], trend_signal, momentum, [m.get("rsi_14") for m in metrics],
+                                market_sentiment, user_risk_tolerance)
+        risk_adjusted = actions["signal"] * (100 - scores["overall_risk_score"]) / 100
+        
+        # Top-N by risk-adjusted signal with a bounded heap, ties by lower risk then watchlist order
+        count = len(coins) if top_n is None else int(top_n)
+        ranked = heapq.nlargest(count, range(len(coins)), key=lambda i: (risk_adjusted[i], -scores["overall_risk_score"][i]))
+        
+        rows = [[rank, coins[i], str(actions["action"][i]), str(actions["confidence"][i]), round(risk_adjusted[i].item(), 2),
+                 int(actions["signal"][i]), round(scores["overall_risk_score"][i].item(), 1), str(scores["risk_level"][i])]
+                for rank, i in enumerate(ranked, start=1)]
+        labels, counts = np.unique(actions["action"], return_counts=True)
+        return {
+            "columns": WATCHLIST_COLUMNS,
+            "rows": rows,
+            "coins_screened": len(coins),
+            "actions": {str(label): int(n) for label, n in zip(labels, counts)},
+        }
+    
+    except Exception as e:
+        print(f"Error screening watchlist: {e}")
+        return None
+
+
+# ==================== Report Rendering ====================
+
+def render_recommendation_report(coin_name: str, current_price: float, volatility: float, var_pct: float, momentum: str,
+                                 trend_signal: str, risk_score: Dict, recommendation: Dict,
+                                 user_risk_tolerance: str = "medium") -> str:
+    """
+    Renders a markdown recommendation report from generate_risk_score() and generate_investment_recommendation()
+    results, following the layout of the Synthesis Agent's BUY / AVOID templates. Entry strategy, price targets
+    and stop loss are only shown for BUY, allocation for BUY and HOLD.
+    """
+    action = recommendation["action"]
+    fit = "Acceptable for" if recommendation["match_with_risk_tolerance"] else "Exceeds"
+    lines = [
+        f"**Recommendation for {coin_name}: {action}**",
+        f"**Confidence:** {recommendation['confidence'].title()}",
+        "",
+        f"**Current Price:** ${current_price:,.2f}",
+        f"**Risk Score:** {risk_score['overall_risk_score']}/100 ({risk_score['risk_level']}) - {fit} your {user_risk_tolerance} risk tolerance profile",
+        "",
+        "**Risk Calculation:**",
+        f"- Volatility: {volatility}% → Risk score: {risk_score['volatility_risk']}",
+        f"- VaR: {var_pct}% → Risk score: {risk_score['downside_risk']}",
+        f"- Momentum: {momentum} → Risk score: {risk_score['momentum_risk']}",
+        f"- Trend: {trend_signal} → Risk score: {risk_score['trend_risk']}",
+        f"- Diversification → Risk score: {risk_score['diversification_risk']}",
+        f"- **Overall Risk Score: {risk_score['overall_risk_score']}/100 ({risk_score['risk_level']})**",
+        "",
+        f"**Reasoning:** {recommendation['reasoning'].strip()}",
+    ]
+    if action in ["BUY", "HOLD"]:
+        lines += ["", f"**Allocation:** {recommendation['allocation_suggestion']}"]
+    if action == "BUY":
+        targets = recommendation["price_targets"]
+        stop_loss = recommendation["stop_loss"]
+        lines += [
+            f"**Entry Strategy:** {recommendation['entry_strategy']}",
+            "",
+            "**Price Targets:**",
+            f"- Short-term: ${targets['short_term']:,.2f} ({targets['short_term'] / current_price - 1:+.0%})",
+            f"- Medium-term: ${targets['medium_term']:,.2f} ({targets['medium_term'] / current_price - 1:+.0%})",
+            "",
+            f"**Stop Loss:** ${stop_loss:,.2f} ({1 - stop_loss / current_price:.1%} below the current price)",
+        ]
+    if recommendation["risks"]:
+        lines += ["", "**Key Risks:**"] + [f"- {risk}" for risk in recommendation["risks"]]
+    return "\n".join(lines)
+
+
+def build_recommendation_report(coin_name: str, current_price: float, volatility: float, var_pct: float,
+                                momentum: str = "neutral", trend_signal: str = "neutral", rsi_14: Optional[float] = None,
+                                correlation_score: Optional[float] = None, market_sentiment: Optional[str] = None,
+                                user_risk_tolerance: str = "medium") -> Optional[Dict]:
+    """
+    Deterministic synthesis for a coin whose metrics are already known: runs generate_risk_score() and
+    generate_investment_recommendation() directly and renders the report from a template, without an LLM.
+
+    Args:
+        coin_name (str): Name of the cryptocurrency.
+        current_price (float): Current price in USD.
+        volatility (float): Annualized volatility (%).
+        var_pct (float): Value-at-Risk percentage.
+        momentum (str): Price momentum ("positive", "negative", "neutral").
+        trend_signal (str): Trend signal ("bullish", "bearish", "neutral").
+        rsi_14 (float, optional): 14-day RSI.
+        correlation_score (float, optional): Portfolio correlation score (0-100).
+        market_sentiment (str, optional): Market sentiment ("bullish", "bearish", "neutral").
+        user_risk_tolerance (str): User's risk tolerance ("low", "medium", "high").
+
+    Returns:
+        dict: The risk score, the recommendation and the rendered markdown report.
+              Example: {
+                  "risk_score": {"overall_risk_score": 55.2, "risk_level": "medium-high", ...},
+                  "recommendation": {"action": "BUY", "confidence": "medium", ...},
+                  "report": "**Recommendation for Bitcoin: BUY**\\n**Confidence:** Medium\\n..."
+              }
+        None: If synthesis fails.
+    """
+    try:
+        risk_score = generate_risk_score(volatility, var_pct, momentum, trend_signal, correlation_score)
+        if risk_score is None:
+            return None
+        technical_signals = {"rsi_14": rsi_14, "trend_signal": trend_signal, "momentum": momentum}
+        recommendation = generate_investment_recommendation(coin_name, current_price, risk_score, technical_signals,
+                                                            market_sentiment, user_risk_tolerance)
+        if recommendation is None:
+            return None
+        report = render_recommendation_report(coin_name, current_price, volatility, var_pct, momentum, trend_signal,
+                                              risk_score, recommendation, user_risk_tolerance)
+        return {"risk_score": risk_score, "recommendation": recommendation, "report": report}
+
+    except Exception as e:
+        print(f"Error building recommendation report: {e}")
+        return None
+
+
 def test_synthesis_recommendation_tools():
     """
     Tests all Synthesis & Recommendation Agent functions.